@@ -1,8 +1,45 @@
-from django.contrib import admin
-from .models import Penempatan, Pendaftaran, Absensi, Laporan, Sertifikat
+from django.contrib import admin, messages
+from django.http import HttpResponseRedirect
+from .models import KuotaPenuhError, Penempatan, Pendaftaran, Absensi, Laporan, Sertifikat, SertifikatJob, UrutanSertifikat, Aktivitas, RekapAbsensiBulanan
 
 admin.site.register(Penempatan)
-admin.site.register(Pendaftaran)
 admin.site.register(Absensi)
 admin.site.register(Laporan)
-admin.site.register(Sertifikat)
\ No newline at end of file
+admin.site.register(Sertifikat)
+admin.site.register(SertifikatJob)
+admin.site.register(UrutanSertifikat)
+admin.site.register(Aktivitas)
+admin.site.register(RekapAbsensiBulanan)
+
+
+@admin.register(Pendaftaran)
+class PendaftaranAdmin(admin.ModelAdmin):
+    def save_model(self, request, obj, form, change):
+        """
+        Pendaftaran.clean() sudah menolak perubahan ke unit yang penuh; ini untuk
+        kursi terakhir yang keburu diambil pendaftar lain di antara validasi dan
+        penyimpanan (save() sudah di-rollback).
+        """
+        try:
+            super().save_model(request, obj, form, change)
+        except KuotaPenuhError as e:
+            request._kuota_penuh = True
+            self.message_user(request, f"Perubahan tidak disimpan: {e}", messages.ERROR)
+
+    def log_change(self, request, obj, message):
+        if not getattr(request, '_kuota_penuh', False):
+            return super().log_change(request, obj, message)
+
+    def log_addition(self, request, obj, message):
+        if not getattr(request, '_kuota_penuh', False):
+            return super().log_addition(request, obj, message)
+
+    def response_change(self, request, obj):
+        if getattr(request, '_kuota_penuh', False):
+            return HttpResponseRedirect(request.path)
+        return super().response_change(request, obj)
+
+    def response_add(self, request, obj, post_url_continue=None):
+        if getattr(request, '_kuota_penuh', False):
+            return HttpResponseRedirect(request.path)
+        return super().response_add(request, obj, post_url_continue)
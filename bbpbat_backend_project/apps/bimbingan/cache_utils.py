@@ -0,0 +1,92 @@
+# apps/bimbingan/cache_utils.py
+import hashlib
+import json
+import uuid
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+# Kunci versi daftar penempatan publik. Data di-cache di bawah kunci yang memuat
+# versi ini, jadi invalidasi cukup mengganti versinya (entry lama tidak pernah
+# dibaca lagi dan kedaluwarsa sendiri).
+KEY_VERSI_PENEMPATAN = 'bimbingan:penempatan:versi'
+TIMEOUT_DAFTAR_PENEMPATAN = 60 * 10
+
+# Ringkasan dashboard admin: TTL pendek, cukup untuk meredam refresh beruntun
+KEY_DASHBOARD_ADMIN = 'bimbingan:dashboard-admin'
+TIMEOUT_DASHBOARD_ADMIN = 30
+
+
+def _key_daftar_penempatan(versi):
+    return f'bimbingan:penempatan:daftar:{versi}'
+
+
+def _key_geofence_peserta(versi, profil_id):
+    return f'bimbingan:penempatan:geofence:{versi}:{profil_id}'
+
+
+def _versi_penempatan():
+    versi = cache.get(KEY_VERSI_PENEMPATAN)
+    if versi is None:
+        versi = uuid.uuid4().hex
+        # add() agar proses lain yang lebih dulu menulis versi tidak tertimpa
+        if not cache.add(KEY_VERSI_PENEMPATAN, versi, None):
+            versi = cache.get(KEY_VERSI_PENEMPATAN, versi)
+    return versi
+
+
+def get_daftar_penempatan(build):
+    """
+    Mengembalikan `(data, etag)` daftar penempatan publik dari cache.
+    `build` dipanggil untuk menyusun data dari database hanya saat cache kosong.
+    """
+    versi = _versi_penempatan()
+    key = _key_daftar_penempatan(versi)
+    cached = cache.get(key)
+    if cached is None:
+        data = build()
+        konten = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True).encode('utf-8')
+        # ETag kuat: berubah setiap kali representasi berubah
+        etag = f'"{hashlib.sha256(konten).hexdigest()[:32]}"'
+        cached = (data, etag)
+        cache.set(key, cached, TIMEOUT_DAFTAR_PENEMPATAN)
+    return cached
+
+
+def invalidate_daftar_penempatan():
+    """
+    Mengganti versi cache daftar penempatan. Dijalankan segera dan sekali lagi
+    setelah transaksi commit, supaya request yang sempat membangun cache dari
+    data sebelum commit tidak meninggalkan data basi.
+    """
+    def _ganti_versi():
+        cache.set(KEY_VERSI_PENEMPATAN, uuid.uuid4().hex, None)
+
+    _ganti_versi()
+    transaction.on_commit(_ganti_versi)
+
+
+def get_geofence_peserta(profil_id, build):
+    """
+    Mengembalikan geofence unit penempatan milik profil dari cache.
+    Kunci memuat versi penempatan, jadi perubahan geofence di unit mana pun
+    (Penempatan.save) otomatis membuat entry lama tidak terbaca. `build`
+    mengembalikan dict geofence, atau {} bila unit tidak punya geofence.
+    """
+    key = _key_geofence_peserta(_versi_penempatan(), profil_id)
+    geofence = cache.get(key)
+    if geofence is None:
+        geofence = build()
+        cache.set(key, geofence, TIMEOUT_DAFTAR_PENEMPATAN)
+    return geofence
+
+
+def invalidate_geofence_peserta(*profil_ids):
+    """ Dipanggil saat penempatan peserta berubah (lihat PesertaProfile.save). """
+    versi = _versi_penempatan()
+    keys = [_key_geofence_peserta(versi, profil_id) for profil_id in profil_ids if profil_id]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
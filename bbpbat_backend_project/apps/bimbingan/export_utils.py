@@ -0,0 +1,176 @@
+# apps/bimbingan/export_utils.py
+"""
+Penulis CSV/XLSX/ZIP berbasis generator untuk ekspor data besar.
+
+Setiap fungsi `stream_*` menerima iterator baris dan menghasilkan potongan
+bytes satu per satu, sehingga bisa langsung diberikan ke StreamingHttpResponse
+tanpa pernah menampung seluruh file di memori.
+"""
+import csv
+import datetime
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+# Jumlah baris yang ditulis sebelum potongan bytes dikirim ke klien
+BARIS_PER_POTONGAN = 500
+
+# Karakter kontrol yang tidak sah di XML 1.0
+_KARAKTER_ILEGAL_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def _teks(nilai):
+    if nilai is None:
+        return ''
+    if isinstance(nilai, (datetime.date, datetime.time)):
+        return nilai.isoformat()
+    return str(nilai)
+
+
+class _Echo:
+    """ Objek file semu: write() langsung mengembalikan nilai yang ditulis. """
+    def write(self, value):
+        return value
+
+
+def stream_csv(header, rows):
+    """ Menghasilkan file CSV (UTF-8 dengan BOM agar terbaca Excel) baris demi baris. """
+    writer = csv.writer(_Echo())
+    potongan = ['\ufeff' + writer.writerow(header)]
+    for row in rows:
+        potongan.append(writer.writerow([_teks(v) for v in row]))
+        if len(potongan) >= BARIS_PER_POTONGAN:
+            yield ''.join(potongan).encode('utf-8')
+            potongan = []
+    if potongan:
+        yield ''.join(potongan).encode('utf-8')
+
+
+class _Pipa:
+    """
+    Tujuan tulis untuk ZipFile yang tidak bisa di-seek: bytes yang ditulis
+    ditampung sebentar lalu diambil oleh generator untuk dikirim.
+    Tidak punya tell()/seek(), sehingga zipfile otomatis memakai data
+    descriptor dan tidak pernah kembali ke awal file.
+    """
+    def __init__(self):
+        self._buffer = []
+
+    def write(self, data):
+        self._buffer.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def ambil(self):
+        data = b''.join(self._buffer)
+        self._buffer = []
+        return data
+
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{nama}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+
+def _sel_xlsx(nilai):
+    if isinstance(nilai, bool):
+        return f'<c t="b"><v>{int(nilai)}</v></c>'
+    if isinstance(nilai, (int, float)):
+        return f'<c><v>{nilai}</v></c>'
+    teks = escape(_KARAKTER_ILEGAL_XML.sub('', _teks(nilai)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{teks}</t></is></c>'
+
+
+def _baris_xlsx(row):
+    return '<row>' + ''.join(_sel_xlsx(v) for v in row) + '</row>'
+
+
+def stream_xlsx(header, rows, nama_sheet='Data'):
+    """
+    Menghasilkan workbook XLSX satu sheet baris demi baris.
+    Sel teks ditulis sebagai inline string sehingga tidak perlu tabel
+    sharedStrings yang harus dibangun penuh sebelum file ditutup.
+    """
+    pipa = _Pipa()
+    with zipfile.ZipFile(pipa, 'w', compression=zipfile.ZIP_DEFLATED) as arsip:
+        arsip.writestr('[Content_Types].xml', _CONTENT_TYPES)
+        arsip.writestr('_rels/.rels', _RELS)
+        arsip.writestr('xl/workbook.xml', _WORKBOOK.format(nama=escape(nama_sheet, {'"': '&quot;'})))
+        arsip.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS)
+
+        # force_zip64: ukuran sheet belum diketahui saat header entry ditulis
+        with arsip.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write((
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                '<sheetData>' + _baris_xlsx(header)
+            ).encode('utf-8'))
+            potongan = []
+            for row in rows:
+                potongan.append(_baris_xlsx(row))
+                if len(potongan) >= BARIS_PER_POTONGAN:
+                    sheet.write(''.join(potongan).encode('utf-8'))
+                    potongan = []
+                    data = pipa.ambil()
+                    if data:
+                        yield data
+            sheet.write((''.join(potongan) + '</sheetData></worksheet>').encode('utf-8'))
+    yield pipa.ambil()
+
+
+def stream_zip(entri, ukuran_potongan=64 * 1024):
+    """
+    Menghasilkan arsip ZIP dari iterable (nama, isi). `isi` berupa bytes atau
+    objek file yang dibaca per potongan lalu ditutup, jadi jika `entri` adalah
+    generator yang membuka file satu per satu, hanya satu file yang terbuka
+    dan tidak ada file yang dimuat utuh ke memori.
+    """
+    pipa = _Pipa()
+    with zipfile.ZipFile(pipa, 'w', compression=zipfile.ZIP_DEFLATED) as arsip:
+        for nama, isi in entri:
+            if isinstance(isi, (bytes, str)):
+                arsip.writestr(nama, isi)
+            else:
+                with isi, arsip.open(nama, 'w', force_zip64=True) as tujuan:
+                    for potongan in iter(lambda: isi.read(ukuran_potongan), b''):
+                        tujuan.write(potongan)
+                        data = pipa.ambil()
+                        if data:
+                            yield data
+            data = pipa.ambil()
+            if data:
+                yield data
+    yield pipa.ambil()
@@ -0,0 +1,85 @@
+# apps/bimbingan/geo_utils.py
+"""
+Perhitungan geofence untuk validasi lokasi absensi.
+
+Geofence unit penempatan berupa lingkaran (titik pusat + radius meter) atau
+poligon (daftar [lat, lng]). Bounding box-nya dihitung sekali saat Penempatan
+disimpan, sehingga sebagian besar titik di luar area sudah ditolak dengan
+empat perbandingan sebelum haversine / point-in-polygon dijalankan.
+"""
+import math
+
+# Jari-jari bumi (meter), sama dengan src/utils/geo.ts di frontend
+RADIUS_BUMI_M = 6371e3
+# Panjang satu derajat lintang dalam meter (pendekatan)
+METER_PER_DERAJAT = math.pi * RADIUS_BUMI_M / 180
+
+
+def haversine_m(lat1, lng1, lat2, lng2):
+    """ Jarak dua titik di permukaan bumi dalam meter. """
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    delta_p = math.radians(lat2 - lat1)
+    delta_l = math.radians(lng2 - lng1)
+    a = math.sin(delta_p / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(delta_l / 2) ** 2
+    return 2 * RADIUS_BUMI_M * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def titik_dalam_poligon(lat, lng, poligon):
+    """
+    Uji ray casting pada bidang lat/lng. Cukup akurat untuk area seukuran
+    kompleks balai (distorsi proyeksi bisa diabaikan).
+    """
+    di_dalam = False
+    j = len(poligon) - 1
+    for i in range(len(poligon)):
+        lat_i, lng_i = poligon[i]
+        lat_j, lng_j = poligon[j]
+        if (lng_i > lng) != (lng_j > lng):
+            lat_potong = lat_i + (lng - lng_i) * (lat_j - lat_i) / (lng_j - lng_i)
+            if lat < lat_potong:
+                di_dalam = not di_dalam
+        j = i
+    return di_dalam
+
+
+def hitung_bbox(lat=None, lng=None, radius_m=None, poligon=None):
+    """
+    Mengembalikan (lat_min, lat_max, lng_min, lng_max) untuk geofence, atau
+    None jika geofence belum lengkap. Poligon diutamakan bila keduanya diisi.
+    """
+    if poligon:
+        lats = [titik[0] for titik in poligon]
+        lngs = [titik[1] for titik in poligon]
+        return min(lats), max(lats), min(lngs), max(lngs)
+    if lat is None or lng is None or not radius_m:
+        return None
+    delta_lat = radius_m / METER_PER_DERAJAT
+    # Dibatasi agar tidak membagi nol di dekat kutub
+    delta_lng = radius_m / (METER_PER_DERAJAT * max(math.cos(math.radians(lat)), 1e-6))
+    return lat - delta_lat, lat + delta_lat, lng - delta_lng, lng + delta_lng
+
+
+def dalam_geofence(geofence, lat, lng):
+    """
+    Mengecek apakah titik (lat, lng) berada di dalam geofence.
+    `geofence` adalah dict berisi field geofence_* dan bbox_* milik Penempatan.
+    """
+    if not (geofence['bbox_lat_min'] <= lat <= geofence['bbox_lat_max']
+            and geofence['bbox_lng_min'] <= lng <= geofence['bbox_lng_max']):
+        return False
+    if geofence['geofence_poligon']:
+        return titik_dalam_poligon(lat, lng, geofence['geofence_poligon'])
+    jarak = haversine_m(lat, lng, geofence['geofence_lat'], geofence['geofence_lng'])
+    return jarak <= geofence['geofence_radius']
+
+
+def validasi_poligon(poligon):
+    """ Memastikan poligon berupa minimal 3 pasangan [lat, lng] yang valid. """
+    if not isinstance(poligon, list) or len(poligon) < 3:
+        raise ValueError("Poligon geofence harus berisi minimal 3 titik [lat, lng].")
+    for titik in poligon:
+        if (not isinstance(titik, (list, tuple)) or len(titik) != 2
+                or not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in titik)):
+            raise ValueError("Setiap titik poligon harus berupa [lat, lng].")
+        if not (-90 <= titik[0] <= 90 and -180 <= titik[1] <= 180):
+            raise ValueError("Koordinat poligon di luar rentang lat/lng yang valid.")
@@ -0,0 +1,112 @@
+# File: apps/bimbingan/management/commands/isi_absensi_alpha.py
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from apps.bimbingan.models import Absensi, RekapAbsensiBulanan
+from apps.bimbingan.utils import iter_working_days
+from apps.peserta.cache_utils import invalidate_dashboard_peserta
+from apps.peserta.models import PesertaProfile
+
+
+class Command(BaseCommand):
+    help = (
+        "Mengisi absensi ALPHA untuk hari kerja yang sudah lewat tanpa baris Absensi, "
+        "bagi setiap peserta AKTIF (antara tanggal_mulai dan tanggal_selesai). "
+        "Aman dijalankan berulang (mis. tiap malam): hari yang sudah terisi dilewati."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sampai',
+            help="Tanggal terakhir yang diisi (YYYY-MM-DD). Default: kemarin.",
+        )
+        parser.add_argument(
+            '--batch',
+            type=int, default=200,
+            help="Jumlah peserta yang diproses per transaksi.",
+        )
+        parser.add_argument(
+            '--setelah-id',
+            type=int, default=0,
+            help="Lanjutkan dari peserta dengan id lebih besar dari nilai ini (resume).",
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help="Hanya hitung baris yang akan dibuat tanpa menyimpan.",
+        )
+
+    def handle(self, *args, **options):
+        if options['sampai']:
+            sampai = parse_date(options['sampai'])
+            if not sampai:
+                raise CommandError("Format --sampai harus YYYY-MM-DD.")
+        else:
+            sampai = timezone.localdate() - timedelta(days=1)
+
+        profil_aktif = PesertaProfile.objects.filter(
+            status=PesertaProfile.StatusPeserta.AKTIF,
+            tanggal_mulai__isnull=False,
+            tanggal_mulai__lte=sampai,
+        ).order_by('pk').values_list('pk', 'tanggal_mulai', 'tanggal_selesai')
+
+        # Batch berbasis keyset (pk > id terakhir), sama seperti saat resume
+        total_baris = 0
+        setelah_id = options['setelah_id']
+        while True:
+            batch = list(profil_aktif.filter(pk__gt=setelah_id)[:options['batch']])
+            if not batch:
+                break
+            total_baris += self.proses_batch(batch, sampai, options['dry_run'])
+            setelah_id = batch[-1][0]
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f"{total_baris} baris ALPHA akan dibuat (dry run, tidak disimpan)."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{total_baris} baris ALPHA dibuat sampai {sampai:%Y-%m-%d}."))
+
+    def proses_batch(self, batch, sampai, dry_run):
+        """
+        Mengisi hari kosong untuk satu batch peserta dalam satu transaksi.
+        Jika proses terhenti, batch yang sudah commit tidak diulang: hari yang
+        sudah terisi tidak dibuat lagi (unique profil+tanggal, ignore_conflicts).
+        """
+        rentang = {
+            profil_id: (mulai, min(selesai, sampai) if selesai else sampai)
+            for profil_id, mulai, selesai in batch
+        }
+        awal = min(mulai for mulai, _ in rentang.values())
+        sudah_ada = set(
+            Absensi.objects.filter(profil_id__in=rentang, tanggal__range=(awal, sampai))
+            .values_list('profil_id', 'tanggal')
+        )
+
+        baru = [
+            Absensi(profil_id=profil_id, tanggal=tanggal, status_kehadiran=Absensi.StatusKehadiran.ALPHA)
+            for profil_id, (mulai, akhir) in rentang.items()
+            for tanggal in iter_working_days(mulai, akhir)
+            if (profil_id, tanggal) not in sudah_ada
+        ]
+        if dry_run or not baru:
+            return len(baru)
+
+        with transaction.atomic():
+            Absensi.objects.bulk_create(baru, batch_size=1000, ignore_conflicts=True)
+
+            # bulk_create tidak memanggil Absensi.save(): perbarui rekap bulanan manual
+            per_bulan = {}
+            for absensi in baru:
+                per_bulan.setdefault(absensi.tanggal.replace(day=1), set()).add(absensi.profil_id)
+            for bulan, profil_ids in per_bulan.items():
+                RekapAbsensiBulanan.objects.bangun_ulang(bulan, profil_ids)
+
+        # Command ini berjalan di proses terpisah dari server web; invalidasi sampai
+        # ke proses web karena cache default dipakai bersama (lihat CACHES di settings)
+        invalidate_dashboard_peserta(*{absensi.profil_id for absensi in baru})
+        self.stdout.write(f"Peserta s.d. id {batch[-1][0]}: {len(baru)} baris ALPHA.")
+        return len(baru)
@@ -0,0 +1,84 @@
+# File: apps/bimbingan/management/commands/proses_sertifikat.py
+
+import multiprocessing
+import os
+import signal
+import socket
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from apps.bimbingan.sertifikat_utils import jalankan_worker
+
+
+def _proses_worker(pekerja, sekali, interval, berhenti):
+    """ Entry point proses anak. Ctrl+C ditangani induk lewat `berhenti`. """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    import django
+    django.setup()
+    jalankan_worker(pekerja, sekali=sekali, interval=interval, berhenti=berhenti)
+
+
+class Command(BaseCommand):
+    help = (
+        "Menjalankan worker antrean penerbitan sertifikat (SertifikatJob). "
+        "Dengan --proses N, N proses worker dijalankan paralel; tiap job diklaim "
+        "dengan conditional UPDATE sehingga tidak ada job yang dikerjakan dua kali."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--proses',
+            type=int, default=1,
+            help="Jumlah proses worker. Default: 1 (berjalan di proses ini).",
+        )
+        parser.add_argument(
+            '--interval',
+            type=float, default=1.0,
+            help="Jeda (detik) antar pengecekan saat antrean kosong.",
+        )
+        parser.add_argument(
+            '--sekali',
+            action='store_true',
+            help="Kosongkan antrean lalu keluar (untuk cron atau tes).",
+        )
+
+    def handle(self, *args, **options):
+        jumlah_proses = options['proses']
+        if jumlah_proses < 1:
+            raise CommandError("--proses minimal 1.")
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+
+        if jumlah_proses == 1:
+            diproses = jalankan_worker(prefix, sekali=options['sekali'], interval=options['interval'])
+            self.stdout.write(self.style.SUCCESS(f"{diproses} job sertifikat diproses."))
+            return
+
+        # Koneksi database induk tidak boleh diwariskan ke proses hasil fork
+        connections.close_all()
+        berhenti = multiprocessing.Event()
+        workers = [
+            multiprocessing.Process(
+                target=_proses_worker,
+                args=(f"{prefix}/{i}", options['sekali'], options['interval'], berhenti),
+                name=f"sertifikat-worker-{i}",
+            )
+            for i in range(jumlah_proses)
+        ]
+        for worker in workers:
+            worker.start()
+        self.stdout.write(f"{jumlah_proses} worker sertifikat berjalan.")
+
+        def hentikan(signum, frame):
+            # Worker menyelesaikan job yang sedang dikerjakan lalu keluar
+            berhenti.set()
+
+        handler_lama = {sig: signal.signal(sig, hentikan) for sig in (signal.SIGTERM, signal.SIGINT)}
+        try:
+            for worker in workers:
+                worker.join()
+        finally:
+            # Kembalikan handler pemanggil (mis. call_command dari proses lain)
+            for sig, handler in handler_lama.items():
+                signal.signal(sig, handler)
+        self.stdout.write(self.style.SUCCESS("Worker sertifikat berhenti."))
@@ -0,0 +1,56 @@
+# File: apps/bimbingan/management/commands/rebuild_kuota.py
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.bimbingan.cache_utils import invalidate_daftar_penempatan
+from apps.bimbingan.models import Penempatan
+
+
+class Command(BaseCommand):
+    help = (
+        "Membangun ulang counter kuota terisi (terisi_pelajar/terisi_umum) di setiap "
+        "unit penempatan dari data Pendaftaran, dan melaporkan selisih (drift) yang ditemukan."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help="Hanya laporkan drift tanpa memperbaiki counter.",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        jumlah_drift = 0
+
+        for penempatan_id in Penempatan.objects.values_list('id', flat=True):
+            # Kunci baris unit dulu agar tidak balapan dengan geser_kuota() yang sedang berjalan
+            with transaction.atomic():
+                unit = Penempatan.objects.select_for_update().get(pk=penempatan_id)
+                acuan = Penempatan.objects.annotate_kuota().get(pk=penempatan_id)
+
+                if (unit.terisi_pelajar, unit.terisi_umum) == (acuan.kuota_pelajar_terisi, acuan.kuota_umum_terisi):
+                    continue
+
+                jumlah_drift += 1
+                self.stdout.write(
+                    f"{unit.nama}: pelajar {unit.terisi_pelajar} -> {acuan.kuota_pelajar_terisi}, "
+                    f"umum {unit.terisi_umum} -> {acuan.kuota_umum_terisi}"
+                )
+                if not dry_run:
+                    Penempatan.objects.filter(pk=penempatan_id).update(
+                        terisi_pelajar=acuan.kuota_pelajar_terisi,
+                        terisi_umum=acuan.kuota_umum_terisi,
+                    )
+
+        if jumlah_drift and not dry_run:
+            # Daftar penempatan publik memuat sisa kuota dari counter yang baru diperbaiki
+            invalidate_daftar_penempatan()
+
+        if jumlah_drift == 0:
+            self.stdout.write(self.style.SUCCESS("Semua counter kuota sudah sesuai."))
+        elif dry_run:
+            self.stdout.write(self.style.WARNING(f"{jumlah_drift} unit memiliki drift (dry run, tidak diperbaiki)."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{jumlah_drift} unit telah diperbaiki."))
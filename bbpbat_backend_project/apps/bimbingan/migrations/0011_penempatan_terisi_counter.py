@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:17
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def isi_counter_kuota(apps, schema_editor):
+    Penempatan = apps.get_model('bimbingan', 'Penempatan')
+    status_aktif = ['PENDING', 'DISETUJUI']
+    units = Penempatan.objects.annotate(
+        pelajar=Count('pendaftaran', filter=Q(pendaftaran__tipe_peserta='PELAJAR', pendaftaran__status__in=status_aktif)),
+        umum=Count('pendaftaran', filter=Q(pendaftaran__tipe_peserta='UMUM', pendaftaran__status__in=status_aktif)),
+    )
+    for unit in units:
+        Penempatan.objects.filter(pk=unit.pk).update(terisi_pelajar=unit.pelajar, terisi_umum=unit.umum)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bimbingan', '0010_pendaftaran_email_pembimbing_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='penempatan',
+            name='terisi_pelajar',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Kuota Pelajar Terisi'),
+        ),
+        migrations.AddField(
+            model_name='penempatan',
+            name='terisi_umum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Kuota Umum Terisi'),
+        ),
+        migrations.RunPython(isi_counter_kuota, migrations.RunPython.noop),
+    ]
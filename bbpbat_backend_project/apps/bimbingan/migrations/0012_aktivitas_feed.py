@@ -0,0 +1,56 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:23
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def isi_aktivitas_awal(apps, schema_editor):
+    """ Mengisi feed dari pendaftaran, laporan, dan pembayaran yang sudah ada. """
+    Aktivitas = apps.get_model('bimbingan', 'Aktivitas')
+    Pendaftaran = apps.get_model('bimbingan', 'Pendaftaran')
+    Laporan = apps.get_model('bimbingan', 'Laporan')
+    BuktiPembayaran = apps.get_model('peserta', 'BuktiPembayaran')
+
+    aktivitas = [
+        Aktivitas(tipe='PENDAFTARAN', teks=f"Pendaftaran baru dari {p.nama_lengkap}"[:255], waktu=p.tanggal_daftar)
+        for p in Pendaftaran.objects.all().iterator()
+    ]
+    aktivitas += [
+        Aktivitas(tipe='LAPORAN', teks=f"Laporan baru dari {l.profil.user.nama_lengkap}"[:255], profil_id=l.profil_id, waktu=l.disubmit_pada)
+        for l in Laporan.objects.select_related('profil__user').iterator()
+    ]
+    aktivitas += [
+        Aktivitas(tipe='PEMBAYARAN', teks=f"Bukti pembayaran diunggah oleh {b.profil.user.nama_lengkap}"[:255], profil_id=b.profil_id, waktu=b.diunggah_pada)
+        for b in BuktiPembayaran.objects.select_related('profil__user').iterator()
+    ]
+    aktivitas.sort(key=lambda a: a.waktu)
+    Aktivitas.objects.bulk_create(aktivitas, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('peserta', '0012_alter_pesertaprofile_status'),
+        ('bimbingan', '0011_penempatan_terisi_counter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Aktivitas',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipe', models.CharField(choices=[('PENDAFTARAN', 'Pendaftaran Baru'), ('PERSETUJUAN', 'Pendaftaran Disetujui'), ('LAPORAN', 'Laporan Diunggah'), ('PEMBAYARAN', 'Bukti Pembayaran Diunggah'), ('IZIN', 'Pengajuan Izin/Sakit'), ('SERTIFIKAT', 'Sertifikat Diterbitkan')], max_length=20, verbose_name='Tipe Aktivitas')),
+                ('teks', models.CharField(max_length=255, verbose_name='Teks Aktivitas')),
+                ('waktu', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Waktu')),
+                ('profil', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='aktivitas', to='peserta.pesertaprofile')),
+            ],
+            options={
+                'verbose_name': 'Aktivitas',
+                'verbose_name_plural': 'Aktivitas',
+                'ordering': ['-waktu', '-id'],
+                'indexes': [models.Index(fields=['-waktu', '-id'], name='aktivitas_waktu_idx'), models.Index(fields=['tipe', '-waktu', '-id'], name='aktivitas_tipe_waktu_idx')],
+            },
+        ),
+        migrations.RunPython(isi_aktivitas_awal, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bimbingan', '0012_aktivitas_feed'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='laporan',
+            index=models.Index(fields=['-disubmit_pada', 'id'], name='laporan_submit_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pendaftaran',
+            index=models.Index(fields=['status', '-tanggal_daftar', 'id'], name='pendaftaran_status_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bimbingan', '0013_laporan_laporan_submit_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='absensi',
+            index=models.Index(fields=['tanggal', 'profil'], name='absensi_tanggal_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='laporan',
+            index=models.Index(fields=['status_review', '-disubmit_pada', 'id'], name='laporan_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pendaftaran',
+            index=models.Index(fields=['pilihan_penempatan', 'tipe_peserta', 'status'], name='pendaftaran_slot_idx'),
+        ),
+    ]
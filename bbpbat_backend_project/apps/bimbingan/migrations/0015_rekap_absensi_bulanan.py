@@ -0,0 +1,49 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:33
+
+from django.db import migrations, models
+import django.db.models.deletion
+from calendar import monthrange
+
+
+def isi_rekap_absensi(apps, schema_editor):
+    """ Membangun rekap bulanan dari seluruh data Absensi yang sudah ada. """
+    Absensi = apps.get_model('bimbingan', 'Absensi')
+    RekapAbsensiBulanan = apps.get_model('bimbingan', 'RekapAbsensiBulanan')
+    kode_status = {'HADIR': 'H', 'IZIN': 'I', 'SAKIT': 'S', 'ALPHA': 'A'}
+
+    sel = {}
+    for profil_id, tanggal, status in Absensi.objects.values_list('profil_id', 'tanggal', 'status_kehadiran').iterator():
+        bulan = tanggal.replace(day=1)
+        kode = sel.setdefault((profil_id, bulan), ['-'] * monthrange(bulan.year, bulan.month)[1])
+        kode[tanggal.day - 1] = kode_status.get(status, '-')
+
+    RekapAbsensiBulanan.objects.bulk_create(
+        [RekapAbsensiBulanan(profil_id=profil_id, bulan=bulan, kode=''.join(kode)) for (profil_id, bulan), kode in sel.items()],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('peserta', '0014_buktipembayaran_pembayaran_status_idx_and_more'),
+        ('bimbingan', '0014_absensi_absensi_tanggal_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RekapAbsensiBulanan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bulan', models.DateField(help_text='Selalu tanggal 1 pada bulan tersebut.', verbose_name='Bulan')),
+                ('kode', models.CharField(max_length=31, verbose_name='Kode Harian')),
+                ('profil', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rekap_absensi', to='peserta.pesertaprofile')),
+            ],
+            options={
+                'verbose_name': 'Rekap Absensi Bulanan',
+                'verbose_name_plural': 'Rekap Absensi Bulanan',
+                'unique_together': {('bulan', 'profil')},
+            },
+        ),
+        migrations.RunPython(isi_rekap_absensi, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bimbingan', '0015_rekap_absensi_bulanan'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='absensi',
+            name='lat_keluar',
+            field=models.FloatField(blank=True, null=True, verbose_name='Lintang Check-out'),
+        ),
+        migrations.AddField(
+            model_name='absensi',
+            name='lat_masuk',
+            field=models.FloatField(blank=True, null=True, verbose_name='Lintang Check-in'),
+        ),
+        migrations.AddField(
+            model_name='absensi',
+            name='lng_keluar',
+            field=models.FloatField(blank=True, null=True, verbose_name='Bujur Check-out'),
+        ),
+        migrations.AddField(
+            model_name='absensi',
+            name='lng_masuk',
+            field=models.FloatField(blank=True, null=True, verbose_name='Bujur Check-in'),
+        ),
+        migrations.AddField(
+            model_name='penempatan',
+            name='bbox_lat_max',
+            field=models.FloatField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='penempatan',
+            name='bbox_lat_min',
+            field=models.FloatField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='penempatan',
+            name='bbox_lng_max',
+            field=models.FloatField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='penempatan',
+            name='bbox_lng_min',
+            field=models.FloatField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='penempatan',
+            name='geofence_lat',
+            field=models.FloatField(blank=True, null=True, verbose_name='Lintang Pusat Geofence'),
+        ),
+        migrations.AddField(
+            model_name='penempatan',
+            name='geofence_lng',
+            field=models.FloatField(blank=True, null=True, verbose_name='Bujur Pusat Geofence'),
+        ),
+        migrations.AddField(
+            model_name='penempatan',
+            name='geofence_poligon',
+            field=models.JSONField(blank=True, help_text='Daftar titik [lat, lng]; diutamakan dibanding lingkaran.', null=True, verbose_name='Poligon Geofence'),
+        ),
+        migrations.AddField(
+            model_name='penempatan',
+            name='geofence_radius',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Radius Geofence (meter)'),
+        ),
+        migrations.AddField(
+            model_name='penempatan',
+            name='wajib_lokasi',
+            field=models.BooleanField(default=False, help_text='Tolak absensi tanpa koordinat jika geofence aktif.', verbose_name='Wajib Kirim Lokasi'),
+        ),
+    ]
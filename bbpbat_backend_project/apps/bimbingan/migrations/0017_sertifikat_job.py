@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:59
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('peserta', '0014_buktipembayaran_pembayaran_status_idx_and_more'),
+        ('bimbingan', '0016_geofence_absensi'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SertifikatJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('ANTRI', 'Menunggu'), ('DIPROSES', 'Diproses'), ('SELESAI', 'Selesai'), ('GAGAL', 'Gagal')], default='ANTRI', max_length=10, verbose_name='Status')),
+                ('percobaan', models.PositiveSmallIntegerField(default=0, verbose_name='Jumlah Percobaan')),
+                ('pesan_error', models.TextField(blank=True, verbose_name='Pesan Error')),
+                ('pekerja', models.CharField(blank=True, max_length=100, verbose_name='Worker')),
+                ('dibuat_pada', models.DateTimeField(auto_now_add=True, verbose_name='Dibuat Pada')),
+                ('tersedia_pada', models.DateTimeField(default=django.utils.timezone.now, help_text='Job baru diambil worker setelah waktu ini (backoff retry).', verbose_name='Tersedia Pada')),
+                ('mulai_pada', models.DateTimeField(blank=True, null=True, verbose_name='Mulai Diproses')),
+                ('selesai_pada', models.DateTimeField(blank=True, null=True, verbose_name='Selesai Pada')),
+                ('dibuat_oleh', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('profil', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sertifikat_job', to='peserta.pesertaprofile')),
+                ('sertifikat', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='bimbingan.sertifikat')),
+            ],
+            options={
+                'verbose_name': 'Job Sertifikat',
+                'verbose_name_plural': 'Job Sertifikat',
+                'ordering': ['-dibuat_pada', '-id'],
+                'indexes': [models.Index(fields=['status', 'tersedia_pada'], name='sertifikatjob_antrean_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='sertifikatjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['ANTRI', 'DIPROSES'])), fields=('profil',), name='sertifikatjob_satu_aktif_per_profil'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:15
+
+import re
+
+from django.db import migrations, models
+
+POLA_NOMOR = re.compile(r'^BBPBAT/CERT/(\d{4})/(\d+)$')
+
+
+def isi_urutan_sertifikat(apps, schema_editor):
+    """ Nomor urut terakhir per tahun dari sertifikat yang sudah terbit. """
+    Sertifikat = apps.get_model('bimbingan', 'Sertifikat')
+    UrutanSertifikat = apps.get_model('bimbingan', 'UrutanSertifikat')
+    terakhir = {}
+    for nomor in Sertifikat.objects.values_list('nomor_sertifikat', flat=True).iterator():
+        cocok = POLA_NOMOR.match(nomor)
+        if cocok:
+            tahun, urut = int(cocok.group(1)), int(cocok.group(2))
+            terakhir[tahun] = max(terakhir.get(tahun, 0), urut)
+    UrutanSertifikat.objects.bulk_create(
+        [UrutanSertifikat(tahun=tahun, terakhir=urut) for tahun, urut in terakhir.items()]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bimbingan', '0017_sertifikat_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UrutanSertifikat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tahun', models.PositiveSmallIntegerField(unique=True, verbose_name='Tahun')),
+                ('terakhir', models.PositiveIntegerField(default=0, verbose_name='Nomor Urut Terakhir')),
+            ],
+            options={
+                'verbose_name': 'Urutan Nomor Sertifikat',
+                'verbose_name_plural': 'Urutan Nomor Sertifikat',
+            },
+        ),
+        migrations.RunPython(isi_urutan_sertifikat, migrations.RunPython.noop),
+    ]
@@ -1,13 +1,86 @@
 # File: apps/bimbingan/models.py
 
-from django.db import models
+from calendar import monthrange
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F, Q
 from django.conf import settings
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 # Mengimpor model dari aplikasi lain untuk membuat relasi
 # Kita asumsikan 'apps.peserta.models' akan ada, meskipun kita belum membuatnya.
 # Jika Anda menjalankan makemigrations sekarang, ini mungkin error. Itu normal.
 from apps.peserta.models import PesertaProfile
+from apps.peserta.cache_utils import invalidate_dashboard_peserta
+from apps.users.hashers import buat_password_sementara, make_password_massal
+from apps.users.models import User
+from .cache_utils import invalidate_daftar_penempatan
+from .geo_utils import hitung_bbox
+
+# Kolom geofence di Penempatan dan bounding box turunannya
+KOLOM_GEOFENCE = ('geofence_lat', 'geofence_lng', 'geofence_radius', 'geofence_poligon')
+KOLOM_BBOX = ('bbox_lat_min', 'bbox_lat_max', 'bbox_lng_min', 'bbox_lng_max')
+
+# Kolom counter kuota terisi di Penempatan untuk setiap tipe peserta
+KOLOM_KUOTA_TERISI = {
+    'PELAJAR': 'terisi_pelajar',
+    'UMUM': 'terisi_umum',
+}
+
+
+class KuotaPenuhError(Exception):
+    """ Dilempar saat reservasi kuota gagal karena unit penempatan sudah penuh. """
+
+    def __init__(self, tipe_peserta):
+        self.tipe_peserta = tipe_peserta
+        super().__init__(f"Kuota untuk {tipe_peserta.lower()} di unit penempatan ini sudah penuh.")
+
+
+class PenempatanQuerySet(models.QuerySet):
+    def annotate_kuota(self):
+        """
+        Menambahkan anotasi `kuota_pelajar_terisi` dan `kuota_umum_terisi` untuk
+        setiap unit dalam SATU query (conditional aggregate atas Pendaftaran yang
+        masih PENDING atau sudah DISETUJUI), menggantikan COUNT per unit.
+        Dipakai sebagai hitungan acuan untuk membangun ulang counter `terisi_*`.
+        """
+        status_aktif = [Pendaftaran.Status.PENDING, Pendaftaran.Status.DISETUJUI]
+        return self.annotate(
+            kuota_pelajar_terisi=Count(
+                'pendaftaran',
+                filter=Q(pendaftaran__tipe_peserta='PELAJAR', pendaftaran__status__in=status_aktif),
+            ),
+            kuota_umum_terisi=Count(
+                'pendaftaran',
+                filter=Q(pendaftaran__tipe_peserta='UMUM', pendaftaran__status__in=status_aktif),
+            ),
+        )
+
+    def geser_kuota(self, penempatan_id, tipe_peserta, delta):
+        """ Menambah/mengurangi counter kuota terisi secara atomik di level database. """
+        kolom = KOLOM_KUOTA_TERISI[tipe_peserta]
+        diubah = self.filter(pk=penempatan_id).update(**{kolom: F(kolom) + delta})
+        invalidate_daftar_penempatan()
+        return diubah
+
+    def reservasi_kuota(self, penempatan_id, tipe_peserta):
+        """
+        Menempati satu kursi dengan conditional increment (`terisi < kuota`) dalam
+        satu UPDATE. Tidak ada jeda antara cek dan tulis, sehingga submit bersamaan
+        tidak bisa melampaui kuota; yang kalah langsung mendapat KuotaPenuhError.
+        """
+        kolom = KOLOM_KUOTA_TERISI[tipe_peserta]
+        kolom_kuota = 'kuota_pelajar' if tipe_peserta == 'PELAJAR' else 'kuota_umum'
+        berhasil = self.filter(pk=penempatan_id, **{f'{kolom}__lt': F(kolom_kuota)}).update(
+            **{kolom: F(kolom) + 1}
+        )
+        if not berhasil:
+            raise KuotaPenuhError(tipe_peserta)
+        invalidate_daftar_penempatan()
+
 
 class Penempatan(models.Model):
     """
@@ -19,6 +92,26 @@ class Penempatan(models.Model):
     kuota_umum = models.PositiveIntegerField(_("Kuota Umum/Dinas"), default=5)
     deskripsi = models.TextField(_("Deskripsi Singkat"), blank=True)
 
+    # Counter terdenormalisasi: jumlah Pendaftaran PENDING/DISETUJUI per tipe peserta.
+    # Dijaga oleh Pendaftaran.save()/delete(), dibangun ulang dengan `manage.py rebuild_kuota`.
+    terisi_pelajar = models.PositiveIntegerField(_("Kuota Pelajar Terisi"), default=0, editable=False)
+    terisi_umum = models.PositiveIntegerField(_("Kuota Umum Terisi"), default=0, editable=False)
+
+    # --- Geofence absensi: lingkaran (pusat + radius) atau poligon [[lat, lng], ...] ---
+    geofence_lat = models.FloatField(_("Lintang Pusat Geofence"), null=True, blank=True)
+    geofence_lng = models.FloatField(_("Bujur Pusat Geofence"), null=True, blank=True)
+    geofence_radius = models.PositiveIntegerField(_("Radius Geofence (meter)"), null=True, blank=True)
+    geofence_poligon = models.JSONField(_("Poligon Geofence"), null=True, blank=True, help_text="Daftar titik [lat, lng]; diutamakan dibanding lingkaran.")
+    wajib_lokasi = models.BooleanField(_("Wajib Kirim Lokasi"), default=False, help_text="Tolak absensi tanpa koordinat jika geofence aktif.")
+
+    # Bounding box geofence, dihitung ulang setiap save() untuk prefilter cepat
+    bbox_lat_min = models.FloatField(null=True, editable=False)
+    bbox_lat_max = models.FloatField(null=True, editable=False)
+    bbox_lng_min = models.FloatField(null=True, editable=False)
+    bbox_lng_max = models.FloatField(null=True, editable=False)
+
+    objects = PenempatanQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Unit Penempatan"
         verbose_name_plural = "Unit Penempatan"
@@ -27,6 +120,41 @@ class Penempatan(models.Model):
     def __str__(self):
         return self.nama
 
+    def save(self, *args, **kwargs):
+        """
+        Counter `terisi_*` hanya boleh bergeser lewat `geser_kuota()` atau
+        `rebuild_kuota`, jadi save biasa tidak ikut menimpanya dengan nilai basi.
+        """
+        bbox = hitung_bbox(self.geofence_lat, self.geofence_lng, self.geofence_radius, self.geofence_poligon)
+        self.bbox_lat_min, self.bbox_lat_max, self.bbox_lng_min, self.bbox_lng_max = bbox or (None,) * 4
+
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in KOLOM_KUOTA_TERISI.values()
+            ]
+        elif kwargs.get('update_fields') is not None and set(kwargs['update_fields']) & set(KOLOM_GEOFENCE):
+            kwargs['update_fields'] = set(kwargs['update_fields']) | set(KOLOM_BBOX)
+        super().save(*args, **kwargs)
+        invalidate_daftar_penempatan()
+
+    @property
+    def geofence_aktif(self):
+        return self.bbox_lat_min is not None
+
+    def delete(self, *args, **kwargs):
+        hasil = super().delete(*args, **kwargs)
+        invalidate_daftar_penempatan()
+        return hasil
+
+    @property
+    def sisa_kuota_pelajar(self):
+        return self.kuota_pelajar - self.terisi_pelajar
+
+    @property
+    def sisa_kuota_umum(self):
+        return self.kuota_umum - self.terisi_umum
+
 class Pendaftaran(models.Model):
     """
     Mencatat setiap pengajuan pendaftaran baru yang masuk ke sistem.
@@ -37,6 +165,9 @@ class Pendaftaran(models.Model):
         DISETUJUI = "DISETUJUI", "Disetujui"
         DITOLAK = "DITOLAK", "Ditolak"
 
+    # Status yang menempati kuota unit penempatan
+    STATUS_MENGISI_KUOTA = (Status.PENDING, Status.DISETUJUI)
+
     # Informasi pendaftar
     email = models.EmailField(_("Email Pendaftar"), unique=True, help_text="Pastikan email aktif untuk notifikasi.")
     nama_lengkap = models.CharField(_("Nama Lengkap"), max_length=255)
@@ -63,10 +194,117 @@ class Pendaftaran(models.Model):
         verbose_name = "Pendaftaran"
         verbose_name_plural = "Data Pendaftaran"
         ordering = ['-tanggal_daftar']
+        indexes = [
+            # Daftar pendaftaran PENDING untuk admin, diurutkan per halaman cursor
+            models.Index(fields=['status', '-tanggal_daftar', 'id'], name='pendaftaran_status_idx'),
+            # Hitung kuota per unit, tipe, dan status
+            models.Index(fields=['pilihan_penempatan', 'tipe_peserta', 'status'], name='pendaftaran_slot_idx'),
+        ]
 
     def __str__(self):
         return f"Pendaftaran: {self.nama_lengkap} ({self.get_status_display()})"
 
+    @staticmethod
+    def _slot_kuota(penempatan_id, tipe_peserta, status):
+        """ Mengembalikan (penempatan_id, tipe_peserta) jika baris ini menempati kuota. """
+        if penempatan_id and tipe_peserta in KOLOM_KUOTA_TERISI and status in Pendaftaran.STATUS_MENGISI_KUOTA:
+            return (penempatan_id, tipe_peserta)
+        return None
+
+    def clean(self):
+        """
+        Pre-check kuota untuk perubahan lewat form (mis. Django admin): pendaftaran
+        yang masuk ke slot kuota baru (kembali ke PENDING/DISETUJUI, pindah unit
+        atau tipe) ditolak sebagai error validasi jika unit sudah penuh, bukan
+        KuotaPenuhError saat save(). Reservasi sebenarnya tetap di save().
+        """
+        super().clean()
+        slot_baru = self._slot_kuota(self.pilihan_penempatan_id, self.tipe_peserta, self.status)
+        if not slot_baru:
+            return
+        if not self._state.adding:
+            lama = Pendaftaran.objects.filter(pk=self.pk).values_list(
+                'pilihan_penempatan_id', 'tipe_peserta', 'status'
+            ).first()
+            if lama and self._slot_kuota(*lama) == slot_baru:
+                return
+        penempatan_id, tipe_peserta = slot_baru
+        kolom = KOLOM_KUOTA_TERISI[tipe_peserta]
+        kolom_kuota = 'kuota_pelajar' if tipe_peserta == 'PELAJAR' else 'kuota_umum'
+        if Penempatan.objects.filter(pk=penempatan_id, **{f'{kolom}__gte': F(kolom_kuota)}).exists():
+            raise ValidationError(str(KuotaPenuhError(tipe_peserta)))
+
+    def save(self, *args, **kwargs):
+        """
+        Override save untuk menjaga counter kuota terisi di Penempatan.
+        Slot lama dibaca ulang dari database (dikunci) agar transisi status yang
+        bersamaan tidak menggeser counter dua kali. Slot baru direservasi di akhir
+        transaksi sehingga kunci baris Penempatan ditahan sesingkat mungkin;
+        jika kuota penuh, seluruh penyimpanan di-rollback (KuotaPenuhError).
+        """
+        with transaction.atomic():
+            slot_lama = None
+            if not self._state.adding:
+                lama = Pendaftaran.objects.select_for_update().filter(pk=self.pk).values_list(
+                    'pilihan_penempatan_id', 'tipe_peserta', 'status'
+                ).first()
+                if lama:
+                    slot_lama = self._slot_kuota(*lama)
+
+            super().save(*args, **kwargs)
+
+            slot_baru = self._slot_kuota(self.pilihan_penempatan_id, self.tipe_peserta, self.status)
+            if slot_lama != slot_baru:
+                if slot_lama:
+                    Penempatan.objects.geser_kuota(*slot_lama, -1)
+                if slot_baru:
+                    Penempatan.objects.reservasi_kuota(*slot_baru)
+
+    @staticmethod
+    def buat_akun_massal(daftar_pendaftaran):
+        """
+        Membuat User + PesertaProfile untuk pendaftaran yang disetujui dengan
+        dua bulk_create. Password sementara di-hash di process pool
+        (make_password_massal) karena hashing adalah bagian termahal.
+        Mengembalikan list (pendaftaran, user, profil, password) sesuai urutan
+        input. Status pendaftaran tidak diubah di sini; pemanggil yang
+        menyimpan `status` dan `user_terkait`.
+        """
+        passwords = [buat_password_sementara() for _ in daftar_pendaftaran]
+        hashes = make_password_massal(passwords)
+
+        with transaction.atomic():
+            users = User.objects.bulk_create([
+                User(
+                    email=User.objects.normalize_email(pendaftaran.email), password=password_hash,
+                    nama_lengkap=pendaftaran.nama_lengkap, role=User.Role.PESERTA,
+                )
+                for pendaftaran, password_hash in zip(daftar_pendaftaran, hashes)
+            ])
+            profil = PesertaProfile.objects.bulk_create([
+                PesertaProfile(
+                    user=user,
+                    tipe_peserta=pendaftaran.tipe_peserta,
+                    nama_institusi=pendaftaran.nama_institusi,
+                    no_telepon=pendaftaran.no_telepon,
+                    penempatan_id=pendaftaran.pilihan_penempatan_id,
+                    nama_pembimbing=pendaftaran.nama_pembimbing,
+                    no_telepon_pembimbing=pendaftaran.no_telepon_pembimbing,
+                    email_pembimbing=pendaftaran.email_pembimbing,
+                )
+                for pendaftaran, user in zip(daftar_pendaftaran, users)
+            ])
+        return list(zip(daftar_pendaftaran, users, profil, passwords))
+
+    def delete(self, *args, **kwargs):
+        """ Override delete untuk melepas kuota yang ditempati pendaftaran ini. """
+        with transaction.atomic():
+            slot = self._slot_kuota(self.pilihan_penempatan_id, self.tipe_peserta, self.status)
+            hasil = super().delete(*args, **kwargs)
+            if slot:
+                Penempatan.objects.geser_kuota(*slot, -1)
+        return hasil
+
 
 class Absensi(models.Model):
     """ Mencatat kehadiran harian setiap peserta. """
@@ -89,18 +327,130 @@ class Absensi(models.Model):
     # 👇 TAMBAHKAN FIELD BARU DI BAWAH INI
     surat_dokter = models.FileField(_("Surat Dokter"), upload_to='surat_dokter/', blank=True, null=True, help_text="Upload surat dokter jika status sakit")
 
+    # Koordinat yang lolos validasi geofence saat check-in / check-out
+    lat_masuk = models.FloatField(_("Lintang Check-in"), null=True, blank=True)
+    lng_masuk = models.FloatField(_("Bujur Check-in"), null=True, blank=True)
+    lat_keluar = models.FloatField(_("Lintang Check-out"), null=True, blank=True)
+    lng_keluar = models.FloatField(_("Bujur Check-out"), null=True, blank=True)
+
+
+    def save(self, *args, **kwargs):
+        """
+        Menyimpan absensi sekaligus memperbarui sel rekap bulanan. Jika profil
+        atau tanggal diubah, sel lama dikosongkan lebih dulu.
+        """
+        with transaction.atomic():
+            lama = None
+            if not self._state.adding and self.pk:
+                lama = Absensi.objects.filter(pk=self.pk).values_list('profil_id', 'tanggal').first()
+            super().save(*args, **kwargs)
+
+            tanggal = self._meta.get_field('tanggal').to_python(self.tanggal)
+            if lama and lama != (self.profil_id, tanggal):
+                RekapAbsensiBulanan.objects.catat(*lama, None)
+            RekapAbsensiBulanan.objects.catat(self.profil_id, tanggal, self.status_kehadiran)
+        invalidate_dashboard_peserta(self.profil_id)
+
+    def delete(self, *args, **kwargs):
+        profil_id = self.profil_id
+        tanggal = self._meta.get_field('tanggal').to_python(self.tanggal)
+        with transaction.atomic():
+            hasil = super().delete(*args, **kwargs)
+            RekapAbsensiBulanan.objects.catat(profil_id, tanggal, None)
+        invalidate_dashboard_peserta(profil_id)
+        return hasil
 
     class Meta:
         verbose_name = "Absensi"
         verbose_name_plural = "Data Absensi"
         unique_together = ('profil', 'tanggal') # Satu absensi per hari untuk setiap peserta
         ordering = ['-tanggal']
+        indexes = [
+            # Rekap harian admin: filter tanggal lalu join ke profil (tipe peserta)
+            models.Index(fields=['tanggal', 'profil'], name='absensi_tanggal_idx'),
+        ]
 
     # 👇 Saya tambahkan __str__ untuk representasi objek yang lebih baik di admin (Opsional tapi direkomendasikan)
     def __str__(self):
         return f"{self.profil.user.nama_lengkap} - {self.tanggal} ({self.get_status_kehadiran_display()})"
 
 
+# Kode satu karakter per hari di RekapAbsensiBulanan.kode
+KODE_ABSENSI = {
+    Absensi.StatusKehadiran.HADIR: 'H',
+    Absensi.StatusKehadiran.IZIN: 'I',
+    Absensi.StatusKehadiran.SAKIT: 'S',
+    Absensi.StatusKehadiran.ALPHA: 'A',
+}
+KODE_KOSONG = '-'
+
+
+class RekapAbsensiQuerySet(models.QuerySet):
+    def catat(self, profil_id, tanggal, status_kehadiran):
+        """
+        Mengisi satu sel (profil, tanggal) dengan kode status; `None` untuk
+        mengosongkan. Baris rekap dikunci agar dua absensi di bulan yang sama
+        tidak saling menimpa.
+        """
+        bulan = tanggal.replace(day=1)
+        indeks = tanggal.day - 1
+        kode_baru = KODE_ABSENSI.get(status_kehadiran, KODE_KOSONG)
+        with transaction.atomic():
+            rekap, _ = self.select_for_update().get_or_create(
+                profil_id=profil_id, bulan=bulan,
+                defaults={'kode': KODE_KOSONG * monthrange(bulan.year, bulan.month)[1]},
+            )
+            if rekap.kode[indeks] != kode_baru:
+                rekap.kode = rekap.kode[:indeks] + kode_baru + rekap.kode[indeks + 1:]
+                rekap.save(update_fields=['kode'])
+
+    def bangun_ulang(self, bulan, profil_ids=None):
+        """
+        Menghitung ulang rekap satu bulan dari tabel Absensi. Dipakai oleh
+        penulisan massal (bulk_create/update) yang tidak melewati Absensi.save().
+        """
+        bulan = bulan.replace(day=1)
+        jumlah_hari = monthrange(bulan.year, bulan.month)[1]
+        absensi = Absensi.objects.filter(tanggal__range=(bulan, bulan.replace(day=jumlah_hari)))
+        rekap = self.filter(bulan=bulan)
+        if profil_ids is not None:
+            absensi = absensi.filter(profil_id__in=profil_ids)
+            rekap = rekap.filter(profil_id__in=profil_ids)
+
+        sel = {}
+        for profil_id, tanggal, status_kehadiran in absensi.values_list('profil_id', 'tanggal', 'status_kehadiran').iterator():
+            sel.setdefault(profil_id, [KODE_KOSONG] * jumlah_hari)[tanggal.day - 1] = KODE_ABSENSI.get(status_kehadiran, KODE_KOSONG)
+
+        with transaction.atomic():
+            rekap.exclude(profil_id__in=list(sel)).delete()
+            self.bulk_create(
+                [RekapAbsensiBulanan(profil_id=pid, bulan=bulan, kode=''.join(kode)) for pid, kode in sel.items()],
+                update_conflicts=True, unique_fields=['profil', 'bulan'], update_fields=['kode'],
+                batch_size=500,
+            )
+
+
+class RekapAbsensiBulanan(models.Model):
+    """
+    Rekap absensi per peserta per bulan: satu karakter per hari (H/I/S/A, '-'
+    jika kosong). Diperbarui setiap kali Absensi disimpan/dihapus, sehingga
+    matriks satu bulan cukup dibaca dari satu query berindeks.
+    """
+    profil = models.ForeignKey(PesertaProfile, on_delete=models.CASCADE, related_name='rekap_absensi')
+    bulan = models.DateField(_("Bulan"), help_text="Selalu tanggal 1 pada bulan tersebut.")
+    kode = models.CharField(_("Kode Harian"), max_length=31)
+
+    objects = RekapAbsensiQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Rekap Absensi Bulanan"
+        verbose_name_plural = "Rekap Absensi Bulanan"
+        unique_together = ('bulan', 'profil')
+
+    def __str__(self):
+        return f"Rekap {self.bulan:%Y-%m} - profil {self.profil_id}"
+
+
 class Laporan(models.Model):
     """ Mengelola pengumpulan laporan (harian/akhir) dari peserta. """
     class StatusReview(models.TextChoices):
@@ -123,10 +473,26 @@ class Laporan(models.Model):
     feedback_admin = models.TextField(_("Feedback dari Admin"), blank=True)
     disubmit_pada = models.DateTimeField(_("Tanggal Submit"), auto_now_add=True)
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        invalidate_dashboard_peserta(self.profil_id)
+
+    def delete(self, *args, **kwargs):
+        profil_id = self.profil_id
+        hasil = super().delete(*args, **kwargs)
+        invalidate_dashboard_peserta(profil_id)
+        return hasil
+
     class Meta:
         verbose_name = "Laporan Peserta"
         verbose_name_plural = "Laporan Peserta"
         ordering = ['-disubmit_pada']
+        indexes = [
+            # Urutan cursor daftar laporan admin
+            models.Index(fields=['-disubmit_pada', 'id'], name='laporan_submit_idx'),
+            # Filter status review di daftar admin, urutan terbaru tanpa sort tambahan
+            models.Index(fields=['status_review', '-disubmit_pada', 'id'], name='laporan_status_idx'),
+        ]
 
     # 👇 Saya tambahkan __str__ untuk representasi objek yang lebih baik (Opsional)
     def __str__(self):
@@ -158,6 +524,16 @@ class Sertifikat(models.Model):
         blank=True # Akan diisi otomatis oleh sistem
     )
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        invalidate_dashboard_peserta(self.profil_id)
+
+    def delete(self, *args, **kwargs):
+        profil_id = self.profil_id
+        hasil = super().delete(*args, **kwargs)
+        invalidate_dashboard_peserta(profil_id)
+        return hasil
+
     class Meta:
         verbose_name = "Sertifikat"
         verbose_name_plural = "Sertifikat"
@@ -170,4 +546,234 @@ class Sertifikat(models.Model):
             nama = self.profil.user.nama_lengkap or self.profil.user.email
             return f"Sertifikat: {self.nomor_sertifikat} - {nama}"
         except (AttributeError, PesertaProfile.DoesNotExist):
-            return f"Sertifikat {self.nomor_sertifikat}"
\ No newline at end of file
+            return f"Sertifikat {self.nomor_sertifikat}"
+
+
+class UrutanSertifikatQuerySet(models.QuerySet):
+    def berikutnya(self, tahun):
+        """ Nomor urut pertama yang belum dipakai pada `tahun` (tanpa mengunci). """
+        terakhir = self.filter(tahun=tahun).values_list('terakhir', flat=True).first()
+        return (terakhir or 0) + 1
+
+    def kunci(self, tahun):
+        """
+        Mengunci baris urutan `tahun` sampai transaksi selesai (UPDATE tanpa
+        perubahan nilai) dan mengembalikan nomor urut berikutnya. Hanya untuk
+        di dalam transaksi; setelah ini `pakai` dari transaksi yang sama pasti berhasil.
+        """
+        self.bulk_create([UrutanSertifikat(tahun=tahun)], ignore_conflicts=True)
+        self.filter(tahun=tahun).update(terakhir=F('terakhir'))
+        return self.berikutnya(tahun)
+
+    def pakai(self, tahun, awal, jumlah=1):
+        """
+        Memakai blok nomor [awal, awal + jumlah) dengan compare-and-set:
+        berhasil hanya jika nomor terakhir masih `awal - 1`. Dipanggil di
+        transaksi yang sama dengan INSERT Sertifikat, sehingga nomor ikut
+        batal saat transaksi batal (tanpa celah). False jika blok sudah
+        dipakai penerbitan lain.
+        """
+        def compare_and_set():
+            return bool(self.filter(tahun=tahun, terakhir=awal - 1).update(terakhir=awal - 1 + jumlah))
+
+        if compare_and_set():
+            return True
+        if awal != 1:
+            return False
+        # Sertifikat pertama di tahun ini: baris urutan mungkin belum ada
+        self.bulk_create([UrutanSertifikat(tahun=tahun)], ignore_conflicts=True)
+        return compare_and_set()
+
+
+class UrutanSertifikat(models.Model):
+    """
+    Nomor urut sertifikat terakhir per tahun (BBPBAT/CERT/<tahun>/<urut>).
+    Menggantikan pemindaian `nomor_sertifikat__startswith` yang bisa
+    membagikan nomor ganda saat penerbitan berjalan bersamaan.
+    """
+    tahun = models.PositiveSmallIntegerField(_("Tahun"), unique=True)
+    terakhir = models.PositiveIntegerField(_("Nomor Urut Terakhir"), default=0)
+
+    objects = UrutanSertifikatQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Urutan Nomor Sertifikat"
+        verbose_name_plural = "Urutan Nomor Sertifikat"
+
+    def __str__(self):
+        return f"{self.tahun}: {self.terakhir}"
+
+
+# Job yang DIPROSES lebih lama dari ini dianggap ditinggal worker yang mati
+# dan boleh diklaim ulang oleh worker lain.
+BATAS_WAKTU_PROSES_JOB = timedelta(minutes=10)
+
+
+class SertifikatJobQuerySet(models.QuerySet):
+    def aktif(self):
+        return self.filter(status__in=[SertifikatJob.Status.ANTRI, SertifikatJob.Status.DIPROSES])
+
+    def antrekan(self, profil_id, dibuat_oleh=None):
+        """
+        Memasukkan penerbitan sertifikat seorang peserta ke antrean. Satu
+        peserta hanya boleh punya satu job aktif (partial unique index), jadi
+        klik ganda mengembalikan job yang sama. Mengembalikan (job, baru).
+        """
+        try:
+            with transaction.atomic():
+                return self.create(profil_id=profil_id, dibuat_oleh=dibuat_oleh), True
+        except IntegrityError:
+            return self.aktif().get(profil_id=profil_id), False
+
+    def klaim(self, pekerja):
+        """
+        Mengambil satu job untuk `pekerja` dengan conditional UPDATE (status
+        masih ANTRI, atau DIPROSES tetapi sudah kedaluwarsa). Worker lain yang
+        kalah balapan mendapat 0 baris dan mencoba kandidat berikutnya, tanpa
+        mengunci tabel.
+        """
+        sekarang = timezone.now()
+        bisa_diklaim = (
+            Q(status=SertifikatJob.Status.ANTRI, tersedia_pada__lte=sekarang)
+            | Q(status=SertifikatJob.Status.DIPROSES, mulai_pada__lt=sekarang - BATAS_WAKTU_PROSES_JOB)
+        )
+        kandidat = self.filter(bisa_diklaim).order_by('tersedia_pada', 'pk').values_list('pk', flat=True)[:10]
+        for pk in kandidat:
+            diklaim = self.filter(bisa_diklaim, pk=pk).update(
+                status=SertifikatJob.Status.DIPROSES,
+                percobaan=F('percobaan') + 1,
+                pekerja=pekerja,
+                mulai_pada=sekarang,
+            )
+            if diklaim:
+                return self.get(pk=pk)
+        return None
+
+
+class SertifikatJob(models.Model):
+    """
+    Antrean penerbitan sertifikat. Request admin hanya membuat baris ini
+    (202 + id job); render PDF dan penyimpanan file dikerjakan oleh worker
+    `manage.py proses_sertifikat` di luar request dan di luar row lock.
+    """
+    class Status(models.TextChoices):
+        ANTRI = "ANTRI", "Menunggu"
+        DIPROSES = "DIPROSES", "Diproses"
+        SELESAI = "SELESAI", "Selesai"
+        GAGAL = "GAGAL", "Gagal"
+
+    MAKS_PERCOBAAN = 3
+
+    profil = models.ForeignKey(PesertaProfile, on_delete=models.CASCADE, related_name='sertifikat_job')
+    status = models.CharField(_("Status"), max_length=10, choices=Status.choices, default=Status.ANTRI)
+    percobaan = models.PositiveSmallIntegerField(_("Jumlah Percobaan"), default=0)
+    pesan_error = models.TextField(_("Pesan Error"), blank=True)
+    pekerja = models.CharField(_("Worker"), max_length=100, blank=True)
+    sertifikat = models.ForeignKey(Sertifikat, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    dibuat_oleh = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    dibuat_pada = models.DateTimeField(_("Dibuat Pada"), auto_now_add=True)
+    tersedia_pada = models.DateTimeField(_("Tersedia Pada"), default=timezone.now,
+                                         help_text="Job baru diambil worker setelah waktu ini (backoff retry).")
+    mulai_pada = models.DateTimeField(_("Mulai Diproses"), null=True, blank=True)
+    selesai_pada = models.DateTimeField(_("Selesai Pada"), null=True, blank=True)
+
+    objects = SertifikatJobQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Job Sertifikat"
+        verbose_name_plural = "Job Sertifikat"
+        ordering = ['-dibuat_pada', '-id']
+        indexes = [
+            # Query klaim worker: job ANTRI yang sudah tersedia, urut paling lama
+            models.Index(fields=['status', 'tersedia_pada'], name='sertifikatjob_antrean_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['profil'],
+                condition=Q(status__in=['ANTRI', 'DIPROSES']),
+                name='sertifikatjob_satu_aktif_per_profil',
+            ),
+        ]
+
+    def __str__(self):
+        return f"Job sertifikat #{self.pk} ({self.status})"
+
+    @property
+    def final(self):
+        return self.status in (self.Status.SELESAI, self.Status.GAGAL)
+
+    def tandai_selesai(self, sertifikat):
+        """ Dipanggil di dalam transaksi yang sama dengan penyimpanan Sertifikat. """
+        self.status = self.Status.SELESAI
+        self.sertifikat = sertifikat
+        self.pesan_error = ''
+        self.selesai_pada = timezone.now()
+        self.save(update_fields=['status', 'sertifikat', 'pesan_error', 'selesai_pada'])
+
+    def tandai_gagal(self, pesan, ulangi=True):
+        """
+        Mencatat kegagalan. Jika masih boleh diulang, job kembali ke ANTRI
+        dengan backoff eksponensial (2, 4, ... detik); selain itu GAGAL final.
+        """
+        self.pesan_error = pesan
+        if ulangi and self.percobaan < self.MAKS_PERCOBAAN:
+            self.status = self.Status.ANTRI
+            self.tersedia_pada = timezone.now() + timedelta(seconds=2 ** self.percobaan)
+        else:
+            self.status = self.Status.GAGAL
+            self.selesai_pada = timezone.now()
+        self.save(update_fields=['status', 'pesan_error', 'tersedia_pada', 'selesai_pada'])
+
+
+class Aktivitas(models.Model):
+    """
+    Feed aktivitas (append-only) untuk dashboard admin. Setiap peristiwa dicatat
+    saat terjadi, sehingga dashboard cukup membaca indeks (waktu, id) alih-alih
+    menggabungkan beberapa tabel pada setiap request.
+    """
+    class Tipe(models.TextChoices):
+        PENDAFTARAN = "PENDAFTARAN", "Pendaftaran Baru"
+        PERSETUJUAN = "PERSETUJUAN", "Pendaftaran Disetujui"
+        LAPORAN = "LAPORAN", "Laporan Diunggah"
+        PEMBAYARAN = "PEMBAYARAN", "Bukti Pembayaran Diunggah"
+        IZIN = "IZIN", "Pengajuan Izin/Sakit"
+        SERTIFIKAT = "SERTIFIKAT", "Sertifikat Diterbitkan"
+
+    tipe = models.CharField(_("Tipe Aktivitas"), max_length=20, choices=Tipe.choices)
+    teks = models.CharField(_("Teks Aktivitas"), max_length=255)
+    profil = models.ForeignKey(
+        PesertaProfile,
+        on_delete=models.SET_NULL,
+        null=True, blank=True,
+        related_name='aktivitas'
+    )
+    waktu = models.DateTimeField(_("Waktu"), default=timezone.now)
+
+    class Meta:
+        verbose_name = "Aktivitas"
+        verbose_name_plural = "Aktivitas"
+        ordering = ['-waktu', '-id']
+        indexes = [
+            # Mendukung keyset pagination feed (urut terbaru) dengan atau tanpa filter tipe
+            models.Index(fields=['-waktu', '-id'], name='aktivitas_waktu_idx'),
+            models.Index(fields=['tipe', '-waktu', '-id'], name='aktivitas_tipe_waktu_idx'),
+        ]
+
+    def __str__(self):
+        return f"[{self.tipe}] {self.teks}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Aktivitas bersifat append-only dan tidak dapat diubah.")
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def catat(cls, tipe, teks, profil=None):
+        """
+        Menambahkan satu peristiwa ke feed aktivitas. `profil` boleh berupa
+        PesertaProfile atau ProfilPesertaLazy (cukup atribut `pk`).
+        """
+        return cls.objects.create(tipe=tipe, teks=teks[:255], profil_id=profil.pk if profil else None)
+
@@ -1,113 +1,322 @@
 # apps/bimbingan/pdf_utils.py
 import io
 import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import NamedTuple, Optional
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import A4, landscape
 from reportlab.lib.colors import white, black
+from reportlab.pdfbase import pdfmetrics
 from pypdf import PdfReader, PdfWriter
+from pypdf.generic import ArrayObject, DecodedStreamObject, DictionaryObject, FloatObject, NameObject
 from django.conf import settings
 
-def generate_pdf_certificate(template_path, data):
+# Gunakan A4 Landscape (842 x 595 points)
+UKURAN_HALAMAN = landscape(A4)
+CENTER_X = UKURAN_HALAMAN[0] / 2
+
+# Nama Form XObject lapisan teks di resource halaman sertifikat
+NAMA_XOBJECT_TEKS = NameObject("/BBPBATTeks")
+
+class FieldSertifikat(NamedTuple):
     """
-    Menghasilkan file PDF sertifikat dengan mengisi template yang diberikan.
-    Menggunakan teknik 'whiteout' untuk menutupi placeholder yang ada.
+    Satu baris teks pada sertifikat. `teks` memuat placeholder data, mis.
+    "Nomor: {{NOMOR_SERTIFIKAT}}"; field hanya digambar jika semua
+    placeholder-nya ada di data. `rata` tengah/kiri/kanan relatif terhadap
+    `x`. Teks yang lebih lebar dari `lebar_maks` diperkecil sampai muat,
+    paling kecil `ukuran_min`. `kotak` (x, y, lebar, tinggi) adalah whiteout
+    yang menutupi placeholder tercetak di file template.
     """
-    
-    packet = io.BytesIO()
-    # Gunakan A4 Landscape (842 x 595 points)
-    can = canvas.Canvas(packet, pagesize=landscape(A4))
-    width, height = landscape(A4) # 842, 595
-    center_x = width / 2
-    
-    # Helper untuk menggambar teks dengan background putih (menutupi placeholder)
-    def draw_centered_text_with_bg(y, text, font_name="Helvetica-Bold", font_size=12, bg_width=400, bg_height=20, offset_y=0):
-        # Draw white rectangle to cover placeholder
-        # Rect coordinates: (x, y, width, height). y is bottom-left of rect.
-        # Text y is baseline. We need to adjust rect position relative to text baseline.
-        rect_x = center_x - (bg_width / 2)
-        rect_y = y - 5 # Sedikit ke bawah dari baseline teks
-        
-        can.setFillColor(white)
-        can.setStrokeColor(white)
-        can.rect(rect_x, rect_y, bg_width, bg_height, fill=1, stroke=1)
-        
-        # Draw Text
-        can.setFillColor(black)
-        can.setFont(font_name, font_size)
-        can.drawCentredString(center_x, y, text)
-
-    # --- KONFIGURASI KOORDINAT (Disesuaikan dengan Screenshot User) ---
-    
-    # 1. Nomor Sertifikat (Di bawah tulisan SERTIFIKAT)
-    if "{{NOMOR_SERTIFIKAT}}" in data:
-        # Estimasi posisi: y=420 (di bawah judul)
-        text = f"Nomor: {data['{{NOMOR_SERTIFIKAT}}']}"
-        draw_centered_text_with_bg(405, text, "Helvetica", 14, bg_width=300, bg_height=20)
+    teks: str
+    x: float
+    y: float
+    font: str
+    ukuran: float
+    rata: str = "tengah"
+    lebar_maks: Optional[float] = None
+    ukuran_min: Optional[float] = None
+    kotak: Optional[tuple] = None
 
-    # 2. Nama Peserta (Besar di tengah)
-    if "{{NAMA_LENGKAP}}" in data:
-        # Estimasi posisi: y=310 (overlaping placeholder NAMA MAHASISWA)
-        # Background name harus cukup lebar/tinggi
-        draw_centered_text_with_bg(310, data["{{NAMA_LENGKAP}}"], "Helvetica-Bold", 24, bg_width=500, bg_height=30)
 
-    # 3. Institusi (Di bawah Nama)
-    if "{{NAMA_INSTITUSI}}" in data:
-        # Estimasi posisi: y=285
-        draw_centered_text_with_bg(285, data["{{NAMA_INSTITUSI}}"], "Helvetica", 16, bg_width=400, bg_height=20)
+class TemplateSertifikat(NamedTuple):
+    """ File template PDF (di SERTIFIKAT_TEMPLATE_DIR) beserta profil tata letaknya. """
+    file: str
+    fields: tuple
+
 
-    # 4. Unit Penempatan (Di bagian "dengan judul : " atau "Unit Penempatan")
-    if "{{PENEMPATAN}}" in data:
-        # User screenshot shows "Unit Penempatan: PERPUSTAKAAN"
-        # Placeholder looks like it is around y=240
-        text = f"Unit Penempatan: {data['{{PENEMPATAN}}']}"
-        draw_centered_text_with_bg(240, text, "Helvetica-Bold", 14, bg_width=400, bg_height=20)
+def _field_tengah(teks, y, font, ukuran, kotak_lebar, kotak_tinggi, **opsi):
+    # Kotak whiteout sedikit ke bawah dari baseline agar descender ikut tertutup
+    kotak = (CENTER_X - kotak_lebar / 2, y - 5, kotak_lebar, kotak_tinggi)
+    return FieldSertifikat(teks, CENTER_X, y, font, ukuran, kotak=kotak, **opsi)
 
+
+# --- KONFIGURASI KOORDINAT (Disesuaikan dengan Screenshot User) ---
+FIELD_PELAJAR = (
+    # 1. Nomor Sertifikat (Di bawah tulisan SERTIFIKAT)
+    _field_tengah("Nomor: {{NOMOR_SERTIFIKAT}}", 405, "Helvetica", 14, 300, 20),
+    # 2. Nama Peserta (Besar di tengah, menimpa placeholder NAMA MAHASISWA)
+    _field_tengah("{{NAMA_LENGKAP}}", 310, "Helvetica-Bold", 24, 500, 30, lebar_maks=560, ukuran_min=14),
+    # 3. Institusi (Di bawah Nama)
+    _field_tengah("{{NAMA_INSTITUSI}}", 285, "Helvetica", 16, 400, 20, lebar_maks=560, ukuran_min=10),
+    # 4. Unit Penempatan (Di bagian "Unit Penempatan")
+    _field_tengah("Unit Penempatan: {{PENEMPATAN}}", 240, "Helvetica-Bold", 14, 400, 20, lebar_maks=560, ukuran_min=9),
     # 5. Periode / Tanggal (Di bawah penempatan)
-    if "{{TANGGAL_MULAI}}" in data and "{{TANGGAL_SELESAI}}" in data:
-        text = f"{data['{{TANGGAL_MULAI}}']} - {data['{{TANGGAL_SELESAI}}']}"
-        draw_centered_text_with_bg(215, text, "Helvetica", 12, bg_width=300, bg_height=18)
-
-    # 6. Tanggal Terbit / Tanda Tangan (Pojok Kanan Bawah)
-    # Ini biasanya tidak perlu whiteout karena area kosong, tapi bisa diatur
-    if "{{TANGGAL_TERBIT}}" in data:
-        can.setFillColor(black)
-        can.setFont("Helvetica", 11)
-        # Posisi di atas tanda tangan kepala balai
-        # Estimasi x=550, y=120 ?
-        # "Sukabumi, <<TanggalSelesai>>" -> Wait, template says Sukabumi.
-        # But data says Jambi/Sukabumi? Let's follow template "Sukabumi".
-        # We need to cover "<<TanggalSelesai>>" above the signature line.
-        
-        # Koordinat kira-kira di kanan bawah
-        date_text = f"Sukabumi, {data['{{TANGGAL_TERBIT}}']}"
-        
-        # Manual Whiteout for date area
-        can.setFillColor(white)
-        can.setStrokeColor(white)
-        # Rect di sekitar x=580, y=95
-        can.rect(560, 95, 200, 15, fill=1, stroke=1)
-        
-        can.setFillColor(black)
-        can.drawString(560, 98, date_text)
+    _field_tengah("{{TANGGAL_MULAI}} - {{TANGGAL_SELESAI}}", 215, "Helvetica", 12, 300, 18),
+    # 6. Tanggal Terbit di atas tanda tangan kepala balai (pojok kanan bawah),
+    #    menutupi "<<TanggalSelesai>>". Template memakai "Sukabumi" sebagai tempat terbit.
+    FieldSertifikat("Sukabumi, {{TANGGAL_TERBIT}}", 560, 98, "Helvetica", 11, rata="kiri",
+                    lebar_maks=230, ukuran_min=8, kotak=(560, 95, 200, 15)),
+)
+
+# Registry template per Sertifikat.TemplateType (kunci = nilai TemplateType).
+# Desain template umum/dinas belum ada, jadi peserta UMUM masih memakai file
+# dan koordinat template PKL/magang. Setelah file-nya tersedia di
+# certificate_templates/, ganti nama file dan FIELD-nya di sini.
+TEMPLATE_SERTIFIKAT = {
+    "PELAJAR": TemplateSertifikat("E_SERTIFIKAT_PKL_MAGANG.pdf", FIELD_PELAJAR),
+    "UMUM": TemplateSertifikat("E_SERTIFIKAT_PKL_MAGANG.pdf", FIELD_PELAJAR),
+}
+
+
+def _template(layout):
+    return TEMPLATE_SERTIFIKAT[layout] if isinstance(layout, str) else layout
+
+
+@lru_cache(maxsize=None)
+def _metrik_font(font_name):
+    """
+    Lebar setiap karakter (dalam point, untuk ukuran font 1) dihitung sekali
+    per font dari tabel lebar glyph reportlab. Karakter di luar encoding
+    font diukur saat pertama muncul lalu ikut disimpan.
+    """
+    font = pdfmetrics.getFont(font_name)
+    lebar = {}
+    for kode, lebar_glyph in enumerate(font.widths):
+        try:
+            karakter = bytes([kode]).decode("cp1252")
+        except UnicodeDecodeError:
+            continue
+        lebar[karakter] = lebar_glyph / 1000
+    return lebar
+
 
+def lebar_teks(teks, font_name, ukuran=1):
+    """ Lebar `teks` dalam point, memakai metrik font yang sudah di-cache. """
+    metrik = _metrik_font(font_name)
+    total = 0.0
+    for karakter in teks:
+        lebar = metrik.get(karakter)
+        if lebar is None:
+            lebar = metrik[karakter] = pdfmetrics.stringWidth(karakter, font_name, 1)
+        total += lebar
+    return total * ukuran
+
+
+@lru_cache(maxsize=16)
+def _siapkan_layout(fields):
+    """
+    Layout siap pakai: placeholder tiap field diurai dan metrik fontnya
+    dimuat sekali per profil, bukan pada setiap sertifikat.
+    """
+    siap = []
+    for field in fields:
+        _metrik_font(field.font)
+        siap.append((field, tuple(dict.fromkeys(re.findall(r"\{\{[A-Z_]+\}\}", field.teks)))))
+    return tuple(siap)
+
+
+def _field_terisi(fields, data):
+    """ (indeks, field, teks jadi) untuk field yang semua placeholder-nya ada di `data`. """
+    for i, (field, placeholders) in enumerate(_siapkan_layout(fields)):
+        if all(p in data for p in placeholders):
+            teks = field.teks
+            for p in placeholders:
+                teks = teks.replace(p, str(data[p]))
+            yield i, field, teks
+
+
+def _kunci_whiteout(fields, data):
+    """ Indeks field yang placeholder-nya perlu ditutup untuk `data` ini. """
+    return frozenset(i for i, field, _ in _field_terisi(fields, data) if field.kotak)
+
+
+def _gambar_whiteout(can, fields, kunci):
+    """ Lapisan statis: kotak putih di atas placeholder template. """
+    can.setFillColor(white)
+    can.setStrokeColor(white)
+    for i in sorted(kunci):
+        can.rect(*fields[i].kotak, fill=1, stroke=1)
+
+
+def _gambar_teks(can, fields, data):
+    """
+    Lapisan variabel: hanya teks milik satu peserta. Ukuran font yang muat di
+    `lebar_maks` dihitung langsung dari lebar teks pada ukuran 1 (lebar
+    berbanding lurus dengan ukuran), tanpa mengukur ulang berkali-kali.
+    """
+    can.setFillColor(black)
+    for _, field, teks in _field_terisi(fields, data):
+        lebar_satuan = lebar_teks(teks, field.font)
+        ukuran = field.ukuran
+        if field.lebar_maks and lebar_satuan * ukuran > field.lebar_maks:
+            ukuran = max(field.lebar_maks / lebar_satuan, field.ukuran_min or 0)
+        x = field.x
+        if field.rata == "tengah":
+            x -= lebar_satuan * ukuran / 2
+        elif field.rata == "kanan":
+            x -= lebar_satuan * ukuran
+        can.setFont(field.font, ukuran)
+        can.drawString(x, field.y, teks)
+
+
+def _halaman_overlay(gambar, *args):
+    packet = io.BytesIO()
+    can = canvas.Canvas(packet, pagesize=UKURAN_HALAMAN)
+    gambar(can, *args)
     can.save()
     packet.seek(0)
-    
+    return PdfReader(packet).pages[0]
+
+
+@lru_cache(maxsize=8)
+def _baca_template(template_path, mtime_ns):
+    """ Isi mentah file template, dibaca sekali per (path, mtime). """
+    with open(template_path, "rb") as berkas:
+        return berkas.read()
+
+
+@lru_cache(maxsize=16)
+def _halaman_dasar(template_path, mtime_ns, fields, kunci):
+    """
+    Halaman pertama template yang sudah di-parse dan sudah ditimpa lapisan
+    whiteout. Di-cache per (path, mtime, layout, field yang ditutup): file
+    template yang diganti otomatis dibaca ulang karena mtime-nya berubah.
+    Jangan diubah langsung; PdfWriter.add_page() menyalin halaman ini.
+    """
+    halaman = PdfReader(io.BytesIO(_baca_template(template_path, mtime_ns))).pages[0]
+    if kunci:
+        halaman.merge_page(_halaman_overlay(_gambar_whiteout, fields, kunci))
+    # Salin sekali agar semua objek ter-resolve dan tersimpan di reader;
+    # salinan berikutnya (bisa dari beberapa thread) tidak lagi membaca stream
+    PdfWriter().add_page(halaman)
+    return halaman
+
+
+def _stream(output, data):
+    stream = DecodedStreamObject()
+    stream.set_data(data)
+    return output._add_object(stream)
+
+
+def _tempel_overlay(output, page, overlay):
+    """
+    Menempelkan `overlay` ke `page` sebagai Form XObject: konten overlay
+    dibungkus apa adanya dengan resource-nya sendiri, lalu dipanggil dari
+    content stream tambahan. Berbeda dengan merge_page, content stream
+    template maupun overlay tidak perlu di-parse untuk mengganti nama resource.
+    """
+    form = DecodedStreamObject()
+    form.set_data(overlay.get_contents().get_data())
+    form.update({
+        NameObject("/Type"): NameObject("/XObject"),
+        NameObject("/Subtype"): NameObject("/Form"),
+        NameObject("/BBox"): ArrayObject(FloatObject(v) for v in overlay.mediabox),
+        NameObject("/Resources"): overlay["/Resources"].clone(output),
+    })
+
+    resources = page.setdefault(NameObject("/Resources"), DictionaryObject()).get_object()
+    xobject = resources.setdefault(NameObject("/XObject"), DictionaryObject()).get_object()
+    xobject[NAMA_XOBJECT_TEKS] = output._add_object(form)
+
+    konten = page.raw_get("/Contents") if "/Contents" in page else None
+    if konten is None:
+        konten = []
+    elif isinstance(konten.get_object(), ArrayObject):
+        konten = list(konten.get_object())
+    else:
+        konten = [konten]
+    # q/Q mengembalikan graphics state template sebelum lapisan teks digambar
+    page[NameObject("/Contents")] = ArrayObject([
+        _stream(output, b"q\n"), *konten, _stream(output, b"\nQ\n"),
+        _stream(output, f"q {NAMA_XOBJECT_TEKS} Do Q\n".encode()),
+    ])
+
+
+def hapus_cache_template():
+    _baca_template.cache_clear()
+    _halaman_dasar.cache_clear()
+    _siapkan_layout.cache_clear()
+
+
+def generate_pdf_certificate(template_path, data, layout="PELAJAR"):
+    """
+    Menghasilkan file PDF sertifikat dengan mengisi template yang diberikan.
+    Menggunakan teknik 'whiteout' untuk menutupi placeholder yang ada.
+    `layout` adalah kunci TEMPLATE_SERTIFIKAT (Sertifikat.TemplateType) atau
+    TemplateSertifikat yang menentukan posisi, font dan kotak setiap field.
+
+    Template (beserta whiteout-nya) di-parse sekali lalu di-cache; setiap
+    panggilan hanya menggambar lapisan teks peserta dan menggabungkannya ke
+    salinan halaman template.
+    """
     try:
-        new_pdf = PdfReader(packet)
-        existing_pdf = PdfReader(open(template_path, "rb"))
-        output = PdfWriter()
+        fields = _template(layout).fields
+        mtime_ns = os.stat(template_path).st_mtime_ns
+        halaman_dasar = _halaman_dasar(template_path, mtime_ns, fields, _kunci_whiteout(fields, data))
 
-        page = existing_pdf.pages[0]
-        page.merge_page(new_pdf.pages[0])
-        output.add_page(page)
+        output = PdfWriter()
+        page = output.add_page(halaman_dasar)
+        _tempel_overlay(output, page, _halaman_overlay(_gambar_teks, fields, data))
 
         output_stream = io.BytesIO()
         output.write(output_stream)
         output_stream.seek(0)
-        
+
         return output_stream
-        
+
     except Exception as e:
         print(f"Error merging PDF: {e}")
         raise e
+
+
+# Di bawah jumlah ini, biaya menyalakan process pool lebih mahal dari render-nya
+MIN_SERTIFIKAT_UNTUK_POOL = 4
+
+
+def _render_aman(template_path, data, layout):
+    """ Render satu sertifikat di proses worker; error dikembalikan, bukan dilempar. """
+    try:
+        return generate_pdf_certificate(template_path, data, layout).getvalue(), None
+    except Exception as e:
+        return None, str(e)
+
+
+def generate_pdf_certificate_massal(template_path, daftar_data, workers=None, layout="PELAJAR"):
+    """
+    Merender banyak sertifikat sekaligus. Mengembalikan list (bytes PDF, error)
+    berurutan sesuai `daftar_data`; satu sertifikat yang gagal tidak
+    membatalkan yang lain. `template_path` dan `layout` berlaku untuk semua
+    data, atau berupa list sejajar `daftar_data` untuk batch campuran
+    (mis. sertifikat PELAJAR dan UMUM sekaligus).
+
+    Render + merge PDF terikat CPU, jadi batch besar dibagi ke process pool
+    sebanyak `workers` (default `settings.SERTIFIKAT_RENDER_WORKERS` atau
+    jumlah CPU). Batch kecil atau mesin satu core dirender berurutan.
+    """
+    daftar_data = list(daftar_data)
+    if isinstance(template_path, (str, os.PathLike)):
+        template_path = [template_path] * len(daftar_data)
+    if isinstance(layout, (str, TemplateSertifikat)):
+        layout = [layout] * len(daftar_data)
+    workers = workers or getattr(settings, 'SERTIFIKAT_RENDER_WORKERS', None) or os.cpu_count() or 1
+    workers = min(workers, len(daftar_data))
+    if workers <= 1 or len(daftar_data) < MIN_SERTIFIKAT_UNTUK_POOL:
+        return list(map(_render_aman, template_path, daftar_data, layout))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(
+            _render_aman, template_path, daftar_data, layout,
+            chunksize=max(1, len(daftar_data) // (workers * 4)),
+        ))
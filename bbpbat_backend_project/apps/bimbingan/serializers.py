@@ -1,15 +1,18 @@
 # File: bbpbat_backend_project/apps/bimbingan/serializers.py
 
 from rest_framework import serializers
-from .models import Penempatan, Pendaftaran, Absensi, Laporan, Sertifikat
+from django.utils.timesince import timesince
+from .models import Penempatan, Pendaftaran, Absensi, Laporan, Sertifikat, SertifikatJob, Aktivitas, KuotaPenuhError
+from .geo_utils import validasi_poligon
 from apps.peserta.models import PesertaProfile
 
 
 # --- SERIALIZER UNTUK PUBLIK ---
 
 class PenempatanSerializer(serializers.ModelSerializer):
-    sisa_kuota_pelajar = serializers.SerializerMethodField()
-    sisa_kuota_umum = serializers.SerializerMethodField()
+    # Dibaca dari counter terdenormalisasi di Penempatan (tanpa query tambahan)
+    sisa_kuota_pelajar = serializers.IntegerField(read_only=True)
+    sisa_kuota_umum = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Penempatan
@@ -18,20 +21,6 @@ class PenempatanSerializer(serializers.ModelSerializer):
             'sisa_kuota_pelajar', 'kuota_umum', 'sisa_kuota_umum'
         ]
 
-    def get_sisa_kuota_pelajar(self, obj):
-        # ... (implementasi ada)
-        pendaftar_count = Pendaftaran.objects.filter(
-            pilihan_penempatan=obj, tipe_peserta='PELAJAR', status__in=['PENDING', 'DISETUJUI']
-        ).count()
-        return obj.kuota_pelajar - pendaftar_count
-
-    def get_sisa_kuota_umum(self, obj):
-        # ... (implementasi ada)
-        pendaftar_count = Pendaftaran.objects.filter(
-            pilihan_penempatan=obj, tipe_peserta='UMUM', status__in=['PENDING', 'DISETUJUI']
-        ).count()
-        return obj.kuota_umum - pendaftar_count
-
 
 class PendaftaranCreateSerializer(serializers.ModelSerializer):
     class Meta:
@@ -47,21 +36,32 @@ class PendaftaranCreateSerializer(serializers.ModelSerializer):
         tipe_peserta = self.initial_data.get('tipe_peserta')
         
         if tipe_peserta == 'PELAJAR':
-            pendaftar_count = Pendaftaran.objects.filter(
-                pilihan_penempatan=value, tipe_peserta='PELAJAR', status__in=['PENDING', 'DISETUJUI']
-            ).count()
-            if pendaftar_count >= value.kuota_pelajar:
+            if value.terisi_pelajar >= value.kuota_pelajar:
                 raise serializers.ValidationError("Kuota untuk pelajar di unit penempatan ini sudah penuh.")
         
         elif tipe_peserta == 'UMUM':
-            pendaftar_count = Pendaftaran.objects.filter(
-                pilihan_penempatan=value, tipe_peserta='UMUM', status__in=['PENDING', 'DISETUJUI']
-            ).count()
-            if pendaftar_count >= value.kuota_umum:
+            if value.terisi_umum >= value.kuota_umum:
                 raise serializers.ValidationError("Kuota untuk umum di unit penempatan ini sudah penuh.")
 
         return value
 
+    def create(self, validated_data):
+        """
+        Pengecekan di atas hanya pre-check cepat. Kursi baru benar-benar dipesan
+        oleh Pendaftaran.save() lewat conditional increment, jadi pendaftar yang
+        kalah balapan di kursi terakhir tetap mendapat error kuota penuh.
+        """
+        pendaftaran = Pendaftaran(**validated_data)
+        try:
+            pendaftaran.save()
+        except KuotaPenuhError as e:
+            # Transaksi sudah di-rollback; bersihkan file yang terlanjur tersimpan
+            if pendaftaran.surat_pengajuan:
+                pendaftaran.surat_pengajuan.delete(save=False)
+            raise serializers.ValidationError({'pilihan_penempatan': [str(e)]})
+        Aktivitas.catat(Aktivitas.Tipe.PENDAFTARAN, f"Pendaftaran baru dari {pendaftaran.nama_lengkap}")
+        return pendaftaran
+
 
 # --- SERIALIZER UNTUK KEBUTUHAN ADMIN ---
 
@@ -119,7 +119,35 @@ class AbsensiSerializer(serializers.ModelSerializer):
       # obj adalah instance Absensi. obj.status_kehadiran berisi 'HADIR', 'SAKIT', dll.
       # Kita ubah menjadi huruf kecil agar sesuai dengan helper di frontend.
       return obj.status_kehadiran.lower() if obj.status_kehadiran else None
-  
+
+
+class AbsensiBulkItemSerializer(serializers.Serializer):
+    """
+    Satu baris untuk aksi `bulk` di AbsensiAdminViewSet. Baris menimpa
+    status, jam, dan keterangan absensi (profil, tanggal); field jam yang
+    tidak dikirim dianggap kosong.
+    """
+    profil_id = serializers.IntegerField(min_value=1)
+    tanggal = serializers.DateField()
+    # Menerima 'hadir' (format frontend) maupun 'HADIR'
+    status = serializers.CharField()
+    jam_masuk = serializers.TimeField(required=False, allow_null=True, default=None)
+    jam_keluar = serializers.TimeField(required=False, allow_null=True, default=None)
+    keterangan = serializers.CharField(required=False, allow_blank=True, default='')
+
+    def validate_status(self, value):
+        value = value.upper()
+        if value not in Absensi.StatusKehadiran.values:
+            raise serializers.ValidationError(
+                f"Status harus salah satu dari: {', '.join(Absensi.StatusKehadiran.values)}."
+            )
+        return value
+
+    def validate(self, data):
+        if data['jam_masuk'] and data['jam_keluar'] and data['jam_keluar'] < data['jam_masuk']:
+            raise serializers.ValidationError({'jam_keluar': "Jam keluar tidak boleh sebelum jam masuk."})
+        return data
+
 # =================================================================
 #                 SERIALIZER UNTUK MANAJEMEN LAPORAN
 # =================================================================
@@ -233,6 +261,19 @@ class SertifikatDetailSerializer(serializers.ModelSerializer):
             'template_digunakan', 
             'peserta'
         ]
+
+
+class SertifikatJobSerializer(serializers.ModelSerializer):
+    """ Status job penerbitan sertifikat; `sertifikat` terisi setelah SELESAI. """
+    peserta_id = serializers.IntegerField(source='profil_id', read_only=True)
+    sertifikat = SertifikatDetailSerializer(read_only=True)
+
+    class Meta:
+        model = SertifikatJob
+        fields = [
+            'id', 'peserta_id', 'status', 'percobaan', 'pesan_error',
+            'dibuat_pada', 'mulai_pada', 'selesai_pada', 'sertifikat',
+        ]
         
 # =================================================================
 # ===== TAMBAHKAN DUA SERIALIZER BARU DI BAWAH INI UNTUK KUOTA ====
@@ -243,8 +284,8 @@ class PenempatanAdminSerializer(serializers.ModelSerializer):
     Serializer untuk MENAMPILKAN data kuota kepada Admin.
     Diperkaya dengan data kuota yang terisi untuk progress bar di UI.
     """
-    kuota_pelajar_terisi = serializers.SerializerMethodField()
-    kuota_umum_terisi = serializers.SerializerMethodField()
+    kuota_pelajar_terisi = serializers.IntegerField(source='terisi_pelajar', read_only=True)
+    kuota_umum_terisi = serializers.IntegerField(source='terisi_umum', read_only=True)
 
     class Meta:
         model = Penempatan
@@ -256,33 +297,29 @@ class PenempatanAdminSerializer(serializers.ModelSerializer):
             'kuota_pelajar_terisi',
             'kuota_umum',
             'kuota_umum_terisi',
+            'geofence_lat',
+            'geofence_lng',
+            'geofence_radius',
+            'geofence_poligon',
+            'wajib_lokasi',
         ]
 
-    def get_kuota_pelajar_terisi(self, obj):
-        """ Menghitung pendaftar Pelajar yang sudah diterima atau masih pending. """
-        return Pendaftaran.objects.filter(
-            pilihan_penempatan=obj,
-            tipe_peserta='PELAJAR',
-            status__in=[Pendaftaran.Status.PENDING, Pendaftaran.Status.DISETUJUI]
-        ).count()
-
-    def get_kuota_umum_terisi(self, obj):
-        """ Menghitung pendaftar Umum yang sudah diterima atau masih pending. """
-        return Pendaftaran.objects.filter(
-            pilihan_penempatan=obj,
-            tipe_peserta='UMUM',
-            status__in=[Pendaftaran.Status.PENDING, Pendaftaran.Status.DISETUJUI]
-        ).count()
-
 
 class PenempatanUpdateSerializer(serializers.ModelSerializer):
     """
     Serializer untuk MENGUBAH data kuota oleh Admin.
-    Hanya mengizinkan perubahan pada field kuota saja.
+    Hanya mengizinkan perubahan pada field kuota dan geofence absensi.
     """
     class Meta:
         model = Penempatan
-        fields = ['kuota_pelajar', 'kuota_umum']
+        fields = [
+            'kuota_pelajar', 'kuota_umum',
+            'geofence_lat', 'geofence_lng', 'geofence_radius', 'geofence_poligon', 'wajib_lokasi',
+        ]
+        extra_kwargs = {
+            'geofence_lat': {'min_value': -90, 'max_value': 90},
+            'geofence_lng': {'min_value': -180, 'max_value': 180},
+        }
 
     def validate_kuota_pelajar(self, value):
         if value < 0:
@@ -292,4 +329,30 @@ class PenempatanUpdateSerializer(serializers.ModelSerializer):
     def validate_kuota_umum(self, value):
         if value < 0:
             raise serializers.ValidationError("Kuota tidak boleh bernilai negatif.")
-        return value
\ No newline at end of file
+        return value
+
+    def validate_geofence_poligon(self, value):
+        if value in (None, []):
+            return None
+        try:
+            validasi_poligon(value)
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+        return value
+
+
+class AktivitasSerializer(serializers.ModelSerializer):
+    """
+    Serializer untuk feed aktivitas admin. Bentuknya sama dengan item
+    `aktivitas_terbaru` di dashboard (tipe, teks, waktu_raw, waktu).
+    """
+    waktu_raw = serializers.DateTimeField(source='waktu', read_only=True)
+    waktu = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Aktivitas
+        fields = ['id', 'tipe', 'teks', 'waktu_raw', 'waktu']
+
+    def get_waktu(self, obj):
+        return f"{timesince(obj.waktu)} yang lalu"
+
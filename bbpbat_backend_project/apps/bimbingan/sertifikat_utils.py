@@ -0,0 +1,374 @@
+# apps/bimbingan/sertifikat_utils.py
+"""
+Penerbitan sertifikat: validasi prasyarat, penomoran, render PDF dan
+penyimpanan. Penerbitan satuan dipanggil oleh worker antrean
+(`manage.py proses_sertifikat`), bukan langsung dari request, karena render +
+merge PDF bisa memakan waktu. Penerbitan massal merender paralel di process pool.
+"""
+import os
+import time
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateformat import DateFormat
+
+from apps.peserta.cache_utils import invalidate_dashboard_peserta
+from apps.peserta.models import BuktiPembayaran, PesertaProfile
+from .models import Aktivitas, Laporan, Sertifikat, SertifikatJob, UrutanSertifikat
+
+# Percobaan optimistis (render tanpa kunci) sebelum urutan nomor dikunci
+MAKS_PERCOBAAN_NOMOR = 3
+
+
+class SertifikatTidakValid(Exception):
+    """ Prasyarat penerbitan tidak terpenuhi; job tidak perlu dicoba ulang. """
+
+
+def direktori_template():
+    return getattr(settings, 'SERTIFIKAT_TEMPLATE_DIR', os.path.join(settings.BASE_DIR, 'certificate_templates'))
+
+
+def path_template(tipe=Sertifikat.TemplateType.PELAJAR):
+    """ Path template PDF untuk jenis sertifikat `tipe`; SertifikatTidakValid jika file tidak ada. """
+    from .pdf_utils import TEMPLATE_SERTIFIKAT
+
+    nama_file = TEMPLATE_SERTIFIKAT[tipe].file
+    template_path = os.path.join(direktori_template(), nama_file)
+    if not os.path.exists(template_path):
+        raise SertifikatTidakValid(f"File template PDF tidak ditemukan: {nama_file} di {template_path}")
+    return template_path
+
+
+def queryset_peserta_layak():
+    """ Peserta yang memenuhi syarat sertifikat dan belum menerimanya. """
+    # Syarat untuk peserta PELAJAR
+    syarat_pelajar = Q(
+        tipe_peserta=PesertaProfile.TipePeserta.PELAJAR,
+        laporan__status_review=Laporan.StatusReview.DITERIMA
+    )
+
+    # Syarat untuk peserta UMUM
+    # Asumsi status pembayaran yang valid adalah "Telah Diverifikasi"
+    syarat_umum = Q(
+        tipe_peserta=PesertaProfile.TipePeserta.UMUM,
+        pembayaran__status_verifikasi="Telah Diverifikasi"
+    )
+
+    return PesertaProfile.objects.filter(
+        syarat_pelajar | syarat_umum,  # <-- Logika ATAU (OR)
+        status=PesertaProfile.StatusPeserta.SELESAI,
+        sertifikat__isnull=True
+    ).distinct()
+
+
+def cek_prasyarat(peserta):
+    """ Melempar SertifikatTidakValid jika peserta belum boleh diberi sertifikat. """
+    if Sertifikat.objects.filter(profil_id=peserta.pk).exists():
+        raise SertifikatTidakValid("Peserta ini sudah memiliki sertifikat.")
+
+    if peserta.status != PesertaProfile.StatusPeserta.SELESAI:
+        raise SertifikatTidakValid("Peserta belum menyelesaikan program.")
+
+    if peserta.tipe_peserta == PesertaProfile.TipePeserta.PELAJAR:
+        # Syarat untuk Pelajar: Laporan Diterima
+        if not Laporan.objects.filter(profil_id=peserta.pk, status_review=Laporan.StatusReview.DITERIMA).exists():
+            raise SertifikatTidakValid("Error: Laporan akhir peserta belum diterima.")
+
+    elif peserta.tipe_peserta == PesertaProfile.TipePeserta.UMUM:
+        # Syarat untuk Umum: Pembayaran Diverifikasi
+        if not BuktiPembayaran.objects.filter(profil_id=peserta.pk, status_verifikasi="Telah Diverifikasi").exists():
+            raise SertifikatTidakValid("Error: Bukti pembayaran peserta belum diverifikasi.")
+
+
+def nomor_sertifikat(tahun, urut):
+    return f"BBPBAT/CERT/{tahun}/{str(urut).zfill(3)}"
+
+
+def _terbitkan_bernomor(tahun, siapkan, simpan, batal):
+    """
+    Menjalankan penerbitan dengan nomor urut tanpa celah dari UrutanSertifikat.
+
+    `siapkan(awal)` merender PDF dengan nomor mulai `awal` dan mengembalikan
+    list sertifikat siap simpan; `simpan(hasil)` menulis ke database;
+    `batal(hasil)` membuang file yang sudah ditulis.
+
+    Nomor diintip tanpa kunci, PDF dirender, lalu blok nomor dipakai dengan
+    compare-and-set di transaksi yang sama dengan INSERT. Jika penerbitan lain
+    lebih dulu memakai nomor tersebut, PDF dirender ulang. Percobaan terakhir
+    mengunci urutan sebelum render sehingga pasti selesai.
+    """
+    hasil = None
+    try:
+        for percobaan in range(1, MAKS_PERCOBAAN_NOMOR + 1):
+            terkunci = percobaan == MAKS_PERCOBAAN_NOMOR
+            if not terkunci:
+                awal = UrutanSertifikat.objects.berikutnya(tahun)
+                hasil = siapkan(awal)
+            with transaction.atomic():
+                if terkunci:
+                    awal = UrutanSertifikat.objects.kunci(tahun)
+                    hasil = siapkan(awal)
+                if UrutanSertifikat.objects.pakai(tahun, awal, len(hasil)):
+                    return simpan(hasil)
+            batal(hasil)
+            hasil = None
+    except Exception:
+        if hasil is not None:
+            batal(hasil)
+        raise
+
+
+def _hapus_file(daftar_sertifikat):
+    for sertifikat in daftar_sertifikat:
+        sertifikat.file_sertifikat.delete(save=False)
+
+
+def konteks_sertifikat(peserta, nomor_sertifikat, tanggal_terbit):
+    """ Data pengganti placeholder template untuk satu peserta. """
+    return {
+        "{{NAMA_LENGKAP}}": peserta.user.nama_lengkap or '',
+        "{{NAMA_INSTITUSI}}": peserta.nama_institusi or '',
+        "{{NOMOR_SERTIFIKAT}}": nomor_sertifikat,
+        "{{TANGGAL_TERBIT}}": DateFormat(tanggal_terbit).format('j F Y'),
+        "{{TANGGAL_MULAI}}": DateFormat(peserta.tanggal_mulai).format('j F Y') if peserta.tanggal_mulai else 'N/A',
+        "{{TANGGAL_SELESAI}}": DateFormat(peserta.tanggal_selesai).format('j F Y') if peserta.tanggal_selesai else 'N/A',
+        "{{PENEMPATAN}}": peserta.penempatan.nama if peserta.penempatan else 'N/A',
+    }
+
+
+def nama_file_sertifikat(peserta):
+    return f'Sertifikat_{peserta.user.nama_lengkap.replace(" ", "_")}.pdf'
+
+
+def template_untuk(peserta):
+    if peserta.tipe_peserta == PesertaProfile.TipePeserta.PELAJAR:
+        return Sertifikat.TemplateType.PELAJAR
+    return Sertifikat.TemplateType.UMUM
+
+
+def terbitkan_sertifikat(profil_id, job=None):
+    """
+    Menerbitkan sertifikat satu peserta dan mengembalikan objek Sertifikat.
+
+    PDF dirender dan ditulis ke storage di luar transaksi (lihat
+    _terbitkan_bernomor). Row lock PesertaProfile hanya dipegang untuk cek
+    ulang prasyarat, INSERT Sertifikat, update status LULUS dan (jika ada)
+    penandaan job SELESAI, sehingga hasil job selalu konsisten dengan
+    sertifikat yang tersimpan.
+    """
+    from .pdf_utils import generate_pdf_certificate
+
+    try:
+        peserta = PesertaProfile.objects.select_related('user', 'penempatan').get(pk=profil_id)
+    except PesertaProfile.DoesNotExist:
+        raise SertifikatTidakValid("Peserta tidak ditemukan.")
+    cek_prasyarat(peserta)
+    tipe = template_untuk(peserta)
+    template_path = path_template(tipe)
+
+    tanggal_terbit = timezone.localdate()
+
+    def siapkan(urut):
+        nomor = nomor_sertifikat(tanggal_terbit.year, urut)
+        pdf_stream = generate_pdf_certificate(template_path, konteks_sertifikat(peserta, nomor, tanggal_terbit), tipe)
+        sertifikat = Sertifikat(profil=peserta, nomor_sertifikat=nomor, template_digunakan=tipe)
+        sertifikat.file_sertifikat.save(nama_file_sertifikat(peserta), pdf_stream, save=False)
+        return [sertifikat]
+
+    def simpan(hasil):
+        [sertifikat] = hasil
+        terkunci = PesertaProfile.objects.select_for_update().select_related('user').get(pk=profil_id)
+        cek_prasyarat(terkunci)
+        sertifikat.profil = terkunci
+        sertifikat.save()
+
+        terkunci.status = PesertaProfile.StatusPeserta.LULUS
+        terkunci.save(update_fields=['status'])
+        Aktivitas.catat(
+            Aktivitas.Tipe.SERTIFIKAT,
+            f"Sertifikat {sertifikat.nomor_sertifikat} diterbitkan untuk {terkunci.user.nama_lengkap}",
+            profil=terkunci,
+        )
+        if job is not None:
+            job.tandai_selesai(sertifikat)
+        return sertifikat
+
+    # File yang sudah ditulis dibuang jika nomor kalah balapan atau transaksi batal
+    return _terbitkan_bernomor(tanggal_terbit.year, siapkan, simpan, _hapus_file)
+
+
+def proses_job(job):
+    """ Mengerjakan satu job yang sudah diklaim; kegagalan dicatat di job. """
+    try:
+        terbitkan_sertifikat(job.profil_id, job=job)
+    except SertifikatTidakValid as e:
+        # Sudah diterbitkan lewat jalur lain (mis. penerbitan massal)
+        sertifikat = Sertifikat.objects.filter(profil_id=job.profil_id).first()
+        if sertifikat is not None:
+            job.tandai_selesai(sertifikat)
+        else:
+            job.tandai_gagal(str(e), ulangi=False)
+    except Exception as e:
+        job.tandai_gagal(f"Gagal generate PDF: {e}")
+    return job
+
+
+class _PesertaBerubah(Exception):
+    """ Peserta dalam blok sudah diterbitkan lewat jalur lain selama render. """
+
+    def __init__(self, peserta_ids):
+        self.peserta_ids = peserta_ids
+        super().__init__(peserta_ids)
+
+
+def _alasan_tidak_layak(peserta_ids):
+    """ Alasan per id untuk peserta yang diminta tetapi tidak ikut diterbitkan. """
+    ada = dict(PesertaProfile.objects.filter(pk__in=peserta_ids).values_list('pk', 'status'))
+    punya_sertifikat = set(Sertifikat.objects.filter(profil_id__in=peserta_ids).values_list('profil_id', flat=True))
+    alasan = {}
+    for peserta_id in peserta_ids:
+        if peserta_id not in ada:
+            alasan[peserta_id] = "Peserta tidak ditemukan."
+        elif peserta_id in punya_sertifikat:
+            alasan[peserta_id] = "Peserta ini sudah memiliki sertifikat."
+        elif ada[peserta_id] != PesertaProfile.StatusPeserta.SELESAI:
+            alasan[peserta_id] = "Peserta belum menyelesaikan program."
+        else:
+            alasan[peserta_id] = "Laporan akhir belum diterima atau pembayaran belum diverifikasi."
+    return alasan
+
+
+def terbitkan_sertifikat_massal(peserta_ids=None, batas=None, workers=None):
+    """
+    Menerbitkan sertifikat untuk `peserta_ids` (atau semua peserta layak jika
+    None, maksimal `batas` peserta per panggilan).
+
+    Nomor dipakai sebagai satu blok dari UrutanSertifikat, PDF dirender
+    paralel di process pool dan ditulis ke storage di luar transaksi.
+    Transaksi akhirnya hanya berisi pemakaian blok nomor, cek ulang berkunci,
+    satu bulk_create Sertifikat, satu UPDATE status LULUS dan satu
+    bulk_create Aktivitas.
+
+    Mengembalikan dict berisi `diterbitkan` (list Sertifikat), `dilewati`
+    (list {peserta_id, alasan}) dan `sisa` (peserta layak yang belum diproses).
+    """
+    from .pdf_utils import generate_pdf_certificate_massal
+
+    layak = queryset_peserta_layak().select_related('user', 'penempatan').order_by('pk')
+    if peserta_ids is not None:
+        layak = layak.filter(pk__in=peserta_ids)
+    daftar_peserta = list(layak[:batas] if batas else layak)
+    sisa = max(layak.count() - len(daftar_peserta), 0) if batas and len(daftar_peserta) == batas else 0
+
+    dilewati = []
+    if peserta_ids is not None:
+        diambil = {peserta.pk for peserta in daftar_peserta}
+        tidak_layak = [peserta_id for peserta_id in peserta_ids if peserta_id not in diambil]
+        for peserta_id, alasan in _alasan_tidak_layak(tidak_layak).items():
+            dilewati.append({'peserta_id': peserta_id, 'alasan': alasan})
+
+    # Satu template per jenis sertifikat; peserta yang file templatenya tidak
+    # ada dilewati tanpa menggagalkan jenis lain
+    template_paths = {}
+    for tipe in {template_untuk(peserta) for peserta in daftar_peserta}:
+        try:
+            template_paths[tipe] = path_template(tipe)
+        except SertifikatTidakValid as e:
+            for peserta in daftar_peserta:
+                if template_untuk(peserta) == tipe:
+                    dilewati.append({'peserta_id': peserta.pk, 'alasan': str(e)})
+    daftar_peserta = [peserta for peserta in daftar_peserta if template_untuk(peserta) in template_paths]
+    if not daftar_peserta:
+        return {'diterbitkan': [], 'dilewati': dilewati, 'sisa': sisa}
+
+    tanggal_terbit = timezone.localdate()
+
+    def siapkan(urut):
+        """
+        Render paralel. Peserta yang gagal dirender dikeluarkan lalu sisanya
+        dirender ulang, agar nomor dalam blok tetap berurutan tanpa lubang.
+        """
+        while True:
+            nomor = [nomor_sertifikat(tanggal_terbit.year, urut + i) for i in range(len(daftar_peserta))]
+            tipe = [template_untuk(peserta) for peserta in daftar_peserta]
+            hasil_render = generate_pdf_certificate_massal(
+                [template_paths[t] for t in tipe],
+                [konteks_sertifikat(peserta, n, tanggal_terbit) for peserta, n in zip(daftar_peserta, nomor)],
+                workers=workers,
+                layout=tipe,
+            )
+            gagal = {peserta.pk: error for peserta, (_, error) in zip(daftar_peserta, hasil_render) if error is not None}
+            if not gagal:
+                break
+            for peserta_id, error in gagal.items():
+                dilewati.append({'peserta_id': peserta_id, 'alasan': f"Gagal generate PDF: {error}"})
+            daftar_peserta[:] = [peserta for peserta in daftar_peserta if peserta.pk not in gagal]
+
+        siap = []
+        for peserta, n, (pdf, _) in zip(daftar_peserta, nomor, hasil_render):
+            sertifikat = Sertifikat(profil=peserta, nomor_sertifikat=n, template_digunakan=template_untuk(peserta))
+            sertifikat.file_sertifikat.save(nama_file_sertifikat(peserta), ContentFile(pdf), save=False)
+            siap.append(sertifikat)
+        return siap
+
+    def simpan(siap):
+        # Cek ulang berkunci: peserta bisa saja sudah diterbitkan lewat job
+        # antrean selama PDF dirender. Nomor mereka tidak boleh hilang, jadi
+        # seluruh blok dibatalkan dan dirender ulang tanpa peserta tersebut.
+        ids = [sertifikat.profil_id for sertifikat in siap]
+        masih_layak = set(
+            PesertaProfile.objects.select_for_update()
+            .filter(pk__in=ids, status=PesertaProfile.StatusPeserta.SELESAI)
+            .values_list('pk', flat=True)
+        )
+        masih_layak -= set(Sertifikat.objects.filter(profil_id__in=masih_layak).values_list('profil_id', flat=True))
+        if len(masih_layak) != len(ids):
+            raise _PesertaBerubah(set(ids) - masih_layak)
+
+        diterbitkan = Sertifikat.objects.bulk_create(siap)
+        PesertaProfile.objects.filter(pk__in=ids).update(status=PesertaProfile.StatusPeserta.LULUS)
+        Aktivitas.objects.bulk_create([
+            Aktivitas(
+                tipe=Aktivitas.Tipe.SERTIFIKAT,
+                teks=f"Sertifikat {sertifikat.nomor_sertifikat} diterbitkan untuk {sertifikat.profil.user.nama_lengkap}"[:255],
+                profil_id=sertifikat.profil_id,
+            )
+            for sertifikat in diterbitkan
+        ])
+        return diterbitkan
+
+    while True:
+        try:
+            diterbitkan = _terbitkan_bernomor(tanggal_terbit.year, siapkan, simpan, _hapus_file)
+            break
+        except _PesertaBerubah as e:
+            for peserta_id in e.peserta_ids:
+                dilewati.append({'peserta_id': peserta_id, 'alasan': "Peserta ini sudah memiliki sertifikat."})
+            daftar_peserta[:] = [peserta for peserta in daftar_peserta if peserta.pk not in e.peserta_ids]
+
+    # bulk_create/update tidak memanggil save(): buang cache dashboard manual
+    invalidate_dashboard_peserta(*(sertifikat.profil_id for sertifikat in diterbitkan))
+    return {'diterbitkan': diterbitkan, 'dilewati': dilewati, 'sisa': sisa}
+
+
+def jalankan_worker(pekerja, sekali=False, interval=1.0, berhenti=None):
+    """
+    Loop worker: klaim job, kerjakan, ulangi. Jika antrean kosong, tidur
+    `interval` detik, atau keluar bila `sekali=True`. `berhenti` (Event)
+    dipakai proses induk untuk menghentikan worker di antara dua job.
+    Mengembalikan jumlah job yang dikerjakan.
+    """
+    diproses = 0
+    while not (berhenti and berhenti.is_set()):
+        job = SertifikatJob.objects.klaim(pekerja)
+        if job is None:
+            if sekali:
+                break
+            time.sleep(interval)
+            continue
+        proses_job(job)
+        diproses += 1
+    return diproses
@@ -1,11 +1,39 @@
 import os
+import shutil
+import signal
+import tempfile
+import multiprocessing
+import threading
+from io import StringIO
+import csv
+import importlib
+import datetime
+import io
+import unittest
+from unittest import mock
+import zipfile
+from xml.etree import ElementTree
+from django.core.exceptions import ValidationError
+from django.db import connection, connections
+from datetime import timedelta
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.core.cache import cache
+from django.core.management import call_command
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from rest_framework import status
-from rest_framework.test import APITestCase
-from .models import Penempatan, Pendaftaran
-from apps.peserta.models import PesertaProfile
+from rest_framework.test import APIClient, APITestCase
+import holidays
+from .utils import calculate_working_days, calculate_working_days_batch
+from .geo_utils import dalam_geofence, haversine_m, hitung_bbox, titik_dalam_poligon
+from . import pdf_utils
+from .pdf_utils import generate_pdf_certificate_massal
+from .models import Penempatan, Pendaftaran, Laporan, Aktivitas, Absensi, RekapAbsensiBulanan, Sertifikat, SertifikatJob, UrutanSertifikat
+from apps.peserta.models import PesertaProfile, BuktiPembayaran
+from apps.pengumuman.models import Pengumuman
 
 # Mengambil model User kustom yang sedang aktif
 User = get_user_model()
@@ -16,12 +44,13 @@ class BimbinganAPITests(APITestCase):
     Kelompok tes untuk endpoint API publik (pendaftaran).
     """
     def setUp(self):
+        cache.clear()
         self.penempatan1 = Penempatan.objects.create(nama="BIOFLOK NILA", kuota_pelajar=2, kuota_umum=1)
         self.penempatan2 = Penempatan.objects.create(nama="LAB KESEHATAN IKAN", kuota_pelajar=5, kuota_umum=3)
 
     # ... (tes-tes lama Anda dari 'test_list_penempatan' hingga 'test_create_pendaftaran_quota_full' tetap di sini) ...
     def test_list_penempatan(self):
-        url = reverse('daftar-penempatan')
+        url = reverse('penempatan-list')
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 2)
@@ -33,14 +62,14 @@ class BimbinganAPITests(APITestCase):
             nama_institusi="Univ Test", no_telepon="123", pilihan_penempatan=self.penempatan1,
             surat_pengajuan=SimpleUploadedFile("surat.pdf", b"file_content", content_type="application/pdf")
         )
-        url = reverse('daftar-penempatan')
+        url = reverse('penempatan-list')
         response = self.client.get(url)
         bioflok_data = next(item for item in response.data if item["nama"] == "BIOFLOK NILA")
         self.assertEqual(bioflok_data['sisa_kuota_pelajar'], 1)
         self.assertEqual(bioflok_data['sisa_kuota_umum'], 1)
 
     def test_create_pendaftaran_success(self):
-        url = reverse('buat-pendaftaran')
+        url = reverse('pendaftaran-create')
         dummy_file = SimpleUploadedFile("surat_pengajuan.pdf", b"file", content_type="application/pdf")
         data = {
             "email": "calonpeserta@test.com", "nama_lengkap": "Calon Peserta Baru",
@@ -59,7 +88,7 @@ class BimbinganAPITests(APITestCase):
             nama_institusi="Dinas Test", no_telepon="111", pilihan_penempatan=self.penempatan1,
             surat_pengajuan=SimpleUploadedFile("surat1.pdf", b"file", content_type="application/pdf")
         )
-        url = reverse('buat-pendaftaran')
+        url = reverse('pendaftaran-create')
         dummy_file = SimpleUploadedFile("surat2.pdf", b"file", content_type="application/pdf")
         data = {
             "email": "umum2@test.com", "nama_lengkap": "Umum Dua", "tipe_peserta": "UMUM",
@@ -149,4 +178,1590 @@ class AdminBimbinganAPITests(APITestCase):
         
         # Pastikan tidak ada User atau Profil yang dibuat
         self.assertFalse(User.objects.filter(email="calon@test.com").exists())
-        self.assertEqual(response.data['message'], "Pendaftaran telah ditolak.")
\ No newline at end of file
+        self.assertEqual(response.data['message'], "Pendaftaran telah ditolak.")
+
+class PenempatanKuotaQueryTests(APITestCase):
+    """
+    Memastikan daftar kuota (publik & admin) dihitung dalam jumlah query yang
+    tetap, tidak bertambah seiring bertambahnya unit penempatan.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.admin_user = User.objects.create_superuser(
+            email='admin@test.com', password='password123', nama_lengkap='Admin Test'
+        )
+
+    def buat_unit(self, jumlah):
+        for i in range(jumlah):
+            penempatan = Penempatan.objects.create(nama=f"UNIT {Penempatan.objects.count():03d}")
+            Pendaftaran.objects.create(
+                email=f"pelajar{penempatan.id}@test.com", nama_lengkap="Pelajar", tipe_peserta="PELAJAR",
+                nama_institusi="Univ Test", no_telepon="1", pilihan_penempatan=penempatan
+            )
+            Pendaftaran.objects.create(
+                email=f"umum{penempatan.id}@test.com", nama_lengkap="Umum", tipe_peserta="UMUM",
+                nama_institusi="Dinas Test", no_telepon="2", pilihan_penempatan=penempatan,
+                status=Pendaftaran.Status.DITOLAK
+            )
+
+    def test_query_count_konstan_untuk_daftar_publik(self):
+        url = reverse('penempatan-list')
+        self.buat_unit(2)
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data), 2)
+
+        self.buat_unit(10)
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data), 12)
+        # 1 pelajar aktif mengisi kuota; pendaftar umum yang DITOLAK tidak dihitung
+        self.assertTrue(all(item['sisa_kuota_pelajar'] == 9 for item in response.data))
+        self.assertTrue(all(item['sisa_kuota_umum'] == 5 for item in response.data))
+
+    def test_query_count_konstan_untuk_daftar_admin(self):
+        self.client.force_authenticate(user=self.admin_user)
+        url = reverse('admin-penempatan-list')
+        self.buat_unit(2)
+        with self.assertNumQueries(1):
+            self.client.get(url)
+
+        self.buat_unit(10)
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data), 12)
+        self.assertTrue(all(item['kuota_pelajar_terisi'] == 1 for item in response.data))
+        self.assertTrue(all(item['kuota_umum_terisi'] == 0 for item in response.data))
+
+
+class KuotaCounterTests(APITestCase):
+    """
+    Memastikan counter kuota terisi di Penempatan selalu sama dengan jumlah
+    Pendaftaran PENDING/DISETUJUI, termasuk lewat aksi approve/reject admin.
+    """
+
+    def setUp(self):
+        self.admin_user = User.objects.create_superuser(
+            email='admin@test.com', password='password123', nama_lengkap='Admin Test'
+        )
+        self.penempatan = Penempatan.objects.create(nama="UNIT COUNTER", kuota_pelajar=5, kuota_umum=5)
+
+    def buat_pendaftaran(self, email, tipe_peserta='PELAJAR'):
+        return Pendaftaran.objects.create(
+            email=email, nama_lengkap="Calon", tipe_peserta=tipe_peserta,
+            nama_institusi="Institusi", no_telepon="1", pilihan_penempatan=self.penempatan
+        )
+
+    def assertCounter(self, pelajar, umum):
+        self.penempatan.refresh_from_db()
+        self.assertEqual((self.penempatan.terisi_pelajar, self.penempatan.terisi_umum), (pelajar, umum))
+
+    def test_counter_bertambah_saat_pendaftaran_dibuat(self):
+        self.buat_pendaftaran("a@test.com")
+        self.buat_pendaftaran("b@test.com", tipe_peserta='UMUM')
+        self.assertCounter(1, 1)
+
+    def test_counter_mengikuti_approve_dan_reject(self):
+        disetujui = self.buat_pendaftaran("a@test.com")
+        ditolak = self.buat_pendaftaran("b@test.com")
+        self.client.force_authenticate(user=self.admin_user)
+
+        self.client.post(reverse('admin-pendaftaran-approve', kwargs={'pk': disetujui.pk}))
+        self.assertCounter(2, 0)  # PENDING -> DISETUJUI tetap menempati kuota
+
+        self.client.post(reverse('admin-pendaftaran-reject', kwargs={'pk': ditolak.pk}))
+        self.assertCounter(1, 0)
+
+    def test_counter_mengikuti_perubahan_status_tipe_dan_hapus(self):
+        pendaftaran = self.buat_pendaftaran("a@test.com")
+        pendaftaran.status = Pendaftaran.Status.DITOLAK
+        pendaftaran.save()
+        self.assertCounter(0, 0)
+
+        pendaftaran.status = Pendaftaran.Status.PENDING
+        pendaftaran.tipe_peserta = 'UMUM'
+        pendaftaran.save()
+        self.assertCounter(0, 1)
+
+        pendaftaran.delete()
+        self.assertCounter(0, 0)
+
+    def test_kembali_ke_kuota_unit_penuh_error_validasi(self):
+        penempatan = Penempatan.objects.create(nama="UNIT PENUH", kuota_pelajar=1, kuota_umum=1)
+        ditolak = Pendaftaran.objects.create(
+            email="x@test.com", nama_lengkap="Calon", tipe_peserta='PELAJAR', nama_institusi="Institusi",
+            no_telepon="1", pilihan_penempatan=penempatan, status=Pendaftaran.Status.DITOLAK,
+            surat_pengajuan="surat_pengajuan/x.pdf",
+        )
+        Pendaftaran.objects.create(
+            email="y@test.com", nama_lengkap="Calon", tipe_peserta='PELAJAR', nama_institusi="Institusi",
+            no_telepon="1", pilihan_penempatan=penempatan,
+        )
+        ditolak.status = Pendaftaran.Status.PENDING
+        with self.assertRaisesMessage(ValidationError, "sudah penuh"):
+            ditolak.clean()
+        # Status yang tidak berpindah slot tetap valid walau unit penuh
+        Pendaftaran.objects.get(email="y@test.com").clean()
+
+        # Django admin: form error (200), bukan 500 dari KuotaPenuhError
+        self.client.force_login(self.admin_user)
+        url = reverse('admin:bimbingan_pendaftaran_change', args=[ditolak.pk])
+        data = {
+            'email': ditolak.email, 'nama_lengkap': ditolak.nama_lengkap, 'tipe_peserta': 'PELAJAR',
+            'nama_institusi': ditolak.nama_institusi, 'no_telepon': '1',
+            'pilihan_penempatan': penempatan.pk, 'status': Pendaftaran.Status.PENDING,
+        }
+        response = self.client.post(url, data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertContains(response, "sudah penuh")
+        ditolak.refresh_from_db()
+        self.assertEqual(ditolak.status, Pendaftaran.Status.DITOLAK)
+
+        # Kursi terakhir diambil di antara clean() dan save(): pesan error, tanpa 500
+        with mock.patch.object(Pendaftaran, 'clean'):
+            response = self.client.post(url, data, follow=True)
+        self.assertContains(response, "Perubahan tidak disimpan")
+        self.assertNotContains(response, "berhasil diubah")
+        ditolak.refresh_from_db()
+        self.assertEqual(ditolak.status, Pendaftaran.Status.DITOLAK)
+        penempatan.refresh_from_db()
+        self.assertEqual(penempatan.terisi_pelajar, 1)
+
+    def test_update_kuota_tidak_menimpa_counter(self):
+        self.buat_pendaftaran("a@test.com")
+        self.penempatan.kuota_pelajar = 7
+        self.penempatan.save()  # instance lama masih menyimpan terisi_pelajar=0
+        self.assertCounter(1, 0)
+
+    def test_rebuild_kuota_melaporkan_dan_memperbaiki_drift(self):
+        self.buat_pendaftaran("a@test.com")
+        Penempatan.objects.filter(pk=self.penempatan.pk).update(terisi_pelajar=4, terisi_umum=2)
+
+        out = StringIO()
+        call_command('rebuild_kuota', '--dry-run', stdout=out)
+        self.assertIn("UNIT COUNTER: pelajar 4 -> 1, umum 2 -> 0", out.getvalue())
+        self.assertCounter(4, 2)
+
+        call_command('rebuild_kuota', stdout=StringIO())
+        self.assertCounter(1, 0)
+
+        out = StringIO()
+        call_command('rebuild_kuota', stdout=out)
+        self.assertIn("Semua counter kuota sudah sesuai.", out.getvalue())
+
+
+class ReservasiKuotaConcurrencyTests(TransactionTestCase):
+    """
+    Stress test: banyak submit pendaftaran bersamaan (multi-thread, koneksi DB
+    masing-masing) memperebutkan kursi terakhir. Tidak boleh ada unit yang
+    melampaui kuota_pelajar maupun kuota_umum.
+    """
+    JUMLAH_THREAD = 24
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root)
+        self.override.enable()
+        self.unit_a = Penempatan.objects.create(nama="UNIT A", kuota_pelajar=3, kuota_umum=2)
+        self.unit_b = Penempatan.objects.create(nama="UNIT B", kuota_pelajar=1, kuota_umum=1)
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_submit_bersamaan_tidak_melampaui_kuota(self):
+        url = reverse('pendaftaran-create')
+        barrier = threading.Barrier(self.JUMLAH_THREAD)
+        hasil = []
+
+        def submit(i):
+            penempatan = self.unit_a if i % 2 else self.unit_b
+            tipe_peserta = 'PELAJAR' if i % 4 < 2 else 'UMUM'
+            data = {
+                "email": f"calon{i}@test.com", "nama_lengkap": f"Calon {i}",
+                "tipe_peserta": tipe_peserta, "nama_institusi": "Institusi", "no_telepon": "1",
+                "pilihan_penempatan": penempatan.id,
+                "surat_pengajuan": SimpleUploadedFile(f"surat{i}.pdf", b"file", content_type="application/pdf"),
+            }
+            try:
+                barrier.wait()
+                response = APIClient().post(url, data, format='multipart')
+                hasil.append((response.status_code, str(response.data)))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=submit, args=(i,)) for i in range(self.JUMLAH_THREAD)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        kode_status = [kode for kode, _ in hasil]
+        self.assertEqual(len(hasil), self.JUMLAH_THREAD)
+        self.assertTrue(set(kode_status) <= {status.HTTP_201_CREATED, status.HTTP_400_BAD_REQUEST})
+        for kode, pesan in hasil:
+            if kode == status.HTTP_400_BAD_REQUEST:
+                self.assertIn("sudah penuh", pesan)
+
+        total_kuota = 0
+        for unit in (self.unit_a, self.unit_b):
+            unit.refresh_from_db()
+            for tipe_peserta, kuota, terisi in (
+                ('PELAJAR', unit.kuota_pelajar, unit.terisi_pelajar),
+                ('UMUM', unit.kuota_umum, unit.terisi_umum),
+            ):
+                jumlah = Pendaftaran.objects.filter(pilihan_penempatan=unit, tipe_peserta=tipe_peserta).count()
+                self.assertLessEqual(jumlah, kuota)
+                self.assertEqual(jumlah, terisi)
+                total_kuota += kuota
+        # Permintaan jauh lebih banyak dari kursi: semua kursi terisi, sisanya ditolak
+        self.assertEqual(kode_status.count(status.HTTP_201_CREATED), total_kuota)
+
+
+class PenempatanListCacheTests(APITestCase):
+    """
+    Daftar penempatan publik dilayani dari cache dengan ETag kuat dan
+    diinvalidasi saat kuota atau pendaftaran sebuah unit berubah.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('penempatan-list')
+        self.penempatan = Penempatan.objects.create(nama="UNIT CACHE", kuota_pelajar=2, kuota_umum=1)
+
+    def test_request_kedua_dilayani_dari_cache(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['ETag'].startswith('"'))
+
+        with self.assertNumQueries(0):
+            response_cache = self.client.get(self.url)
+        self.assertEqual(response_cache.data, response.data)
+        self.assertEqual(response_cache['ETag'], response['ETag'])
+
+    def test_if_none_match_mengembalikan_304(self):
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        self.assertFalse(response.content)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH='"etag-lama"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_cache_diinvalidasi_saat_pendaftaran_dan_kuota_berubah(self):
+        etag_awal = self.client.get(self.url)['ETag']
+
+        pendaftaran = Pendaftaran.objects.create(
+            email="calon@test.com", nama_lengkap="Calon", tipe_peserta="PELAJAR",
+            nama_institusi="Institusi", no_telepon="1", pilihan_penempatan=self.penempatan
+        )
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag_awal)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['sisa_kuota_pelajar'], 1)
+
+        pendaftaran.status = Pendaftaran.Status.DITOLAK
+        pendaftaran.save()
+        self.assertEqual(self.client.get(self.url).data[0]['sisa_kuota_pelajar'], 2)
+
+        self.penempatan.kuota_umum = 4
+        self.penempatan.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.data[0]['kuota_umum'], 4)
+        self.assertEqual(response.data[0]['sisa_kuota_umum'], 4)
+
+    def test_rebuild_kuota_menginvalidasi_cache(self):
+        # Counter drift (tanpa pendaftaran) dan cache sudah dibangun dari nilai itu
+        Penempatan.objects.filter(pk=self.penempatan.pk).update(terisi_pelajar=2)
+        self.assertEqual(self.client.get(self.url).data[0]['sisa_kuota_pelajar'], 0)
+        call_command('rebuild_kuota', stdout=StringIO())
+        self.assertEqual(self.client.get(self.url).data[0]['sisa_kuota_pelajar'], 2)
+
+    def test_berjalan_dengan_file_based_cache(self):
+        lokasi = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, lokasi, ignore_errors=True)
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': lokasi,
+        }}):
+            etag = self.client.get(self.url)['ETag']
+            with self.assertNumQueries(0):
+                response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+            self.penempatan.kuota_pelajar = 9
+            self.penempatan.save()
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data[0]['sisa_kuota_pelajar'], 9)
+
+
+class AdminDashboardStatsTests(APITestCase):
+    """
+    Dashboard admin dihitung dengan jumlah query yang tetap (satu aggregate per
+    tabel + satu UNION aktivitas) dan di-cache dengan TTL pendek.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.admin_user = User.objects.create_superuser(
+            email='admin@test.com', password='password123', nama_lengkap='Admin Test'
+        )
+        self.penempatan = Penempatan.objects.create(nama="UNIT DASHBOARD", kuota_pelajar=100)
+        self.url = reverse('admin-dashboard-stats')
+        self.client.force_authenticate(user=self.admin_user)
+
+    def buat_data(self, jumlah):
+        mulai = Pendaftaran.objects.count()
+        for i in range(mulai, mulai + jumlah):
+            Pendaftaran.objects.create(
+                email=f"calon{i}@test.com", nama_lengkap=f"Calon {i}", tipe_peserta="PELAJAR",
+                nama_institusi="Institusi", no_telepon="1", pilihan_penempatan=self.penempatan
+            )
+            Aktivitas.catat(Aktivitas.Tipe.PENDAFTARAN, f"Pendaftaran baru dari Calon {i}")
+            user = User.objects.create_user(email=f"peserta{i}@test.com", password="x", nama_lengkap=f"Peserta {i}")
+            profil = PesertaProfile.objects.create(
+                user=user, tipe_peserta='PELAJAR', nama_institusi='Institusi',
+                status=PesertaProfile.StatusPeserta.SELESAI if i % 2 else PesertaProfile.StatusPeserta.AKTIF
+            )
+            Laporan.objects.create(profil=profil, judul="Laporan", file="laporan_peserta/laporan.pdf")
+            Aktivitas.catat(Aktivitas.Tipe.LAPORAN, f"Laporan baru dari Peserta {i}", profil=profil)
+
+    def test_query_count_tetap_dan_hasil_cache(self):
+        self.buat_data(2)
+        with self.assertNumQueries(4):
+            self.client.get(self.url)
+
+        cache.clear()
+        self.buat_data(8)
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.data['stats'], {
+            'pendaftar_baru': 10, 'peserta_aktif': 5, 'peserta_selesai': 5, 'peserta_lulus': 0,
+            'laporan_baru': 10, 'laporan_direview': 0, 'laporan_diterima': 0,
+        })
+        aktivitas = response.data['aktivitas_terbaru']
+        self.assertEqual(len(aktivitas), 5)
+        waktu = [a['waktu_raw'] for a in aktivitas]
+        self.assertEqual(waktu, sorted(waktu, reverse=True))
+        # Data terakhir yang dibuat adalah laporan milik Peserta 9
+        self.assertEqual(aktivitas[0]['teks'], "Laporan baru dari Peserta 9")
+        self.assertEqual(aktivitas[1]['teks'], "Pendaftaran baru dari Calon 9")
+
+        with self.assertNumQueries(0):
+            response_cache = self.client.get(self.url)
+        self.assertEqual(response_cache.data['stats'], response.data['stats'])
+
+
+class AktivitasFeedTests(APITestCase):
+    """
+    Feed aktivitas dicatat saat peristiwa terjadi dan dibaca dengan keyset
+    pagination (cursor) tanpa duplikasi maupun baris yang terlewat.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.admin_user = User.objects.create_superuser(
+            email='admin@test.com', password='password123', nama_lengkap='Admin Test'
+        )
+        self.penempatan = Penempatan.objects.create(nama="UNIT FEED", kuota_pelajar=5)
+        self.url = reverse('admin-aktivitas-list')
+
+    def test_pendaftaran_dan_persetujuan_tercatat(self):
+        response = self.client.post(reverse('pendaftaran-create'), {
+            "email": "calon@test.com", "nama_lengkap": "Calon Feed", "tipe_peserta": "PELAJAR",
+            "nama_institusi": "Institusi", "no_telepon": "1", "pilihan_penempatan": self.penempatan.id,
+            "surat_pengajuan": SimpleUploadedFile("surat.pdf", b"file", content_type="application/pdf"),
+        }, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        self.client.force_authenticate(user=self.admin_user)
+        pendaftaran = Pendaftaran.objects.get(email="calon@test.com")
+        self.client.post(reverse('admin-pendaftaran-approve', kwargs={'pk': pendaftaran.pk}))
+
+        response = self.client.get(self.url)
+        self.assertEqual(
+            [(a['tipe'], a['teks']) for a in response.data['results']],
+            [('PERSETUJUAN', "Pendaftaran Calon Feed disetujui"), ('PENDAFTARAN', "Pendaftaran baru dari Calon Feed")]
+        )
+        self.assertIsNone(response.data['next'])
+
+        dashboard = self.client.get(reverse('admin-dashboard-stats'))
+        self.assertEqual(dashboard.data['aktivitas_terbaru'][0]['teks'], "Pendaftaran Calon Feed disetujui")
+
+    def test_keyset_pagination_menelusuri_seluruh_riwayat(self):
+        waktu = timezone.now()
+        # Beberapa aktivitas sengaja memiliki waktu yang sama untuk menguji tie-breaker id
+        Aktivitas.objects.bulk_create([
+            Aktivitas(tipe=Aktivitas.Tipe.LAPORAN, teks=f"Aktivitas {i}", waktu=waktu - timedelta(minutes=i // 3))
+            for i in range(25)
+        ])
+        self.client.force_authenticate(user=self.admin_user)
+
+        dilihat = []
+        url = f"{self.url}?page_size=4"
+        while url:
+            with self.assertNumQueries(1):
+                response = self.client.get(url)
+            dilihat += [a['id'] for a in response.data['results']]
+            url = response.data['next']
+
+        urutan_benar = list(Aktivitas.objects.order_by('-waktu', '-id').values_list('id', flat=True))
+        self.assertEqual(dilihat, urutan_benar)
+
+    def test_aktivitas_bersifat_append_only(self):
+        aktivitas = Aktivitas.catat(Aktivitas.Tipe.PENDAFTARAN, "Pendaftaran baru")
+        aktivitas.teks = "Diubah"
+        with self.assertRaises(ValueError):
+            aktivitas.save()
+
+    def test_cursor_tidak_valid(self):
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.get(f"{self.url}?cursor=bukan-cursor")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class AdminListPaginationTests(APITestCase):
+    """
+    Tes cursor pagination pada daftar admin beserta mode kompatibilitas (daftar datar).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(email='admin-page@test.com', password='password123', nama_lengkap='Admin')
+        waktu_sama = timezone.now()
+        for i in range(5):
+            # Nama sama agar urutan bergantung pada id sebagai pemecah seri
+            user = User.objects.create_user(email=f'peserta{i}@test.com', password='password123', nama_lengkap='Peserta Sama')
+            profil = PesertaProfile.objects.create(user=user, tipe_peserta='PELAJAR', nama_institusi='Kampus')
+            Laporan.objects.create(profil=profil, judul=f'Laporan {i}', file='laporan_peserta/x.pdf')
+            Absensi.objects.create(profil=profil, tanggal=waktu_sama.date(), status_kehadiran='HADIR')
+        Laporan.objects.update(disubmit_pada=waktu_sama)
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.admin)
+
+    def ambil_semua_halaman(self, url):
+        ids, halaman = [], 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids += [item['id'] for item in response.data['results']]
+            url = response.data['next']
+            halaman += 1
+        return ids, halaman
+
+    def test_tanpa_parameter_tetap_daftar_datar(self):
+        response = self.client.get(reverse('admin-laporan-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 5)
+
+    def test_cursor_menelusuri_semua_baris_tanpa_duplikat(self):
+        for nama_url in ('admin-laporan-list', 'admin-absensi-list'):
+            ids, halaman = self.ambil_semua_halaman(reverse(nama_url) + '?page_size=2')
+            self.assertEqual(halaman, 3)
+            self.assertEqual(len(ids), 5)
+            self.assertEqual(len(set(ids)), 5)
+
+    def test_cursor_tidak_valid_ditolak(self):
+        response = self.client.get(reverse('admin-laporan-list') + '?cursor=bukan-cursor')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_daftar_pendaftaran_admin_bisa_dipaginasi(self):
+        penempatan = Penempatan.objects.create(nama='UNIT PAGE', kuota_pelajar=10, kuota_umum=10)
+        for i in range(3):
+            Pendaftaran.objects.create(
+                email=f'daftar{i}@test.com', nama_lengkap=f'Pendaftar {i}', tipe_peserta='UMUM',
+                nama_institusi='Dinas', no_telepon='0812', pilihan_penempatan=penempatan,
+                surat_pengajuan='surat_pengajuan/x.pdf',
+            )
+        response = self.client.get(reverse('admin-pendaftaran-list') + '?page_size=2')
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertEqual(response.data['results'][0]['nama_lengkap'], 'Pendaftar 2')
+        ids, _ = self.ambil_semua_halaman(reverse('admin-pendaftaran-list') + '?page_size=2')
+        self.assertEqual(len(set(ids)), 3)
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', "Rencana query diperiksa dengan EXPLAIN QUERY PLAN SQLite")
+class QueryPlanTests(APITestCase):
+    """
+    Regresi rencana query untuk filter yang paling sering dipakai: setiap query
+    harus mencari lewat indeks komposit, bukan memindai seluruh tabel.
+    """
+
+    def assertPakaiIndeks(self, queryset, nama_indeks, tanpa_sort=False):
+        rencana = queryset.explain()
+        tabel = queryset.model._meta.db_table
+        self.assertIn(nama_indeks, rencana, rencana)
+        # "SCAN tabel" tanpa indeks berarti full table scan
+        self.assertNotRegex(rencana, rf'SCAN {tabel}(?! USING)', rencana)
+        if tanpa_sort:
+            self.assertNotIn('TEMP B-TREE', rencana, rencana)
+
+    def test_absensi_per_tanggal_dan_tipe(self):
+        self.assertPakaiIndeks(
+            Absensi.objects.filter(tanggal='2024-01-01', profil__tipe_peserta='PELAJAR'),
+            'absensi_tanggal_idx',
+        )
+
+    def test_laporan_per_status_terbaru(self):
+        self.assertPakaiIndeks(
+            Laporan.objects.filter(status_review='BARU').order_by('-disubmit_pada', 'id'),
+            'laporan_status_idx', tanpa_sort=True,
+        )
+
+    def test_pendaftaran_per_unit_tipe_status(self):
+        self.assertPakaiIndeks(
+            # Bentuk query hitung kuota (count/exists tanpa ORDER BY)
+            Pendaftaran.objects.filter(pilihan_penempatan=1, tipe_peserta='UMUM', status='PENDING').order_by(),
+            'pendaftaran_slot_idx',
+        )
+
+    def test_profil_per_status_dan_tipe(self):
+        self.assertPakaiIndeks(
+            PesertaProfile.objects.filter(status='AKTIF', tipe_peserta='PELAJAR'),
+            'profil_status_tipe_idx',
+        )
+
+    def test_pembayaran_per_status_terbaru(self):
+        self.assertPakaiIndeks(
+            BuktiPembayaran.objects.filter(status_verifikasi='Menunggu Verifikasi').order_by('-diunggah_pada', 'id'),
+            'pembayaran_status_idx', tanpa_sort=True,
+        )
+
+    def test_daftar_peserta_urut_nama(self):
+        self.assertPakaiIndeks(
+            PesertaProfile.objects.select_related('user', 'penempatan').order_by('user__nama_lengkap', 'id'),
+            'user_nama_idx',
+        )
+
+    def test_pengumuman_terbit_per_target(self):
+        self.assertPakaiIndeks(
+            Pengumuman.objects.filter(status='PUBLISHED', target_peserta__in=['Semua Peserta', 'UMUM']).order_by('-dibuat_pada'),
+            'pengumuman_status_idx',
+        )
+
+
+class AbsensiExportTests(APITestCase):
+    """
+    Tes ekspor absensi (CSV/XLSX) yang di-stream untuk rentang tanggal.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(email='admin-ekspor@test.com', password='password123', nama_lengkap='Admin')
+        cls.unit = Penempatan.objects.create(nama='UNIT EKSPOR', kuota_pelajar=5, kuota_umum=5)
+        data = [('Budi', 'PELAJAR', cls.unit), ('Sari', 'UMUM', None)]
+        for i, (nama, tipe, unit) in enumerate(data):
+            user = User.objects.create_user(email=f'ekspor{i}@test.com', password='password123', nama_lengkap=nama)
+            profil = PesertaProfile.objects.create(user=user, tipe_peserta=tipe, nama_institusi='Kampus', penempatan=unit)
+            for hari in range(1, 4):
+                Absensi.objects.create(
+                    profil=profil, tanggal=f'2024-03-0{hari}', status_kehadiran='HADIR',
+                    keterangan='Catatan, dengan "kutip"' if hari == 2 else '',
+                )
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.admin)
+        self.url = reverse('admin-absensi-export')
+
+    def baca_csv(self, response):
+        konten = b''.join(response.streaming_content).decode('utf-8-sig')
+        return list(csv.reader(io.StringIO(konten)))
+
+    def test_ekspor_csv_rentang_tanggal(self):
+        response = self.client.get(self.url, {'mulai': '2024-03-02', 'selesai': '2024-03-03'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertIn('absensi_20240302_20240303.csv', response['Content-Disposition'])
+
+        baris = self.baca_csv(response)
+        self.assertEqual(baris[0][:3], ['Tanggal', 'Nama Peserta', 'Email'])
+        self.assertEqual(len(baris), 5)
+        self.assertEqual(baris[1][:2], ['2024-03-02', 'Budi'])
+        self.assertEqual(baris[1][5], 'UNIT EKSPOR')
+        self.assertEqual(baris[1][9], 'Catatan, dengan "kutip"')
+
+    def test_ekspor_dengan_filter_tipe_dan_penempatan(self):
+        response = self.client.get(self.url, {'mulai': '2024-03-01', 'selesai': '2024-03-31', 'tipe_peserta': 'general'})
+        self.assertEqual({b[1] for b in self.baca_csv(response)[1:]}, {'Sari'})
+
+        response = self.client.get(self.url, {'mulai': '2024-03-01', 'selesai': '2024-03-31', 'penempatan': self.unit.pk})
+        self.assertEqual({b[1] for b in self.baca_csv(response)[1:]}, {'Budi'})
+
+    def test_ekspor_xlsx_valid(self):
+        response = self.client.get(self.url, {'mulai': '2024-03-01', 'selesai': '2024-03-31', 'berkas': 'xlsx'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        arsip = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertIsNone(arsip.testzip())
+        self.assertIn('xl/workbook.xml', arsip.namelist())
+
+        ns = {'s': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+        sheet = ElementTree.fromstring(arsip.read('xl/worksheets/sheet1.xml'))
+        rows = sheet.findall('.//s:row', ns)
+        self.assertEqual(len(rows), 7)
+        self.assertEqual(rows[1].find('.//s:t', ns).text, '2024-03-01')
+
+    def test_parameter_tidak_valid_ditolak(self):
+        for params in ({}, {'mulai': '2024-03-05', 'selesai': '2024-03-01'},
+                       {'mulai': '2024-02-30', 'selesai': '2024-03-01'},
+                       {'mulai': '2024-03-01', 'selesai': '2024-03-02', 'berkas': 'pdf'},
+                       {'mulai': '2024-03-01', 'selesai': '2024-03-02', 'penempatan': 'abc'}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+
+class RekapAbsensiTests(APITestCase):
+    """
+    Tes tabel rekap absensi bulanan dan endpoint matriks peserta x hari.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(email='admin-rekap@test.com', password='password123', nama_lengkap='Admin')
+        cls.profil = []
+        for i, (nama, tipe) in enumerate([('Andi', 'PELAJAR'), ('Bela', 'UMUM')]):
+            user = User.objects.create_user(email=f'rekap{i}@test.com', password='password123', nama_lengkap=nama)
+            cls.profil.append(PesertaProfile.objects.create(user=user, tipe_peserta=tipe, nama_institusi='Kampus'))
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.admin)
+        self.url = reverse('admin-absensi-matriks')
+
+    def kode(self, profil, bulan='2024-02-01'):
+        return RekapAbsensiBulanan.objects.get(profil=profil, bulan=bulan).kode
+
+    def test_rekap_diperbarui_saat_absensi_ditulis(self):
+        andi = self.profil[0]
+        absensi = Absensi.objects.create(profil=andi, tanggal='2024-02-01', status_kehadiran='HADIR')
+        Absensi.objects.create(profil=andi, tanggal='2024-02-29', status_kehadiran='SAKIT')
+        self.assertEqual(self.kode(andi), 'H' + '-' * 27 + 'S')
+
+        absensi.status_kehadiran = 'IZIN'
+        absensi.save()
+        self.assertEqual(self.kode(andi)[0], 'I')
+
+        # Pindah tanggal: sel lama dikosongkan, sel baru terisi
+        absensi.tanggal = datetime.date(2024, 2, 2)
+        absensi.save()
+        self.assertEqual(self.kode(andi)[:2], '-I')
+
+        absensi.delete()
+        self.assertEqual(self.kode(andi), '-' * 28 + 'S')
+
+    def test_bangun_ulang_sama_dengan_pembaruan_inkremental(self):
+        for hari, status_kehadiran in [(1, 'HADIR'), (5, 'ALPHA'), (10, 'IZIN')]:
+            Absensi.objects.create(profil=self.profil[1], tanggal=f'2024-02-{hari:02d}', status_kehadiran=status_kehadiran)
+        inkremental = self.kode(self.profil[1])
+
+        RekapAbsensiBulanan.objects.all().delete()
+        RekapAbsensiBulanan.objects.bangun_ulang(datetime.date(2024, 2, 14))
+        self.assertEqual(self.kode(self.profil[1]), inkremental)
+
+    def test_matriks_bulanan_satu_query(self):
+        Absensi.objects.create(profil=self.profil[0], tanggal='2024-02-03', status_kehadiran='HADIR')
+        Absensi.objects.create(profil=self.profil[1], tanggal='2024-02-04', status_kehadiran='ALPHA')
+        Absensi.objects.create(profil=self.profil[1], tanggal='2024-03-01', status_kehadiran='HADIR')
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {'bulan': '2024-02'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['tanggal']), 29)
+        self.assertEqual(response.data['peserta'], [self.profil[0].pk, self.profil[1].pk])
+        self.assertEqual(response.data['nama'], ['Andi', 'Bela'])
+        self.assertEqual(response.data['kode'][1][3], 'A')
+        self.assertEqual(response.data['legenda']['A'], 'ALPHA')
+
+        response = self.client.get(self.url, {'bulan': '2024-02', 'tipe_peserta': 'student'})
+        self.assertEqual(response.data['peserta'], [self.profil[0].pk])
+
+        response = self.client.get(self.url, {'bulan': 'Februari'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(self.url, {'bulan': '2024-02', 'penempatan': 'abc'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class PendaftaranBulkTests(APITestCase):
+    """
+    Tes persetujuan dan penolakan pendaftaran secara massal.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(email='admin-massal@test.com', password='password123', nama_lengkap='Admin')
+        cls.penempatan = Penempatan.objects.create(nama='UNIT MASSAL', kuota_pelajar=20, kuota_umum=20)
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.admin)
+        self.pendaftaran = [
+            Pendaftaran.objects.create(
+                email=f'massal{i}@test.com', nama_lengkap=f'Calon {i}', tipe_peserta='PELAJAR' if i % 2 else 'UMUM',
+                nama_institusi='Univ', no_telepon='1', pilihan_penempatan=self.penempatan,
+            )
+            for i in range(6)
+        ]
+        self.ids = [p.pk for p in self.pendaftaran]
+
+    def test_bulk_approve(self):
+        self.pendaftaran[0].status = Pendaftaran.Status.DITOLAK
+        self.pendaftaran[0].save()
+        User.objects.create_user(email='massal1@test.com', password='x', nama_lengkap='Sudah Ada')
+
+        response = self.client.post(
+            reverse('admin-pendaftaran-bulk-approve'), {'ids': self.ids + [999999]}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([baris['id'] for baris in response.data['disetujui']], self.ids[2:])
+        self.assertEqual(
+            {baris['id']: baris['alasan'] for baris in response.data['dilewati']},
+            {
+                self.ids[1]: "Email sudah terdaftar sebagai pengguna.",
+                self.ids[0]: "Pendaftaran ini sudah diproses.",
+                999999: "Pendaftaran tidak ditemukan.",
+            },
+        )
+
+        for baris in response.data['disetujui']:
+            pendaftaran = Pendaftaran.objects.get(pk=baris['id'])
+            self.assertEqual(pendaftaran.status, Pendaftaran.Status.DISETUJUI)
+            self.assertEqual(pendaftaran.user_terkait.email, baris['email'])
+            self.assertTrue(pendaftaran.user_terkait.check_password(baris['password_sementara']))
+            self.assertEqual(pendaftaran.user_terkait.profil_peserta.tipe_peserta, pendaftaran.tipe_peserta)
+        self.assertEqual(Aktivitas.objects.filter(tipe=Aktivitas.Tipe.PERSETUJUAN).count(), 4)
+        # Disetujui tetap menempati kuota
+        self.penempatan.refresh_from_db()
+        self.assertEqual(self.penempatan.terisi_pelajar + self.penempatan.terisi_umum, 5)
+
+    def test_bulk_approve_email_dinormalisasi_dan_duplikat(self):
+        User.objects.create_user(email='budi@gmail.com', password='x', nama_lengkap='Budi')
+        Pendaftaran.objects.filter(pk=self.ids[0]).update(email='budi@GMAIL.com')
+        Pendaftaran.objects.filter(pk=self.ids[1]).update(email='sari@Test.COM')
+        Pendaftaran.objects.filter(pk=self.ids[2]).update(email='sari@test.com')
+
+        response = self.client.post(reverse('admin-pendaftaran-bulk-approve'), {'ids': self.ids}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([baris['id'] for baris in response.data['disetujui']], self.ids[1:2] + self.ids[3:])
+        self.assertEqual(response.data['disetujui'][0]['email'], 'sari@test.com')
+        self.assertEqual(
+            {baris['id']: baris['alasan'] for baris in response.data['dilewati']},
+            {
+                self.ids[0]: "Email sudah terdaftar sebagai pengguna.",
+                self.ids[2]: "Email sudah terdaftar sebagai pengguna.",
+            },
+        )
+        self.assertEqual(
+            Pendaftaran.objects.filter(pk__in=[self.ids[0], self.ids[2]], status=Pendaftaran.Status.PENDING).count(), 2
+        )
+
+    def test_bulk_reject_melepas_kuota(self):
+        response = self.client.post(reverse('admin-pendaftaran-bulk-reject'), {'ids': self.ids[:4]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(sorted(response.data['ditolak']), self.ids[:4])
+        self.assertEqual(Pendaftaran.objects.filter(status=Pendaftaran.Status.DITOLAK).count(), 4)
+
+        self.penempatan.refresh_from_db()
+        self.assertEqual((self.penempatan.terisi_pelajar, self.penempatan.terisi_umum), (1, 1))
+        kuota = Penempatan.objects.annotate_kuota().get(pk=self.penempatan.pk)
+        self.assertEqual((kuota.kuota_pelajar_terisi, kuota.kuota_umum_terisi), (1, 1))
+
+        # Menolak ulang tidak mengurangi counter dua kali
+        response = self.client.post(reverse('admin-pendaftaran-bulk-reject'), {'ids': self.ids[:4]}, format='json')
+        self.assertEqual(response.data['ditolak'], [])
+        self.penempatan.refresh_from_db()
+        self.assertEqual((self.penempatan.terisi_pelajar, self.penempatan.terisi_umum), (1, 1))
+
+    def test_ids_tidak_valid(self):
+        for data in ({}, {'ids': []}, {'ids': ['abc']}, {'ids': list(range(501))}):
+            response = self.client.post(reverse('admin-pendaftaran-bulk-reject'), data, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class AbsensiBulkTests(APITestCase):
+    """
+    Tes upsert absensi massal oleh admin (aksi `bulk`).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(email='admin-bulk@test.com', password='password123', nama_lengkap='Admin')
+        cls.profil = []
+        for i in range(3):
+            user = User.objects.create_user(email=f'bulk{i}@test.com', password='password123', nama_lengkap=f'Peserta {i}')
+            cls.profil.append(PesertaProfile.objects.create(user=user, tipe_peserta='PELAJAR', nama_institusi='Kampus'))
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.admin)
+        self.url = reverse('admin-absensi-bulk')
+
+    def test_bulk_membuat_dan_memperbarui(self):
+        lama = Absensi.objects.create(
+            profil=self.profil[0], tanggal='2024-03-04', status_kehadiran='ALPHA', lat_masuk=-6.5,
+        )
+        response = self.client.post(self.url, [
+            {'profil_id': self.profil[0].pk, 'tanggal': '2024-03-04', 'status': 'hadir',
+             'jam_masuk': '07:30', 'jam_keluar': '16:00'},
+            {'profil_id': self.profil[1].pk, 'tanggal': '2024-03-04', 'status': 'SAKIT', 'keterangan': 'Demam'},
+        ], format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['dibuat'], response.data['diperbarui']), (1, 1))
+        self.assertEqual([baris['hasil'] for baris in response.data['hasil']], ['diperbarui', 'dibuat'])
+
+        lama.refresh_from_db()
+        self.assertEqual(lama.status_kehadiran, 'HADIR')
+        self.assertEqual(lama.jam_masuk, datetime.time(7, 30))
+        # Field yang tidak termasuk upsert tetap utuh
+        self.assertEqual(lama.lat_masuk, -6.5)
+        self.assertEqual(Absensi.objects.get(profil=self.profil[1]).keterangan, 'Demam')
+
+        # Rekap bulanan ikut diperbarui walau bulk_create melewati save()
+        self.assertEqual(RekapAbsensiBulanan.objects.get(profil=self.profil[0], bulan='2024-03-01').kode[3], 'H')
+        self.assertEqual(RekapAbsensiBulanan.objects.get(profil=self.profil[1], bulan='2024-03-01').kode[3], 'S')
+
+    def test_baris_tidak_valid_membatalkan_semua(self):
+        response = self.client.post(self.url, [
+            {'profil_id': self.profil[0].pk, 'tanggal': '2024-03-04', 'status': 'HADIR'},
+            {'profil_id': self.profil[0].pk, 'tanggal': '2024-03-04', 'status': 'IZIN'},
+            {'profil_id': 999999, 'tanggal': '2024-03-04', 'status': 'HADIR'},
+            {'profil_id': self.profil[1].pk, 'tanggal': '2024-03-04', 'status': 'LIBUR'},
+            {'profil_id': self.profil[2].pk, 'tanggal': '2024-03-04', 'status': 'HADIR',
+             'jam_masuk': '16:00', 'jam_keluar': '07:00'},
+        ], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([baris['index'] for baris in response.data['hasil']], [1, 2, 3, 4])
+        self.assertIn('profil_id', response.data['hasil'][1]['errors'])
+        self.assertFalse(Absensi.objects.exists())
+
+    def test_seribu_baris_jumlah_query_tetap(self):
+        awal = datetime.date(2024, 1, 1)
+        data = [
+            {'profil_id': profil.pk, 'tanggal': (awal + timedelta(days=hari)).isoformat(), 'status': 'HADIR',
+             'jam_masuk': '07:30'}
+            for profil in self.profil for hari in range(334)
+        ][:1000]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['dibuat'], 1000)
+        self.assertEqual(Absensi.objects.count(), 1000)
+        # Tidak ada query per baris: hanya batch insert + beberapa query rekap per bulan (11 bulan)
+        self.assertLess(len(queries), 100)
+
+        data[0]['status'] = 'IZIN'
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.data['diperbarui'], 1000)
+        self.assertEqual(RekapAbsensiBulanan.objects.get(profil=self.profil[0], bulan='2024-01-01').kode[0], 'I')
+
+
+class GeofenceTests(APITestCase):
+    """
+    Tes perhitungan geofence (geo_utils) dan pengaturannya oleh admin.
+    """
+
+    def test_haversine_dan_lingkaran(self):
+        # 0.001 derajat lintang kira-kira 111 meter
+        self.assertAlmostEqual(haversine_m(-6.55, 106.74, -6.551, 106.74), 111.2, delta=0.5)
+        geofence = dict(zip(('bbox_lat_min', 'bbox_lat_max', 'bbox_lng_min', 'bbox_lng_max'),
+                            hitung_bbox(-6.55, 106.74, 150)))
+        geofence.update(geofence_lat=-6.55, geofence_lng=106.74, geofence_radius=150, geofence_poligon=None)
+        self.assertTrue(dalam_geofence(geofence, -6.551, 106.74))
+        self.assertFalse(dalam_geofence(geofence, -6.552, 106.74))
+        # Sudut bbox berada di dalam kotak tapi di luar lingkaran
+        self.assertFalse(dalam_geofence(geofence, geofence['bbox_lat_max'] - 1e-6, geofence['bbox_lng_max'] - 1e-6))
+
+    def test_titik_dalam_poligon_cekung(self):
+        bentuk_l = [[0, 0], [0, 2], [1, 2], [1, 1], [2, 1], [2, 0]]
+        self.assertTrue(titik_dalam_poligon(0.5, 1.5, bentuk_l))
+        self.assertTrue(titik_dalam_poligon(1.5, 0.5, bentuk_l))
+        self.assertFalse(titik_dalam_poligon(1.5, 1.5, bentuk_l))
+        self.assertEqual(hitung_bbox(poligon=bentuk_l), (0, 2, 0, 2))
+
+    def test_admin_mengatur_geofence(self):
+        admin = User.objects.create_superuser(email='admin@test.com', password='password123', nama_lengkap='Admin')
+        penempatan = Penempatan.objects.create(nama='UNIT GEO')
+        self.client.force_authenticate(user=admin)
+        url = reverse('admin-penempatan-detail', kwargs={'pk': penempatan.pk})
+
+        response = self.client.patch(url, {'geofence_poligon': [[0, 0], [1, 1]]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.patch(
+            url, {'geofence_lat': -6.55, 'geofence_lng': 106.74, 'geofence_radius': 100}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['geofence_radius'], 100)
+        penempatan.refresh_from_db()
+        self.assertTrue(penempatan.geofence_aktif)
+
+        # Mengosongkan radius mematikan geofence (bbox ikut dihapus)
+        self.client.patch(url, {'geofence_radius': None}, format='json')
+        penempatan.refresh_from_db()
+        self.assertFalse(penempatan.geofence_aktif)
+
+
+def buat_template_sertifikat(direktori, nama='E_SERTIFIKAT_PKL_MAGANG.pdf', judul="SERTIFIKAT"):
+    """ Template PDF satu halaman A4 landscape untuk tes penerbitan sertifikat. """
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.pdfgen import canvas
+    can = canvas.Canvas(os.path.join(direktori, nama), pagesize=landscape(A4))
+    can.drawCentredString(421, 500, judul)
+    can.save()
+
+
+class SertifikatJobTests(APITestCase):
+    """ Penerbitan sertifikat lewat antrean SertifikatJob + worker proses_sertifikat. """
+
+    def setUp(self):
+        cache.clear()
+        self.direktori = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.direktori, ignore_errors=True)
+        buat_template_sertifikat(self.direktori)
+        override = override_settings(MEDIA_ROOT=self.direktori, SERTIFIKAT_TEMPLATE_DIR=self.direktori)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.admin = User.objects.create_superuser(email='admin@test.com', password='password123', nama_lengkap='Admin')
+        self.client.force_authenticate(user=self.admin)
+        self.penempatan = Penempatan.objects.create(nama="UNIT SERTIFIKAT", kuota_pelajar=5)
+        user = User.objects.create_user(email='lulus@test.com', password='password123', nama_lengkap='Calon Lulus')
+        self.profil = PesertaProfile.objects.create(
+            user=user, tipe_peserta='PELAJAR', nama_institusi='Kampus', penempatan=self.penempatan,
+            status=PesertaProfile.StatusPeserta.SELESAI,
+            tanggal_mulai=datetime.date(2025, 1, 6), tanggal_selesai=datetime.date(2025, 3, 28),
+        )
+        Laporan.objects.create(profil=self.profil, judul='Laporan Akhir', file='laporan_peserta/x.pdf',
+                               status_review=Laporan.StatusReview.DITERIMA)
+        self.url = reverse('admin-sertifikat-list')
+
+    def jalankan_worker(self):
+        call_command('proses_sertifikat', '--sekali', stdout=StringIO())
+
+    def test_create_mengantrekan_job_tanpa_render_pdf(self):
+        with mock.patch('apps.bimbingan.pdf_utils.generate_pdf_certificate') as generate:
+            response = self.client.post(self.url, {'peserta_id': self.profil.pk}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        generate.assert_not_called()
+        job = SertifikatJob.objects.get(pk=response.data['job_id'])
+        self.assertEqual(job.status, SertifikatJob.Status.ANTRI)
+        self.assertEqual(response['Location'], response.data['status_url'])
+        self.assertFalse(Sertifikat.objects.exists())
+
+    def test_worker_menerbitkan_sertifikat_dan_status_job_selesai(self):
+        job_id = self.client.post(self.url, {'peserta_id': self.profil.pk}, format='json').data['job_id']
+        self.jalankan_worker()
+
+        response = self.client.get(reverse('admin-sertifikat-job', kwargs={'job_id': job_id}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], SertifikatJob.Status.SELESAI)
+        self.assertEqual(response.data['percobaan'], 1)
+        sertifikat = Sertifikat.objects.get(profil=self.profil)
+        self.assertEqual(response.data['sertifikat']['nomor_sertifikat'], sertifikat.nomor_sertifikat)
+        self.assertTrue(sertifikat.file_sertifikat.read().startswith(b'%PDF'))
+        self.profil.refresh_from_db()
+        self.assertEqual(self.profil.status, PesertaProfile.StatusPeserta.LULUS)
+        self.assertTrue(Aktivitas.objects.filter(tipe=Aktivitas.Tipe.SERTIFIKAT, profil=self.profil).exists())
+
+    def test_klik_ganda_mengembalikan_job_yang_sama(self):
+        pertama = self.client.post(self.url, {'peserta_id': self.profil.pk}, format='json')
+        kedua = self.client.post(self.url, {'peserta_id': self.profil.pk}, format='json')
+        self.assertEqual(pertama.data['job_id'], kedua.data['job_id'])
+        self.assertEqual(SertifikatJob.objects.count(), 1)
+
+    def test_prasyarat_belum_terpenuhi_ditolak_tanpa_job(self):
+        Laporan.objects.filter(profil=self.profil).update(status_review=Laporan.StatusReview.DIREVIEW)
+        response = self.client.post(self.url, {'peserta_id': self.profil.pk}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(SertifikatJob.objects.exists())
+
+    def test_error_render_dicoba_ulang_lalu_gagal(self):
+        job_id = self.client.post(self.url, {'peserta_id': self.profil.pk}, format='json').data['job_id']
+        with mock.patch('apps.bimbingan.pdf_utils.generate_pdf_certificate', side_effect=RuntimeError("rusak")):
+            for percobaan in range(1, SertifikatJob.MAKS_PERCOBAAN + 1):
+                self.jalankan_worker()
+                job = SertifikatJob.objects.get(pk=job_id)
+                self.assertEqual(job.percobaan, percobaan)
+                # Lewati backoff agar percobaan berikutnya langsung bisa diklaim
+                SertifikatJob.objects.filter(pk=job_id).update(tersedia_pada=timezone.now())
+        self.assertEqual(job.status, SertifikatJob.Status.GAGAL)
+        self.assertIn("rusak", job.pesan_error)
+        self.assertFalse(Sertifikat.objects.exists())
+
+    def test_job_yang_ditinggal_worker_diklaim_ulang(self):
+        job, _ = SertifikatJob.objects.antrekan(self.profil.pk)
+        self.assertEqual(SertifikatJob.objects.klaim('worker-a').pk, job.pk)
+        self.assertIsNone(SertifikatJob.objects.klaim('worker-b'))
+
+        SertifikatJob.objects.filter(pk=job.pk).update(mulai_pada=timezone.now() - timedelta(hours=1))
+        diklaim = SertifikatJob.objects.klaim('worker-b')
+        self.assertEqual(diklaim.pekerja, 'worker-b')
+        self.assertEqual(diklaim.percobaan, 2)
+
+    def test_long_poll_menunggu_sampai_batas_waktu(self):
+        job_id = self.client.post(self.url, {'peserta_id': self.profil.pk}, format='json').data['job_id']
+        url = reverse('admin-sertifikat-job', kwargs={'job_id': job_id})
+        mulai = timezone.now()
+        response = self.client.get(url, {'tunggu': '0.6'})
+        self.assertGreaterEqual((timezone.now() - mulai).total_seconds(), 0.5)
+        self.assertEqual(response.data['status'], SertifikatJob.Status.ANTRI)
+        self.assertIsNone(response.data['sertifikat'])
+
+        self.assertEqual(self.client.get(url, {'tunggu': 'x'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            self.client.get(reverse('admin-sertifikat-job', kwargs={'job_id': 999})).status_code,
+            status.HTTP_404_NOT_FOUND,
+        )
+
+
+class SertifikatBatchTests(APITestCase):
+    """ Penerbitan sertifikat massal: satu blok nomor, render paralel, tulis massal. """
+
+    def setUp(self):
+        cache.clear()
+        self.direktori = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.direktori, ignore_errors=True)
+        buat_template_sertifikat(self.direktori)
+        override = override_settings(MEDIA_ROOT=self.direktori, SERTIFIKAT_TEMPLATE_DIR=self.direktori)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.admin = User.objects.create_superuser(email='admin@test.com', password='password123', nama_lengkap='Admin')
+        self.client.force_authenticate(user=self.admin)
+        self.url = reverse('admin-sertifikat-batch')
+        self.layak = [self.buat_peserta(f'layak{i}', 'PELAJAR') for i in range(3)]
+        self.umum = self.buat_peserta('umum', 'UMUM')
+        self.belum_selesai = self.buat_peserta('aktif', 'PELAJAR', status=PesertaProfile.StatusPeserta.AKTIF)
+
+    def buat_peserta(self, nama, tipe, status=PesertaProfile.StatusPeserta.SELESAI):
+        user = User.objects.create_user(email=f'{nama}@test.com', password='password123', nama_lengkap=f'Peserta {nama}')
+        profil = PesertaProfile.objects.create(user=user, tipe_peserta=tipe, nama_institusi='Kampus', status=status)
+        if tipe == 'PELAJAR':
+            Laporan.objects.create(profil=profil, judul='Laporan', file='laporan_peserta/x.pdf',
+                                   status_review=Laporan.StatusReview.DITERIMA)
+        else:
+            BuktiPembayaran.objects.create(profil=profil, file='bukti_pembayaran/x.pdf', status_verifikasi='Telah Diverifikasi')
+        return profil
+
+    def test_batch_per_id_dengan_laporan_per_peserta(self):
+        ids = [p.pk for p in self.layak] + [self.belum_selesai.pk, 99999]
+        response = self.client.post(self.url, {'peserta_ids': ids}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        diterbitkan = response.data['diterbitkan']
+        self.assertEqual([d['peserta_id'] for d in diterbitkan], [p.pk for p in self.layak])
+        tahun = timezone.localdate().year
+        self.assertEqual([d['nomor_sertifikat'] for d in diterbitkan],
+                         [f"BBPBAT/CERT/{tahun}/{i:03d}" for i in (1, 2, 3)])
+        self.assertEqual(
+            {d['peserta_id']: d['alasan'] for d in response.data['dilewati']},
+            {self.belum_selesai.pk: "Peserta belum menyelesaikan program.", 99999: "Peserta tidak ditemukan."},
+        )
+        self.assertEqual(
+            PesertaProfile.objects.filter(status=PesertaProfile.StatusPeserta.LULUS).count(), 3
+        )
+        self.assertEqual(Aktivitas.objects.filter(tipe=Aktivitas.Tipe.SERTIFIKAT).count(), 3)
+        for sertifikat in Sertifikat.objects.all():
+            self.assertTrue(sertifikat.file_sertifikat.read().startswith(b'%PDF'))
+
+        # Ulangi: semuanya sudah punya sertifikat
+        ulang = self.client.post(self.url, {'peserta_ids': [self.layak[0].pk]}, format='json')
+        self.assertEqual(ulang.status_code, status.HTTP_200_OK)
+        self.assertEqual(ulang.data['dilewati'][0]['alasan'], "Peserta ini sudah memiliki sertifikat.")
+
+    def test_semua_peserta_layak_dibatasi_per_permintaan(self):
+        with mock.patch('apps.bimbingan.views.AdminSertifikatViewSet.MAKS_PESERTA_BATCH', 3):
+            pertama = self.client.post(self.url, {'semua': True}, format='json')
+            self.assertEqual(len(pertama.data['diterbitkan']), 3)
+            self.assertEqual(pertama.data['sisa'], 1)
+            kedua = self.client.post(self.url, {'semua': True}, format='json')
+        self.assertEqual([d['peserta_id'] for d in kedua.data['diterbitkan']], [self.umum.pk])
+        self.assertEqual(kedua.data['sisa'], 0)
+        self.assertEqual(Sertifikat.objects.get(profil=self.umum).template_digunakan, Sertifikat.TemplateType.UMUM)
+
+    def test_jumlah_query_tidak_tumbuh_per_peserta(self):
+        # Baris urutan tahun ini dibuat lebih dulu (INSERT satu kali per tahun)
+        UrutanSertifikat.objects.create(tahun=timezone.localdate().year)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post(self.url, {'peserta_ids': [self.layak[0].pk]}, format='json')
+        satu = len(ctx.captured_queries)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post(self.url, {'peserta_ids': [p.pk for p in self.layak[1:]] + [self.umum.pk]}, format='json')
+        self.assertEqual(len(ctx.captured_queries), satu)
+
+    def test_zip_di_stream_berisi_laporan_dan_pdf(self):
+        response = self.client.post(self.url, {'peserta_ids': [p.pk for p in self.layak], 'zip': True}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        arsip = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        nama = arsip.namelist()
+        self.assertEqual(nama[0], 'laporan.json')
+        self.assertEqual(len(nama), 4)
+        self.assertTrue(all(arsip.read(n).startswith(b'%PDF') for n in nama[1:]))
+
+    def test_job_antrean_peserta_yang_sudah_diterbitkan_massal_ditandai_selesai(self):
+        job, _ = SertifikatJob.objects.antrekan(self.layak[0].pk)
+        self.client.post(self.url, {'peserta_ids': [self.layak[0].pk]}, format='json')
+        call_command('proses_sertifikat', '--sekali', stdout=StringIO())
+        job.refresh_from_db()
+        self.assertEqual(job.status, SertifikatJob.Status.SELESAI)
+        self.assertEqual(job.sertifikat, Sertifikat.objects.get(profil=self.layak[0]))
+
+    def test_hanya_template_pkl_peserta_umum_tetap_diterbitkan(self):
+        # Deployment saat ini hanya punya E_SERTIFIKAT_PKL_MAGANG.pdf
+        self.assertEqual(os.listdir(self.direktori), ['E_SERTIFIKAT_PKL_MAGANG.pdf'])
+        response = self.client.post(self.url, {'peserta_ids': [self.layak[0].pk, self.umum.pk]}, format='json')
+        self.assertEqual(len(response.data['diterbitkan']), 2)
+        self.assertEqual(response.data['dilewati'], [])
+        self.assertEqual(Sertifikat.objects.get(profil=self.umum).template_digunakan, Sertifikat.TemplateType.UMUM)
+
+        job_profil = self.buat_peserta('umum2', 'UMUM')
+        create = self.client.post(reverse('admin-sertifikat-list'), {'peserta_id': job_profil.pk}, format='json')
+        self.assertEqual(create.status_code, status.HTTP_202_ACCEPTED)
+
+    def test_template_dan_layout_sesuai_jenis_peserta(self):
+        from pypdf import PdfReader
+        buat_template_sertifikat(self.direktori, 'E_SERTIFIKAT_UMUM.pdf', judul="SERTIFIKAT UMUM")
+        umum = pdf_utils.TemplateSertifikat('E_SERTIFIKAT_UMUM.pdf', pdf_utils.FIELD_PELAJAR)
+        with mock.patch.dict(pdf_utils.TEMPLATE_SERTIFIKAT, {'UMUM': umum}):
+            response = self.client.post(self.url, {'peserta_ids': [self.layak[0].pk, self.umum.pk]}, format='json')
+        self.assertEqual(len(response.data['diterbitkan']), 2)
+        for profil, template_umum in ((self.layak[0], False), (self.umum, True)):
+            teks = PdfReader(Sertifikat.objects.get(profil=profil).file_sertifikat.open('rb')).pages[0].extract_text()
+            self.assertEqual("SERTIFIKAT UMUM" in teks, template_umum)
+            self.assertIn(f"Peserta {profil.user.email.split('@')[0]}", teks)
+
+    def test_template_umum_tidak_ada_hanya_peserta_umum_dilewati(self):
+        umum = pdf_utils.TemplateSertifikat('E_SERTIFIKAT_UMUM.pdf', pdf_utils.FIELD_PELAJAR)
+        with mock.patch.dict(pdf_utils.TEMPLATE_SERTIFIKAT, {'UMUM': umum}):
+            response = self.client.post(self.url, {'peserta_ids': [self.layak[0].pk, self.umum.pk]}, format='json')
+        self.assertEqual([d['peserta_id'] for d in response.data['diterbitkan']], [self.layak[0].pk])
+        [dilewati] = response.data['dilewati']
+        self.assertEqual(dilewati['peserta_id'], self.umum.pk)
+        self.assertIn("E_SERTIFIKAT_UMUM.pdf", dilewati['alasan'])
+
+    def test_validasi_input(self):
+        self.assertEqual(self.client.post(self.url, {}, format='json').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.post(self.url, {'peserta_ids': ['x']}, format='json').status_code,
+                         status.HTTP_400_BAD_REQUEST)
+
+    def test_render_paralel_process_pool(self):
+        template_path = os.path.join(self.direktori, 'E_SERTIFIKAT_PKL_MAGANG.pdf')
+        data = [{"{{NAMA_LENGKAP}}": f"Peserta {i}"} for i in range(4)]
+        hasil = generate_pdf_certificate_massal(template_path, data, workers=2)
+        self.assertEqual(len(hasil), 4)
+        self.assertTrue(all(pdf.startswith(b'%PDF') and error is None for pdf, error in hasil))
+
+        gagal = generate_pdf_certificate_massal(os.path.join(self.direktori, 'tidak-ada.pdf'), data[:1])
+        self.assertIsNone(gagal[0][0])
+        self.assertTrue(gagal[0][1])
+
+
+class UrutanSertifikatTests(APITestCase):
+    """ Nomor sertifikat dari tabel urutan per tahun (compare-and-set, tanpa celah). """
+
+    def setUp(self):
+        cache.clear()
+        self.direktori = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.direktori, ignore_errors=True)
+        buat_template_sertifikat(self.direktori)
+        override = override_settings(MEDIA_ROOT=self.direktori, SERTIFIKAT_TEMPLATE_DIR=self.direktori)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.tahun = timezone.localdate().year
+
+    def buat_peserta(self, nama):
+        user = User.objects.create_user(email=f'{nama}@test.com', password='password123', nama_lengkap=f'Peserta {nama}')
+        profil = PesertaProfile.objects.create(user=user, tipe_peserta='PELAJAR', nama_institusi='Kampus',
+                                               status=PesertaProfile.StatusPeserta.SELESAI)
+        Laporan.objects.create(profil=profil, judul='Laporan', file='laporan_peserta/x.pdf',
+                               status_review=Laporan.StatusReview.DITERIMA)
+        return profil
+
+    def test_pakai_blok_compare_and_set(self):
+        urutan = UrutanSertifikat.objects
+        self.assertEqual(urutan.berikutnya(2030), 1)
+        self.assertTrue(urutan.pakai(2030, 1, 3))
+        self.assertFalse(urutan.pakai(2030, 1, 1))
+        self.assertEqual(urutan.berikutnya(2030), 4)
+        self.assertEqual(urutan.kunci(2030), 4)
+        self.assertTrue(urutan.pakai(2030, 4))
+        self.assertEqual(urutan.berikutnya(2031), 1)
+
+    def test_backfill_dari_sertifikat_lama(self):
+        for nomor in ("BBPBAT/CERT/2024/007", "BBPBAT/CERT/2024/012", "BBPBAT/CERT/2025/003", "MANUAL-1"):
+            Sertifikat.objects.create(profil=self.buat_peserta(nomor.replace('/', '-').lower()), nomor_sertifikat=nomor)
+        migrasi = importlib.import_module('apps.bimbingan.migrations.0018_urutan_sertifikat')
+        from django.apps import apps as registry
+        migrasi.isi_urutan_sertifikat(registry, None)
+        self.assertEqual(dict(UrutanSertifikat.objects.values_list('tahun', 'terakhir')), {2024: 12, 2025: 3})
+
+    def test_kalah_balapan_nomor_dirender_ulang(self):
+        from .sertifikat_utils import terbitkan_sertifikat
+        profil = self.buat_peserta('balapan')
+        asli = pdf_utils.generate_pdf_certificate
+        nomor_dirender = []
+
+        def render(template_path, data, layout):
+            nomor_dirender.append(data["{{NOMOR_SERTIFIKAT}}"])
+            if len(nomor_dirender) == 1:
+                # Penerbitan lain memakai nomor 1 selama render pertama berjalan
+                UrutanSertifikat.objects.pakai(self.tahun, 1)
+            return asli(template_path, data, layout)
+
+        with mock.patch('apps.bimbingan.pdf_utils.generate_pdf_certificate', side_effect=render):
+            sertifikat = terbitkan_sertifikat(profil.pk)
+        self.assertEqual(nomor_dirender, [f"BBPBAT/CERT/{self.tahun}/001", f"BBPBAT/CERT/{self.tahun}/002"])
+        self.assertEqual(sertifikat.nomor_sertifikat, f"BBPBAT/CERT/{self.tahun}/002")
+        # File dari render pertama dibuang, hanya satu PDF tersisa
+        self.assertEqual(len(os.listdir(os.path.join(self.direktori, 'sertifikat'))), 1)
+
+    def test_transaksi_batal_tidak_meninggalkan_celah(self):
+        from .sertifikat_utils import SertifikatTidakValid, terbitkan_sertifikat
+        profil = self.buat_peserta('batal')
+        with mock.patch('apps.bimbingan.sertifikat_utils.Aktivitas.catat', side_effect=RuntimeError("gagal")):
+            with self.assertRaises(RuntimeError):
+                terbitkan_sertifikat(profil.pk)
+        self.assertEqual(UrutanSertifikat.objects.berikutnya(self.tahun), 1)
+        self.assertFalse(Sertifikat.objects.exists())
+        self.assertEqual(terbitkan_sertifikat(profil.pk).nomor_sertifikat, f"BBPBAT/CERT/{self.tahun}/001")
+        with self.assertRaises(SertifikatTidakValid):
+            terbitkan_sertifikat(profil.pk)
+
+
+class PenerbitanSertifikatParalelTests(TransactionTestCase):
+    """
+    Stress test: worker penerbitan satuan dan penerbitan massal berjalan
+    bersamaan (multi-thread, koneksi DB masing-masing). Nomor sertifikat
+    harus unik dan berurutan tanpa celah.
+    """
+    JUMLAH_SATUAN = 8
+    JUMLAH_MASSAL = 6
+
+    def setUp(self):
+        self.direktori = tempfile.mkdtemp()
+        buat_template_sertifikat(self.direktori)
+        self.override = override_settings(MEDIA_ROOT=self.direktori, SERTIFIKAT_TEMPLATE_DIR=self.direktori)
+        self.override.enable()
+        self.profil = []
+        for i in range(self.JUMLAH_SATUAN + self.JUMLAH_MASSAL):
+            user = User.objects.create_user(email=f'paralel{i}@test.com', password='x', nama_lengkap=f'Paralel {i}')
+            profil = PesertaProfile.objects.create(user=user, tipe_peserta='PELAJAR', nama_institusi='Kampus',
+                                                   status=PesertaProfile.StatusPeserta.SELESAI)
+            Laporan.objects.create(profil=profil, judul='Laporan', file='laporan_peserta/x.pdf',
+                                   status_review=Laporan.StatusReview.DITERIMA)
+            self.profil.append(profil.pk)
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.direktori, ignore_errors=True)
+
+    def test_nomor_unik_dan_tanpa_celah(self):
+        from .sertifikat_utils import terbitkan_sertifikat, terbitkan_sertifikat_massal
+        satuan, massal = self.profil[:self.JUMLAH_SATUAN], self.profil[self.JUMLAH_SATUAN:]
+        barrier = threading.Barrier(self.JUMLAH_SATUAN + 1)
+        error = []
+
+        def jalankan(fungsi, *args):
+            try:
+                barrier.wait()
+                fungsi(*args)
+            except Exception as e:
+                error.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=jalankan, args=(terbitkan_sertifikat, pk)) for pk in satuan]
+        threads.append(threading.Thread(target=jalankan, args=(terbitkan_sertifikat_massal, massal)))
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(error, [])
+        tahun = timezone.localdate().year
+        total = self.JUMLAH_SATUAN + self.JUMLAH_MASSAL
+        nomor = sorted(Sertifikat.objects.values_list('nomor_sertifikat', flat=True))
+        self.assertEqual(nomor, [f"BBPBAT/CERT/{tahun}/{i:03d}" for i in range(1, total + 1)])
+        self.assertEqual(UrutanSertifikat.objects.get(tahun=tahun).terakhir, total)
+        self.assertEqual(len(os.listdir(os.path.join(self.direktori, 'sertifikat'))), total)
+
+
+class SertifikatWorkerProsesLainTests(TransactionTestCase):
+    """
+    Worker sertifikat berjalan sebagai proses terpisah; dashboard peserta yang
+    dilayani proses web harus melihat sertifikat yang baru terbit.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.direktori = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.direktori, ignore_errors=True)
+        buat_template_sertifikat(self.direktori)
+        override = override_settings(MEDIA_ROOT=self.direktori, SERTIFIKAT_TEMPLATE_DIR=self.direktori)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.user = User.objects.create_user(email='worker-lain@test.com', password='x', nama_lengkap='Calon Lulus')
+        self.profil = PesertaProfile.objects.create(user=self.user, tipe_peserta='PELAJAR', nama_institusi='Kampus',
+                                                    status=PesertaProfile.StatusPeserta.SELESAI)
+        Laporan.objects.create(profil=self.profil, judul='Laporan', file='laporan_peserta/x.pdf',
+                               status_review=Laporan.StatusReview.DITERIMA)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_dashboard_melihat_sertifikat_dari_worker(self):
+        url = reverse('peserta-dashboard')
+        self.assertFalse(self.client.get(url).data['sertifikat_tersedia'])
+        SertifikatJob.objects.antrekan(self.profil.pk)
+
+        handler_sigterm = signal.getsignal(signal.SIGTERM)
+        call_command('proses_sertifikat', '--proses', '2', '--sekali', stdout=StringIO())
+        self.assertIs(signal.getsignal(signal.SIGTERM), handler_sigterm)
+
+        self.assertEqual(SertifikatJob.objects.get().status, SertifikatJob.Status.SELESAI)
+        self.assertTrue(self.client.get(url).data['sertifikat_tersedia'])
+
+
+class PdfTemplateCacheTests(SimpleTestCase):
+    """ Template sertifikat di-parse sekali per (path, mtime); per sertifikat hanya lapisan teks. """
+
+    def setUp(self):
+        self.direktori = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.direktori, ignore_errors=True)
+        buat_template_sertifikat(self.direktori)
+        self.template_path = os.path.join(self.direktori, 'E_SERTIFIKAT_PKL_MAGANG.pdf')
+        pdf_utils.hapus_cache_template()
+        self.addCleanup(pdf_utils.hapus_cache_template)
+
+    def teks(self, stream):
+        from pypdf import PdfReader
+        return PdfReader(stream).pages[0].extract_text()
+
+    def test_template_dibaca_sekali_untuk_banyak_sertifikat(self):
+        for i in range(5):
+            hasil = pdf_utils.generate_pdf_certificate(self.template_path, {"{{NAMA_LENGKAP}}": f"Peserta {i}"})
+            teks = self.teks(hasil)
+            self.assertIn(f"Peserta {i}", teks)
+            self.assertIn("SERTIFIKAT", teks)
+            self.assertNotIn(f"Peserta {i - 1}", teks)
+        self.assertEqual(pdf_utils._baca_template.cache_info().misses, 1)
+        self.assertEqual(pdf_utils._halaman_dasar.cache_info().misses, 1)
+
+    def test_template_yang_diganti_dibaca_ulang(self):
+        pdf_utils.generate_pdf_certificate(self.template_path, {"{{NAMA_LENGKAP}}": "Peserta"})
+        from reportlab.lib.pagesizes import A4, landscape
+        from reportlab.pdfgen import canvas
+        can = canvas.Canvas(self.template_path, pagesize=landscape(A4))
+        can.drawCentredString(421, 500, "PIAGAM")
+        can.save()
+        stat = os.stat(self.template_path)
+        os.utime(self.template_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+        teks = self.teks(pdf_utils.generate_pdf_certificate(self.template_path, {"{{NAMA_LENGKAP}}": "Peserta"}))
+        self.assertIn("PIAGAM", teks)
+        self.assertEqual(pdf_utils._baca_template.cache_info().misses, 2)
+
+    def test_semua_field_tertulis(self):
+        data = {
+            "{{NAMA_LENGKAP}}": "Nama Peserta", "{{NAMA_INSTITUSI}}": "Kampus", "{{NOMOR_SERTIFIKAT}}": "BBPBAT/CERT/2025/001",
+            "{{TANGGAL_TERBIT}}": "1 Juli 2025", "{{TANGGAL_MULAI}}": "1 Mei 2025", "{{TANGGAL_SELESAI}}": "30 Juni 2025",
+            "{{PENEMPATAN}}": "BIOFLOK",
+        }
+        teks = self.teks(pdf_utils.generate_pdf_certificate(self.template_path, data))
+        for potongan in ("Nama Peserta", "Kampus", "Nomor: BBPBAT/CERT/2025/001", "Unit Penempatan: BIOFLOK",
+                         "1 Mei 2025 - 30 Juni 2025", "Sukabumi, 1 Juli 2025"):
+            self.assertIn(potongan, teks)
+
+
+class LayoutSertifikatTests(SimpleTestCase):
+    """ Profil tata letak sertifikat: metrik font ter-cache dan nama panjang diperkecil agar muat. """
+
+    def setUp(self):
+        pdf_utils.hapus_cache_template()
+        self.addCleanup(pdf_utils.hapus_cache_template)
+        self.fields = pdf_utils.TEMPLATE_SERTIFIKAT['PELAJAR'].fields
+        self.field_nama = next(f for f in self.fields if f.teks == "{{NAMA_LENGKAP}}")
+
+    def gambar(self, data):
+        """ (font, ukuran, x, y, teks) setiap teks yang digambar ke canvas. """
+        can = mock.Mock()
+        pdf_utils._gambar_teks(can, self.fields, data)
+        return [(*font.args, *tulis.args) for font, tulis in zip(can.setFont.call_args_list, can.drawString.call_args_list)]
+
+    def test_lebar_teks_sama_dengan_reportlab(self):
+        from reportlab.pdfbase.pdfmetrics import stringWidth
+        for teks in ("Muhammad Rizky", "José Ñandú — «x»", "Łukasz 王"):
+            for font in ("Helvetica", "Helvetica-Bold"):
+                self.assertAlmostEqual(pdf_utils.lebar_teks(teks, font, 13), stringWidth(teks, font, 13))
+
+    def test_nama_pendek_ukuran_asli_dan_rata_tengah(self):
+        [(font, ukuran, x, y, teks)] = self.gambar({"{{NAMA_LENGKAP}}": "Budi"})
+        self.assertEqual((font, ukuran, y, teks), ("Helvetica-Bold", 24, 310, "Budi"))
+        self.assertAlmostEqual(x + pdf_utils.lebar_teks(teks, font, ukuran) / 2, pdf_utils.CENTER_X)
+
+    def test_nama_panjang_diperkecil_sampai_muat(self):
+        nama = "Raden Mas Muhammad Abdurrahman Wicaksono Putra Hadiningrat Kusumanegara"
+        [(font, ukuran, x, _, teks)] = self.gambar({"{{NAMA_LENGKAP}}": nama})
+        self.assertLess(ukuran, 24)
+        self.assertAlmostEqual(pdf_utils.lebar_teks(teks, font, ukuran), self.field_nama.lebar_maks)
+        self.assertAlmostEqual(x + pdf_utils.lebar_teks(teks, font, ukuran) / 2, pdf_utils.CENTER_X)
+
+        [(_, ukuran, _, _, _)] = self.gambar({"{{NAMA_LENGKAP}}": nama * 3})
+        self.assertEqual(ukuran, self.field_nama.ukuran_min)
+
+    def test_field_butuh_semua_placeholder(self):
+        self.assertEqual(self.gambar({"{{TANGGAL_MULAI}}": "1 Mei 2025"}), [])
+        [(_, _, _, _, teks)] = self.gambar({"{{TANGGAL_MULAI}}": "1 Mei 2025", "{{TANGGAL_SELESAI}}": "30 Juni 2025"})
+        self.assertEqual(teks, "1 Mei 2025 - 30 Juni 2025")
+
+    def test_metrik_dan_layout_dimuat_sekali(self):
+        for i in range(5):
+            self.gambar({"{{NAMA_LENGKAP}}": f"Peserta {i}", "{{NOMOR_SERTIFIKAT}}": f"BBPBAT/CERT/2025/{i:03d}"})
+        self.assertEqual(pdf_utils._siapkan_layout.cache_info().misses, 1)
+        self.assertEqual(pdf_utils._metrik_font.cache_info().currsize, 2)
+
+
+class HariKerjaTests(SimpleTestCase):
+    """
+    Tes kalender hari kerja prefix-sum terhadap perhitungan hari demi hari.
+    """
+
+    @staticmethod
+    def hitung_manual(mulai, selesai):
+        libur = holidays.Indonesia()
+        hari, jumlah = mulai, 0
+        while hari <= selesai:
+            jumlah += hari.weekday() < 5 and hari not in libur
+            hari += timedelta(days=1)
+        return jumlah
+
+    def test_sama_dengan_perhitungan_manual(self):
+        rentang = [
+            (datetime.date(2024, 1, 1), datetime.date(2024, 1, 1)),    # Tahun baru (libur)
+            (datetime.date(2024, 1, 6), datetime.date(2024, 1, 7)),    # Akhir pekan
+            (datetime.date(2024, 3, 1), datetime.date(2024, 4, 30)),   # Melewati Idul Fitri
+            (datetime.date(2024, 12, 20), datetime.date(2025, 1, 10)), # Lintas tahun
+            (datetime.date(2022, 6, 15), datetime.date(2026, 2, 3)),   # Beberapa tahun
+            (datetime.date(2024, 2, 29), datetime.date(2024, 12, 31)), # Tahun kabisat
+        ]
+        for mulai, selesai in rentang:
+            self.assertEqual(calculate_working_days(mulai, selesai), self.hitung_manual(mulai, selesai), (mulai, selesai))
+
+    def test_rentang_terbalik_nol(self):
+        self.assertEqual(calculate_working_days(datetime.date(2024, 5, 2), datetime.date(2024, 5, 1)), 0)
+
+    def test_batch_urutan_sesuai_input(self):
+        pasangan = [
+            (datetime.date(2024, 1, 1), datetime.date(2024, 1, 31)),
+            (datetime.date(2023, 7, 1), datetime.date(2024, 6, 30)),
+            (datetime.date(2024, 1, 8), datetime.date(2024, 1, 12)),
+        ]
+        self.assertEqual(
+            calculate_working_days_batch(pasangan),
+            [calculate_working_days(mulai, selesai) for mulai, selesai in pasangan],
+        )
+        self.assertEqual(calculate_working_days_batch(pasangan)[2], 5)
+
+    def test_rentang_banyak_tahun_tanpa_menjumlah_per_tahun(self):
+        from . import utils
+        utils.hapus_cache_kalender()
+        self.addCleanup(utils.hapus_cache_kalender)
+        # Tahun acuan kumulatif di tengah, lalu diperluas ke belakang dan ke depan
+        for mulai, selesai in [
+            (datetime.date(2024, 3, 1), datetime.date(2025, 2, 1)),
+            (datetime.date(2019, 12, 30), datetime.date(2024, 1, 2)),
+            (datetime.date(2021, 5, 5), datetime.date(2027, 8, 17)),
+        ]:
+            self.assertEqual(calculate_working_days(mulai, selesai), self.hitung_manual(mulai, selesai), (mulai, selesai))
+
+        with mock.patch.object(utils, '_hari_kerja_setahun', side_effect=AssertionError("tidak boleh dijumlah ulang")):
+            self.assertEqual(
+                calculate_working_days(datetime.date(2019, 2, 1), datetime.date(2027, 3, 1)),
+                self.hitung_manual(datetime.date(2019, 2, 1), datetime.date(2027, 3, 1)),
+            )
+
+
+def jalankan_di_proses_lain(*args):
+    """
+    Menjalankan management command di proses terpisah (fork), seperti cron atau
+    worker di server sungguhan: cache lokal proses tes tidak ikut tersentuh.
+    """
+    connections.close_all()
+    proses = multiprocessing.get_context('fork').Process(target=call_command, args=args, kwargs={'stdout': StringIO()})
+    proses.start()
+    proses.join(60)
+    return proses.exitcode
+
+
+class IsiAbsensiAlphaProsesLainTests(TransactionTestCase):
+    """
+    Command terjadwal berjalan di proses lain; invalidasi dashboard peserta
+    harus terlihat oleh proses web lewat cache bersama.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='alpha-cron@test.com', password='password123', nama_lengkap='Peserta')
+        self.profil = PesertaProfile.objects.create(
+            user=self.user, tipe_peserta='PELAJAR', nama_institusi='Kampus', status=PesertaProfile.StatusPeserta.AKTIF,
+            tanggal_mulai=datetime.date(2024, 1, 8), tanggal_selesai=datetime.date(2024, 1, 12),
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_dashboard_dibangun_ulang_setelah_command_di_proses_lain(self):
+        self.client.get(reverse('peserta-dashboard'))
+        key = f'peserta:dashboard:{self.profil.pk}'
+        self.assertIsNotNone(cache.get(key))
+
+        self.assertEqual(jalankan_di_proses_lain('isi_absensi_alpha', '--sampai', '2024-01-31'), 0)
+        self.assertEqual(Absensi.objects.filter(profil=self.profil, status_kehadiran='ALPHA').count(), 5)
+        self.assertIsNone(cache.get(key))
+
+
+class IsiAbsensiAlphaCommandTests(APITestCase):
+    """
+    Tes command isi_absensi_alpha: mengisi hari kerja kosong dan aman diulang.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        def buat_profil(email, status_peserta):
+            user = User.objects.create_user(email=email, password='password123', nama_lengkap=email)
+            return PesertaProfile.objects.create(
+                user=user, tipe_peserta='PELAJAR', nama_institusi='Kampus', status=status_peserta,
+                tanggal_mulai=datetime.date(2024, 1, 8), tanggal_selesai=datetime.date(2024, 1, 19),
+            )
+        cls.aktif = buat_profil('aktif@test.com', PesertaProfile.StatusPeserta.AKTIF)
+        cls.selesai = buat_profil('selesai@test.com', PesertaProfile.StatusPeserta.SELESAI)
+        Absensi.objects.create(profil=cls.aktif, tanggal='2024-01-09', status_kehadiran='HADIR')
+
+    def jalankan(self, *args):
+        out = StringIO()
+        call_command('isi_absensi_alpha', '--sampai', '2024-01-31', *args, stdout=out)
+        return out.getvalue()
+
+    def test_mengisi_hari_kerja_kosong_dan_idempoten(self):
+        self.assertIn('9 baris ALPHA dibuat', self.jalankan())
+        alpha = Absensi.objects.filter(profil=self.aktif, status_kehadiran='ALPHA')
+        self.assertEqual(alpha.count(), 9)
+        # Akhir pekan tidak diisi, absensi yang sudah ada tidak ditimpa
+        self.assertFalse(alpha.filter(tanggal='2024-01-13').exists())
+        self.assertTrue(Absensi.objects.filter(profil=self.aktif, tanggal='2024-01-09', status_kehadiran='HADIR').exists())
+        self.assertFalse(Absensi.objects.filter(profil=self.selesai).exists())
+
+        # Rekap bulanan ikut diperbarui walaupun memakai bulk_create
+        kode = RekapAbsensiBulanan.objects.get(profil=self.aktif, bulan='2024-01-01').kode
+        self.assertEqual(kode[7:19], 'AHAAA--AAAAA')
+
+        self.assertIn('0 baris ALPHA dibuat', self.jalankan())
+        self.assertEqual(alpha.count(), 9)
+
+    def test_dry_run_dan_resume(self):
+        self.assertIn('9 baris ALPHA akan dibuat', self.jalankan('--dry-run'))
+        self.assertFalse(Absensi.objects.filter(status_kehadiran='ALPHA').exists())
+
+        self.assertIn('0 baris ALPHA dibuat', self.jalankan('--setelah-id', str(self.aktif.pk)))
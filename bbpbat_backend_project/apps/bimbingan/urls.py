@@ -12,7 +12,8 @@ from .views import (
     AbsensiAdminViewSet,
     LaporanAdminViewSet,
     AdminSertifikatViewSet,
-    PenempatanAdminViewSet 
+    PenempatanAdminViewSet,
+    AktivitasAdminViewSet,
 )
 
 # Router untuk semua ViewSet yang khusus untuk admin
@@ -22,6 +23,7 @@ admin_router.register(r'absensi', AbsensiAdminViewSet, basename='admin-absensi')
 admin_router.register(r'laporan', LaporanAdminViewSet, basename='admin-laporan')
 admin_router.register(r'sertifikat', AdminSertifikatViewSet, basename='admin-sertifikat')
 admin_router.register(r'penempatan', PenempatanAdminViewSet, basename='admin-penempatan')
+admin_router.register(r'aktivitas', AktivitasAdminViewSet, basename='admin-aktivitas')
 
 
 urlpatterns = [
@@ -1,33 +1,118 @@
 import holidays
+import threading
+from array import array
 from datetime import date, timedelta
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def _kalender_hari_kerja(tahun):
+    """
+    Tabel prefix-sum hari kerja untuk satu tahun (di-cache per proses).
+    Elemen ke-i berisi jumlah hari kerja dari 1 Januari sampai sebelum hari
+    ke-i dalam tahun itu, sehingga rentang apa pun cukup dihitung dengan
+    satu pengurangan.
+
+    - Hari kerja adalah Senin sampai Jumat.
+    - Tidak termasuk hari libur nasional Indonesia.
+    """
+    # Inisialisasi kalender hari libur Indonesia hanya untuk tahun ini
+    id_holidays = holidays.Indonesia(years=tahun)
+
+    hari = date(tahun, 1, 1)
+    satu_hari = timedelta(days=1)
+    prefix = array('H', [0])
+    while hari.year == tahun:
+        # weekday() mengembalikan 5 untuk Sabtu dan 6 untuk Minggu
+        kerja = hari.weekday() < 5 and hari not in id_holidays
+        prefix.append(prefix[-1] + kerja)
+        hari += satu_hari
+    return prefix
+
+
+def _hari_kerja_setahun(tahun):
+    return _kalender_hari_kerja(tahun)[-1]
+
+
+# Jumlah hari kerja kumulatif sampai 1 Januari setiap tahun, relatif terhadap
+# tahun pertama yang diminta (hanya selisih antar tahun yang bermakna).
+# Diperluas ke depan/belakang saat tahun baru diminta; setiap tahun hanya
+# dijumlahkan sekali per proses.
+_kumulatif_awal_tahun = {}
+_kunci_kumulatif = threading.Lock()
+
+
+def _hari_kerja_sebelum_tahun(tahun):
+    kumulatif = _kumulatif_awal_tahun.get(tahun)
+    if kumulatif is not None:
+        return kumulatif
+    with _kunci_kumulatif:
+        if not _kumulatif_awal_tahun:
+            _kumulatif_awal_tahun[tahun] = 0
+        terkecil, terbesar = min(_kumulatif_awal_tahun), max(_kumulatif_awal_tahun)
+        for t in range(terbesar, tahun):
+            _kumulatif_awal_tahun[t + 1] = _kumulatif_awal_tahun[t] + _hari_kerja_setahun(t)
+        for t in range(terkecil - 1, tahun - 1, -1):
+            _kumulatif_awal_tahun[t] = _kumulatif_awal_tahun[t + 1] - _hari_kerja_setahun(t)
+        return _kumulatif_awal_tahun[tahun]
+
+
+def hapus_cache_kalender():
+    _kalender_hari_kerja.cache_clear()
+    with _kunci_kumulatif:
+        _kumulatif_awal_tahun.clear()
+
 
 def calculate_working_days(start_date, end_date):
     """
-    Menghitung jumlah hari kerja antara dua tanggal.
+    Menghitung jumlah hari kerja antara dua tanggal (inklusif).
 
     - Hari kerja adalah Senin sampai Jumat.
     - Tidak termasuk hari Sabtu dan Minggu.
     - Tidak termasuk hari libur nasional Indonesia.
+
+    Memakai tabel prefix-sum per tahun ditambah total kumulatif per awal
+    tahun: rentang sepanjang apa pun dijawab dengan dua lookup dan satu
+    pengurangan, tanpa menjumlahkan tahun-tahun di antaranya.
+    """
+    if start_date > end_date:
+        return 0
+
+    awal = _kalender_hari_kerja(start_date.year)
+    indeks_awal = start_date.timetuple().tm_yday - 1
+    indeks_akhir = end_date.timetuple().tm_yday
+
+    if start_date.year == end_date.year:
+        return awal[indeks_akhir] - awal[indeks_awal]
+
+    akhir = _kalender_hari_kerja(end_date.year)
+    return (
+        _hari_kerja_sebelum_tahun(end_date.year) + akhir[indeks_akhir]
+        - _hari_kerja_sebelum_tahun(start_date.year) - awal[indeks_awal]
+    )
+
+
+def calculate_working_days_batch(date_ranges):
+    """
+    Versi batch dari calculate_working_days untuk laporan progres program:
+    menerima iterable pasangan (start_date, end_date) dan mengembalikan list
+    jumlah hari kerja dengan urutan yang sama. Kalender tiap tahun hanya
+    dibangun sekali untuk seluruh batch.
+    """
+    return [calculate_working_days(start_date, end_date) for start_date, end_date in date_ranges]
+
+
+def iter_working_days(start_date, end_date):
+    """
+    Menghasilkan setiap tanggal hari kerja dalam rentang (inklusif), dibaca
+    dari kalender prefix-sum yang sama dengan calculate_working_days.
     """
-    
-    # Inisialisasi kalender hari libur untuk Indonesia
-    # 'ID' adalah kode negara untuk Indonesia
-    id_holidays = holidays.Indonesia()
-    
-    working_days = 0
-    current_date = start_date
-    
-    # Loop melalui setiap hari dari tanggal mulai hingga tanggal selesai
-    while current_date <= end_date:
-        # weekday() mengembalikan 0 untuk Senin dan 6 untuk Minggu.
-        # Jadi, 5 adalah Sabtu dan 6 adalah Minggu.
-        is_weekend = current_date.weekday() >= 5
-        
-        # Cek apakah tanggal saat ini adalah hari libur atau weekend
-        if not is_weekend and current_date not in id_holidays:
-            working_days += 1
-            
-        # Lanjut ke hari berikutnya
-        current_date += timedelta(days=1)
-        
-    return working_days
\ No newline at end of file
+    hari = start_date
+    while hari <= end_date:
+        prefix = _kalender_hari_kerja(hari.year)
+        awal_tahun = date(hari.year, 1, 1)
+        akhir = min(end_date, date(hari.year, 12, 31))
+        for i in range(hari.timetuple().tm_yday - 1, akhir.timetuple().tm_yday):
+            if prefix[i + 1] != prefix[i]:
+                yield awal_tahun + timedelta(days=i)
+        hari = akhir + timedelta(days=1)
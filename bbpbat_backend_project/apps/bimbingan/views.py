@@ -1,45 +1,63 @@
 # File: bbpbat_backend_project/apps/bimbingan/views.py
 import os
 import io
+import json
+import time
 from docx import Document
-from django.conf import settings
-from django.utils.dateformat import DateFormat
 
-from rest_framework import generics, permissions, viewsets, status
+from rest_framework import generics, mixins, permissions, viewsets, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.decorators import action
+from rest_framework.reverse import reverse
 from django.shortcuts import get_object_or_404
-import random
-import string
 from django.utils import timezone
 from django.utils.timesince import timesince
-from datetime import timedelta
+from calendar import monthrange
+from collections import Counter
+from datetime import datetime, timedelta
 from django.core.files.base import ContentFile 
 from django.db import transaction
-from django.db.models import Q
+from django.core.cache import cache
+from django.db.models import Case, Count, IntegerField, Q, Value, When
+from django.utils.http import parse_etags
+from django.utils.dateparse import parse_date
+from django.http import StreamingHttpResponse
 
 
 
 # Import model dan serializer yang dibutuhkan
-from .models import Penempatan, Pendaftaran, Laporan, Absensi, Sertifikat
+from .models import (
+    Penempatan, Pendaftaran, Laporan, Absensi, SertifikatJob, Aktivitas,
+    RekapAbsensiBulanan, KODE_ABSENSI, KODE_KOSONG,
+)
+from .cache_utils import get_daftar_penempatan, KEY_DASHBOARD_ADMIN, TIMEOUT_DASHBOARD_ADMIN
+from .export_utils import stream_csv, stream_xlsx, stream_zip
+from .sertifikat_utils import (
+    SertifikatTidakValid, cek_prasyarat, path_template, queryset_peserta_layak, template_untuk,
+    terbitkan_sertifikat_massal,
+)
 from .serializers import (
     PenempatanSerializer, 
     PendaftaranCreateSerializer, 
     PendaftaranAdminSerializer,
     AbsensiSerializer,
+    AbsensiBulkItemSerializer,
     LaporanAdminSerializer,
     LaporanAdminUpdateSerializer,
     PesertaSertifikatSerializer,
-    SertifikatDetailSerializer,
+    SertifikatJobSerializer,
     PenempatanAdminSerializer,  # <-- Tambahkan ini
-    PenempatanUpdateSerializer  # 
+    PenempatanUpdateSerializer,
+    AktivitasSerializer,
 )
 
 # Import izin kustom dan model dari aplikasi lain
 from apps.users.permissions import IsAdminUser
+from apps.pagination import AdminKeysetPagination, KeysetPagination
 from apps.users.models import User
-from apps.peserta.models import PesertaProfile, BuktiPembayaran 
+from apps.peserta.models import PesertaProfile
+from apps.peserta.cache_utils import invalidate_dashboard_peserta
 
 # --- Helper Function yang lebih andal ---
 def docx_replace(doc, data):
@@ -63,10 +81,26 @@ def docx_replace(doc, data):
 # --- VIEWS UNTUK PUBLIK (TIDAK DIUBAH) ---
 # ... (kode PenempatanListView dan PendaftaranCreateView tetap sama) ...
 class PenempatanListView(generics.ListAPIView):
+    """
+    Daftar unit penempatan & sisa kuota untuk publik.
+    Respons di-cache (diinvalidasi saat kuota/pendaftaran berubah) dan diberi
+    ETag kuat, sehingga polling dengan If-None-Match cukup dijawab 304.
+    """
     queryset = Penempatan.objects.all()
     serializer_class = PenempatanSerializer
     permission_classes = [permissions.AllowAny]
 
+    def list(self, request, *args, **kwargs):
+        data, etag = get_daftar_penempatan(
+            lambda: self.get_serializer(self.get_queryset(), many=True).data
+        )
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+
+        if_none_match = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+        if '*' in if_none_match or etag in if_none_match:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(data, headers=headers)
+
 class PendaftaranCreateView(generics.CreateAPIView):
     queryset = Pendaftaran.objects.all()
     serializer_class = PendaftaranCreateSerializer
@@ -87,12 +121,19 @@ class PendaftaranCreateView(generics.CreateAPIView):
 # ... (kode AdminPendaftaranViewSet dan AdminDashboardStatsView tetap sama) ...
 class AdminPendaftaranViewSet(viewsets.ViewSet):
     permission_classes = [IsAdminUser]
+    keyset_ordering = ('-tanggal_daftar', 'id')
 
     def list(self, request):
         queryset = Pendaftaran.objects.filter(status=Pendaftaran.Status.PENDING)
         tipe_peserta = request.query_params.get('tipe_peserta', None)
         if tipe_peserta:
             queryset = queryset.filter(tipe_peserta=tipe_peserta)
+
+        # ViewSet biasa tidak punya pagination_class, jadi paginator dipanggil manual
+        paginator = AdminKeysetPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        if page is not None:
+            return paginator.get_paginated_response(PendaftaranAdminSerializer(page, many=True).data)
         serializer = PendaftaranAdminSerializer(queryset, many=True)
         return Response(serializer.data)
     
@@ -102,24 +143,15 @@ class AdminPendaftaranViewSet(viewsets.ViewSet):
         pendaftaran = get_object_or_404(Pendaftaran, pk=pk)
         if pendaftaran.status != Pendaftaran.Status.PENDING:
             return Response({"error": "Pendaftaran ini sudah diproses."}, status=status.HTTP_400_BAD_REQUEST)
-        password = ''.join(random.choices(string.ascii_letters + string.digits, k=12))
+        # Jalur yang sama dengan persetujuan massal (bulk_create + hashing scrypt)
         try:
-            user = User.objects.create_user(email=pendaftaran.email, password=password, nama_lengkap=pendaftaran.nama_lengkap, role=User.Role.PESERTA)
+            [(_, user, profil, password)] = Pendaftaran.buat_akun_massal([pendaftaran])
         except Exception as e:
             return Response({"error": f"Gagal membuat user: {e}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-        PesertaProfile.objects.create(
-            user=user, 
-            tipe_peserta=pendaftaran.tipe_peserta, 
-            nama_institusi=pendaftaran.nama_institusi, 
-            no_telepon=pendaftaran.no_telepon, 
-            penempatan=pendaftaran.pilihan_penempatan,
-            nama_pembimbing=pendaftaran.nama_pembimbing,
-            no_telepon_pembimbing=pendaftaran.no_telepon_pembimbing,
-            email_pembimbing=pendaftaran.email_pembimbing, 
-            )
         pendaftaran.status = Pendaftaran.Status.DISETUJUI
         pendaftaran.user_terkait = user
         pendaftaran.save()
+        Aktivitas.catat(Aktivitas.Tipe.PERSETUJUAN, f"Pendaftaran {pendaftaran.nama_lengkap} disetujui", profil=profil)
         return Response({"message": "Pendaftaran berhasil disetujui.","email": user.email, "password_sementara": password}, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['post'])
@@ -132,56 +164,220 @@ class AdminPendaftaranViewSet(viewsets.ViewSet):
         pendaftaran.save()
         return Response({"message": "Pendaftaran telah ditolak."}, status=status.HTTP_200_OK)
 
+    MAKS_ID_BULK = 500
+
+    def _ambil_ids(self, request):
+        """ Membaca body {"ids": [...]}; mengembalikan (ids, response_error). """
+        ids = request.data.get('ids') if isinstance(request.data, dict) else None
+        if not isinstance(ids, list) or not ids:
+            return None, Response({"error": "Kirim daftar id pendaftaran pada field 'ids'."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > self.MAKS_ID_BULK:
+            return None, Response({"error": f"Maksimal {self.MAKS_ID_BULK} pendaftaran per permintaan."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            return list(dict.fromkeys(int(pk) for pk in ids)), None
+        except (TypeError, ValueError):
+            return None, Response({"error": "Semua id harus berupa angka."}, status=status.HTTP_400_BAD_REQUEST)
+
+    @staticmethod
+    def _kunci_pending(ids):
+        """
+        Mengunci pendaftaran PENDING di `ids` (harus di dalam transaksi). Baris
+        yang sedang dikunci admin lain dilewati (skip_locked), bukan ditunggu.
+        """
+        return list(
+            Pendaftaran.objects.select_for_update(skip_locked=True)
+            .filter(pk__in=ids, status=Pendaftaran.Status.PENDING)
+            .order_by('pk')
+        )
+
+    @staticmethod
+    def _alasan_dilewati(ids, diproses):
+        """ Alasan untuk id yang tidak ikut diproses, dalam satu query. """
+        sisa = [pk for pk in ids if pk not in diproses]
+        status_sisa = dict(Pendaftaran.objects.filter(pk__in=sisa).values_list('pk', 'status'))
+        dilewati = []
+        for pk in sisa:
+            if pk not in status_sisa:
+                alasan = "Pendaftaran tidak ditemukan."
+            elif status_sisa[pk] == Pendaftaran.Status.PENDING:
+                alasan = "Sedang diproses oleh admin lain."
+            else:
+                alasan = "Pendaftaran ini sudah diproses."
+            dilewati.append({'id': pk, 'alasan': alasan})
+        return dilewati
+
+    @action(detail=False, methods=['post'], url_path='bulk-approve')
+    def bulk_approve(self, request):
+        """
+        Menyetujui banyak pendaftaran sekaligus. Body: {"ids": [...]}.
+        Akun dibuat dengan Pendaftaran.buat_akun_massal (bulk_create, hashing
+        paralel), status diubah dalam satu UPDATE, dan seluruh password
+        sementara dikembalikan dalam satu respons.
+        """
+        ids, error = self._ambil_ids(request)
+        if error:
+            return error
+
+        disetujui, dilewati = [], []
+        with transaction.atomic():
+            pending = self._kunci_pending(ids)
+
+            # Email yang sudah punya akun tidak bisa dibuatkan user baru. Dibandingkan
+            # dalam bentuk yang disimpan buat_akun_massal (normalize_email), dan dua
+            # pendaftaran dengan email yang sama hanya yang pertama dibuatkan akun.
+            email_normal = {p.pk: User.objects.normalize_email(p.email) for p in pending}
+            email_terpakai = set(
+                User.objects.filter(email__in=set(email_normal.values())).values_list('email', flat=True)
+            )
+            bisa_dibuat = []
+            for pendaftaran in pending:
+                email = email_normal[pendaftaran.pk]
+                if email in email_terpakai:
+                    dilewati.append({'id': pendaftaran.pk, 'alasan': "Email sudah terdaftar sebagai pengguna."})
+                else:
+                    email_terpakai.add(email)
+                    bisa_dibuat.append(pendaftaran)
+
+            if bisa_dibuat:
+                hasil = Pendaftaran.buat_akun_massal(bisa_dibuat)
+                # PENDING -> DISETUJUI sama-sama menempati kuota: counter tidak berubah
+                Pendaftaran.objects.filter(pk__in=[p.pk for p in bisa_dibuat]).update(
+                    status=Pendaftaran.Status.DISETUJUI,
+                    user_terkait=Case(
+                        *[When(pk=pendaftaran.pk, then=Value(user.pk)) for pendaftaran, user, _, _ in hasil],
+                        output_field=IntegerField(),
+                    ),
+                )
+                Aktivitas.objects.bulk_create([
+                    Aktivitas(
+                        tipe=Aktivitas.Tipe.PERSETUJUAN,
+                        teks=f"Pendaftaran {pendaftaran.nama_lengkap} disetujui"[:255],
+                        profil=profil,
+                    )
+                    for pendaftaran, _, profil, _ in hasil
+                ])
+                disetujui = [
+                    {
+                        'id': pendaftaran.pk,
+                        'nama_lengkap': pendaftaran.nama_lengkap,
+                        'email': user.email,
+                        'password_sementara': password,
+                    }
+                    for pendaftaran, user, _, password in hasil
+                ]
+
+        dilewati += self._alasan_dilewati(ids, {p.pk for p in pending})
+        return Response({
+            "message": f"{len(disetujui)} pendaftaran disetujui, {len(dilewati)} dilewati.",
+            "disetujui": disetujui,
+            "dilewati": dilewati,
+        }, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'], url_path='bulk-reject')
+    def bulk_reject(self, request):
+        """
+        Menolak banyak pendaftaran sekaligus. Body: {"ids": [...]}.
+        Status diubah dalam satu UPDATE; karena update() tidak melewati
+        Pendaftaran.save(), counter kuota dikurangi eksplisit per (unit, tipe).
+        """
+        ids, error = self._ambil_ids(request)
+        if error:
+            return error
+
+        with transaction.atomic():
+            pending = self._kunci_pending(ids)
+            Pendaftaran.objects.filter(pk__in=[p.pk for p in pending]).update(status=Pendaftaran.Status.DITOLAK)
+
+            slot_dilepas = Counter(
+                slot for slot in (
+                    Pendaftaran._slot_kuota(p.pilihan_penempatan_id, p.tipe_peserta, p.status) for p in pending
+                ) if slot
+            )
+            for (penempatan_id, tipe_peserta), jumlah in slot_dilepas.items():
+                Penempatan.objects.geser_kuota(penempatan_id, tipe_peserta, -jumlah)
+
+        return Response({
+            "message": f"{len(pending)} pendaftaran ditolak.",
+            "ditolak": [p.pk for p in pending],
+            "dilewati": self._alasan_dilewati(ids, {p.pk for p in pending}),
+        }, status=status.HTTP_200_OK)
+
 class AdminDashboardStatsView(APIView):
+    """
+    Statistik & aktivitas terbaru untuk dashboard admin.
+    Dihitung dengan satu aggregate per tabel dan satu bacaan feed Aktivitas,
+    lalu di-cache sebentar (TTL pendek) untuk semua admin.
+    Riwayat lengkap tersedia di endpoint feed `admin/aktivitas/`.
+    """
     permission_classes = [IsAdminUser]
 
-    def get(self, request):
-        # 1. Ambil data statistik (seperti sebelumnya)
-        stats_data = {
-            'pendaftar_baru': Pendaftaran.objects.filter(status='PENDING').count(),
-            'peserta_aktif': PesertaProfile.objects.filter(status='AKTIF').count(),
-            'peserta_selesai': PesertaProfile.objects.filter(status='SELESAI').count(),
-            'peserta_lulus': PesertaProfile.objects.filter(status='LULUS').count(),
-            'laporan_baru': Laporan.objects.filter(status_review='BARU').count(),
-            'laporan_direview': Laporan.objects.filter(status_review='DIREVIEW').count(),
-            'laporan_diterima': Laporan.objects.filter(status_review='DITERIMA').count(),
+    def hitung_ringkasan(self):
+        # 1. Statistik: conditional aggregate, satu query per tabel
+        stats_data = {}
+        stats_data.update(Pendaftaran.objects.aggregate(
+            pendaftar_baru=Count('id', filter=Q(status='PENDING')),
+        ))
+        stats_data.update(PesertaProfile.objects.aggregate(
+            peserta_aktif=Count('id', filter=Q(status='AKTIF')),
+            peserta_selesai=Count('id', filter=Q(status='SELESAI')),
+            peserta_lulus=Count('id', filter=Q(status='LULUS')),
+        ))
+        stats_data.update(Laporan.objects.aggregate(
+            laporan_baru=Count('id', filter=Q(status_review='BARU')),
+            laporan_direview=Count('id', filter=Q(status_review='DIREVIEW')),
+            laporan_diterima=Count('id', filter=Q(status_review='DITERIMA')),
+        ))
+
+        # 2. Aktivitas terbaru: dibaca langsung dari feed (indeks waktu, id)
+        aktivitas = Aktivitas.objects.order_by('-waktu', '-id').values('tipe', 'teks', 'waktu')[:5]
+
+        return {
+            'stats': stats_data,
+            'aktivitas': list(aktivitas),
         }
 
-        # 2. Ambil 5 pendaftaran terbaru yang masih pending
-        pendaftaran_terbaru = Pendaftaran.objects.filter(status='PENDING').order_by('-tanggal_daftar')[:5]
-        
-        # 3. Ambil 5 laporan terbaru yang statusnya 'BARU'
-        laporan_terbaru = Laporan.objects.select_related('profil__user').filter(status_review='BARU').order_by('-disubmit_pada')[:5]
-
-        # 4. Gabungkan dan format aktivitas terbaru
-        aktivitas = []
-        for p in pendaftaran_terbaru:
-            aktivitas.append({
-                'tipe': 'PENDAFTARAN',
-                'teks': f"Pendaftaran baru dari {p.nama_lengkap}",
-                'waktu_raw': p.tanggal_daftar,
-                'waktu': f"{timesince(p.tanggal_daftar)} yang lalu"
-            })
-        
-        for l in laporan_terbaru:
-            aktivitas.append({
-                'tipe': 'LAPORAN',
-                'teks': f"Laporan baru dari {l.profil.user.nama_lengkap}",
-                'waktu_raw': l.disubmit_pada,
-                'waktu': f"{timesince(l.disubmit_pada)} yang lalu"
-            })
-        
-        # 5. Urutkan semua aktivitas berdasarkan waktu, ambil 5 teratas
-        aktivitas_terurut = sorted(aktivitas, key=lambda x: x['waktu_raw'], reverse=True)[:5]
+    def get(self, request):
+        ringkasan = cache.get_or_set(KEY_DASHBOARD_ADMIN, self.hitung_ringkasan, TIMEOUT_DASHBOARD_ADMIN)
+
+        # "x yang lalu" disusun saat respons agar tetap akurat meski dari cache
+        aktivitas_terurut = [
+            {
+                'tipe': a['tipe'],
+                'teks': a['teks'],
+                'waktu_raw': a['waktu'],
+                'waktu': f"{timesince(a['waktu'])} yang lalu"
+            }
+            for a in ringkasan['aktivitas']
+        ]
 
-        # 6. Kirim semua data dalam satu respons
         response_data = {
-            'stats': stats_data,
+            'stats': ringkasan['stats'],
             'aktivitas_terbaru': aktivitas_terurut
         }
         
         return Response(response_data)
 
+class AktivitasPagination(KeysetPagination):
+    ordering = ('-waktu', '-id')
+
+
+class AktivitasAdminViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    Feed aktivitas untuk admin, terbaru lebih dulu, dengan keyset (cursor)
+    pagination: ikuti link `next` untuk menelusuri riwayat ke belakang.
+    - Mendukung filter tipe (?tipe=LAPORAN).
+    """
+    permission_classes = [IsAdminUser]
+    serializer_class = AktivitasSerializer
+    pagination_class = AktivitasPagination
+
+    def get_queryset(self):
+        queryset = Aktivitas.objects.all()
+        tipe = self.request.query_params.get('tipe', None)
+        if tipe:
+            queryset = queryset.filter(tipe=tipe.upper())
+        return queryset
+
 # =================================================================
 #             VIEWSET UNTUK MANAJEMEN ABSENSI ADMIN
 # =================================================================
@@ -190,9 +386,13 @@ class AbsensiAdminViewSet(viewsets.ModelViewSet):
     ViewSet untuk admin mengelola data absensi peserta.
     - Mendukung filter berdasarkan tanggal (?tanggal=YYYY-MM-DD).
     - Mendukung filter berdasarkan tipe peserta (?tipe_peserta=student atau ?tipe_peserta=general).
+    - export: unduh absensi rentang tanggal sebagai CSV/XLSX (di-stream).
+    - matriks: rekap satu bulan (peserta x hari) dari tabel RekapAbsensiBulanan.
     """
     serializer_class = AbsensiSerializer
     permission_classes = [IsAdminUser]
+    pagination_class = AdminKeysetPagination
+    keyset_ordering = ('profil__user__nama_lengkap', 'id')
 
     def get_queryset(self):
         """
@@ -221,6 +421,213 @@ class AbsensiAdminViewSet(viewsets.ModelViewSet):
         # Urutkan berdasarkan nama untuk tampilan yang konsisten
         return queryset.order_by('profil__user__nama_lengkap')
 
+    # Kolom ekspor: (judul kolom, lookup values_list)
+    KOLOM_EKSPOR = (
+        ('Tanggal', 'tanggal'),
+        ('Nama Peserta', 'profil__user__nama_lengkap'),
+        ('Email', 'profil__user__email'),
+        ('Tipe Peserta', 'profil__tipe_peserta'),
+        ('Institusi', 'profil__nama_institusi'),
+        ('Penempatan', 'profil__penempatan__nama'),
+        ('Status Kehadiran', 'status_kehadiran'),
+        ('Jam Masuk', 'jam_masuk'),
+        ('Jam Keluar', 'jam_keluar'),
+        ('Keterangan', 'keterangan'),
+    )
+    UKURAN_CHUNK_EKSPOR = 2000
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Ekspor absensi rentang tanggal sebagai CSV atau XLSX yang di-stream.
+        Query params: mulai, selesai (YYYY-MM-DD, wajib), tipe_peserta
+        (student/general atau PELAJAR/UMUM), penempatan (id), berkas (csv/xlsx).
+        Baris dibaca dengan iterator() dan langsung ditulis ke respons, jadi
+        pemakaian memori tetap datar berapa pun jumlah barisnya.
+        """
+        try:
+            mulai = parse_date(request.query_params.get('mulai') or '')
+            selesai = parse_date(request.query_params.get('selesai') or '')
+        except ValueError:
+            # Format benar tapi tanggal tidak ada (mis. 2024-02-30)
+            mulai = selesai = None
+        if not mulai or not selesai or mulai > selesai:
+            return Response(
+                {"error": "Parameter 'mulai' dan 'selesai' wajib diisi (YYYY-MM-DD) dan mulai <= selesai."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        berkas = request.query_params.get('berkas', 'csv').lower()
+        if berkas not in ('csv', 'xlsx'):
+            return Response({"error": "Format berkas harus 'csv' atau 'xlsx'."}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = Absensi.objects.filter(tanggal__range=(mulai, selesai))
+        tipe_peserta = request.query_params.get('tipe_peserta')
+        if tipe_peserta:
+            tipe_map = {'student': 'PELAJAR', 'general': 'UMUM'}
+            queryset = queryset.filter(profil__tipe_peserta=tipe_map.get(tipe_peserta.lower(), tipe_peserta.upper()))
+        penempatan = request.query_params.get('penempatan')
+        if penempatan:
+            try:
+                penempatan = int(penempatan)
+            except ValueError:
+                return Response({"error": "Parameter 'penempatan' harus berupa id angka."}, status=status.HTTP_400_BAD_REQUEST)
+            queryset = queryset.filter(profil__penempatan_id=penempatan)
+
+        header = [judul for judul, _ in self.KOLOM_EKSPOR]
+        rows = queryset.order_by('tanggal', 'profil__user__nama_lengkap', 'id').values_list(
+            *[lookup for _, lookup in self.KOLOM_EKSPOR]
+        ).iterator(chunk_size=self.UKURAN_CHUNK_EKSPOR)
+
+        nama_file = f"absensi_{mulai:%Y%m%d}_{selesai:%Y%m%d}.{berkas}"
+        if berkas == 'xlsx':
+            response = StreamingHttpResponse(
+                stream_xlsx(header, rows, nama_sheet='Absensi'),
+                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+            )
+        else:
+            response = StreamingHttpResponse(stream_csv(header, rows), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{nama_file}"'
+        return response
+
+    @action(detail=False, methods=['get'])
+    def matriks(self, request):
+        """
+        Matriks absensi satu bulan (peserta x hari) dari tabel rekap, dalam
+        bentuk kolom: `peserta`/`nama` sejajar dengan `kode`, tiap string kode
+        berisi satu karakter per tanggal di `tanggal`.
+        Query params: bulan (YYYY-MM, default bulan ini), tipe_peserta, penempatan.
+        """
+        bulan_param = request.query_params.get('bulan')
+        try:
+            bulan = datetime.strptime(bulan_param, '%Y-%m').date() if bulan_param else timezone.localdate().replace(day=1)
+        except ValueError:
+            return Response({"error": "Format bulan harus YYYY-MM."}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = RekapAbsensiBulanan.objects.filter(bulan=bulan)
+        tipe_peserta = request.query_params.get('tipe_peserta')
+        if tipe_peserta:
+            tipe_map = {'student': 'PELAJAR', 'general': 'UMUM'}
+            queryset = queryset.filter(profil__tipe_peserta=tipe_map.get(tipe_peserta.lower(), tipe_peserta.upper()))
+        penempatan = request.query_params.get('penempatan')
+        if penempatan:
+            try:
+                penempatan = int(penempatan)
+            except ValueError:
+                return Response({"error": "Parameter 'penempatan' harus berupa id angka."}, status=status.HTTP_400_BAD_REQUEST)
+            queryset = queryset.filter(profil__penempatan_id=penempatan)
+
+        baris = list(queryset.order_by('profil__user__nama_lengkap', 'profil_id').values_list(
+            'profil_id', 'profil__user__nama_lengkap', 'kode'
+        ))
+        jumlah_hari = monthrange(bulan.year, bulan.month)[1]
+
+        return Response({
+            'bulan': bulan.strftime('%Y-%m'),
+            'tanggal': [bulan.replace(day=hari).isoformat() for hari in range(1, jumlah_hari + 1)],
+            'legenda': {kode: status_kehadiran for status_kehadiran, kode in KODE_ABSENSI.items()} | {KODE_KOSONG: None},
+            'peserta': [profil_id for profil_id, _, _ in baris],
+            'nama': [nama for _, nama, _ in baris],
+            'kode': [kode for _, _, kode in baris],
+        })
+
+    MAKS_BARIS_BULK = 2000
+    KOLOM_BULK = ('status_kehadiran', 'jam_masuk', 'jam_keluar', 'keterangan')
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Upsert absensi massal, mis. memperbaiki satu hari untuk satu unit.
+        Body: list baris {profil_id, tanggal, status, jam_masuk, jam_keluar, keterangan}
+        (atau {"baris": [...]}). Semua baris divalidasi lebih dulu; jika ada
+        yang gagal tidak ada yang disimpan (400). Jika valid, semua ditulis
+        dalam satu transaksi dengan bulk_create(update_conflicts=True).
+        Respons berisi hasil per baris sesuai urutan input.
+        """
+        data = request.data.get('baris') if isinstance(request.data, dict) else request.data
+        if not isinstance(data, list) or not data:
+            return Response({"error": "Kirim list baris absensi."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(data) > self.MAKS_BARIS_BULK:
+            return Response(
+                {"error": f"Maksimal {self.MAKS_BARIS_BULK} baris per permintaan."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # 1. Validasi format semua baris dalam satu pass
+        errors, baris_valid = [], []
+        for item in data:
+            serializer = AbsensiBulkItemSerializer(data=item)
+            valid = serializer.is_valid()
+            errors.append({} if valid else serializer.errors)
+            baris_valid.append(serializer.validated_data if valid else None)
+
+        # 2. Cek profil (satu query) dan duplikat (profil, tanggal) di dalam payload
+        profil_ids = {item['profil_id'] for item in baris_valid if item}
+        profil_ada = set(PesertaProfile.objects.filter(pk__in=profil_ids).values_list('pk', flat=True))
+        kunci_terpakai = {}
+        for i, item in enumerate(baris_valid):
+            if not item:
+                continue
+            kunci = (item['profil_id'], item['tanggal'])
+            if item['profil_id'] not in profil_ada:
+                errors[i] = {'profil_id': ["Peserta tidak ditemukan."]}
+            elif kunci in kunci_terpakai:
+                errors[i] = {'tanggal': [f"Duplikat dengan baris {kunci_terpakai[kunci]}."]}
+            else:
+                kunci_terpakai[kunci] = i
+
+        if any(errors):
+            return Response({
+                "error": "Sebagian baris tidak valid, tidak ada data yang disimpan.",
+                "hasil": [
+                    {'index': i, 'errors': err} for i, err in enumerate(errors) if err
+                ],
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        # 3. Tulis semuanya dalam satu transaksi
+        tanggal_set = {item['tanggal'] for item in baris_valid}
+        with transaction.atomic():
+            sudah_ada = set(
+                Absensi.objects.filter(profil_id__in=profil_ids, tanggal__in=tanggal_set)
+                .values_list('profil_id', 'tanggal')
+            ) & kunci_terpakai.keys()
+            Absensi.objects.bulk_create(
+                [
+                    Absensi(
+                        profil_id=item['profil_id'], tanggal=item['tanggal'],
+                        status_kehadiran=item['status'], jam_masuk=item['jam_masuk'],
+                        jam_keluar=item['jam_keluar'], keterangan=item['keterangan'],
+                    )
+                    for item in baris_valid
+                ],
+                update_conflicts=True, unique_fields=['profil', 'tanggal'],
+                update_fields=list(self.KOLOM_BULK), batch_size=500,
+            )
+
+            # bulk_create tidak memanggil Absensi.save(): perbarui rekap bulanan manual
+            per_bulan = {}
+            for profil_id, tanggal in kunci_terpakai:
+                per_bulan.setdefault(tanggal.replace(day=1), set()).add(profil_id)
+            for bulan, ids in per_bulan.items():
+                RekapAbsensiBulanan.objects.bangun_ulang(bulan, ids)
+
+        invalidate_dashboard_peserta(*profil_ids)
+
+        hasil = [
+            {
+                'index': i,
+                'profil_id': item['profil_id'],
+                'tanggal': item['tanggal'].isoformat(),
+                'hasil': 'diperbarui' if (item['profil_id'], item['tanggal']) in sudah_ada else 'dibuat',
+            }
+            for i, item in enumerate(baris_valid)
+        ]
+        return Response({
+            'dibuat': len(hasil) - len(sudah_ada),
+            'diperbarui': len(sudah_ada),
+            'hasil': hasil,
+        })
+
 
 # =================================================================
 #                 VIEWSET UNTUK MANAJEMEN LAPORAN ADMIN
@@ -232,6 +639,8 @@ class LaporanAdminViewSet(viewsets.ModelViewSet):
     - Menggunakan serializer yang berbeda untuk membaca (list/detail) dan menulis (update).
     """
     permission_classes = [IsAdminUser]
+    pagination_class = AdminKeysetPagination
+    keyset_ordering = ('-disubmit_pada', 'id')
 
     def get_queryset(self):
         """
@@ -270,127 +679,145 @@ class AdminSertifikatViewSet(viewsets.ViewSet):
     """
     ViewSet final untuk manajemen sertifikat oleh Admin.
     - list: Menampilkan daftar peserta yang layak.
-    - create: Menerbitkan sertifikat secara aman menggunakan template Word.
+    - create: Memasukkan penerbitan sertifikat ke antrean worker (202 + id job).
+    - job: Status job penerbitan, dengan long-poll opsional.
+    - batch: Menerbitkan sertifikat banyak peserta sekaligus.
     """
     permission_classes = [IsAdminUser]
+    MAKS_PESERTA_BATCH = 500
+    # Batas long-poll agar satu request tidak menahan worker server terlalu lama
+    MAKS_TUNGGU_JOB = 30
+    INTERVAL_CEK_JOB = 0.5
 
     def list(self, request):
         """
         Menampilkan daftar peserta yang memenuhi syarat sertifikat
         berdasarkan aturan baru.
         """
-        # Syarat untuk peserta PELAJAR
-        syarat_pelajar = Q(
-            tipe_peserta=PesertaProfile.TipePeserta.PELAJAR,
-            laporan__status_review=Laporan.StatusReview.DITERIMA
-        )
-        
-        # Syarat untuk peserta UMUM
-        # Asumsi status pembayaran yang valid adalah "Telah Diverifikasi"
-        syarat_umum = Q(
-            tipe_peserta=PesertaProfile.TipePeserta.UMUM,
-            pembayaran__status_verifikasi="Telah Diverifikasi"
-        )
-        
-        # Query utama yang menggabungkan kedua syarat
-        queryset = PesertaProfile.objects.filter(
-            syarat_pelajar | syarat_umum,  # <-- Logika ATAU (OR)
-            status=PesertaProfile.StatusPeserta.SELESAI,
-            sertifikat__isnull=True
-        ).distinct().select_related('user', 'penempatan')
+        queryset = queryset_peserta_layak().select_related('user', 'penempatan')
 
         serializer = PesertaSertifikatSerializer(queryset, many=True)
         return Response(serializer.data)
     
-    @transaction.atomic
     def create(self, request):
-        """ Logika untuk membuat sertifikat menggunakan template PDF. """
+        """
+        Memasukkan penerbitan sertifikat ke antrean dan langsung membalas 202
+        dengan id job. Render PDF dikerjakan worker `manage.py proses_sertifikat`;
+        pantau hasilnya lewat `GET job/<id>/` (bisa long-poll dengan `?tunggu=`).
+        """
         peserta_id = request.data.get('peserta_id')
         if not peserta_id:
             return Response({"detail": "ID Peserta wajib diisi."}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            peserta = PesertaProfile.objects.select_for_update().get(id=peserta_id)
-        except PesertaProfile.DoesNotExist:
+            peserta = PesertaProfile.objects.get(id=peserta_id)
+        except (PesertaProfile.DoesNotExist, ValueError):
             return Response({"detail": "Peserta tidak ditemukan."}, status=status.HTTP_404_NOT_FOUND)
 
-        # --- VALIDASI PRASYARAT ---
-        if hasattr(peserta, 'sertifikat'):
-            return Response({"detail": "Peserta ini sudah memiliki sertifikat."}, status=status.HTTP_400_BAD_REQUEST)
-        
-        if peserta.status != PesertaProfile.StatusPeserta.SELESAI:
-            return Response({"detail": "Peserta belum menyelesaikan program."}, status=status.HTTP_400_BAD_REQUEST)
-
-        # =================================================================
-        # INI BLOK LOGIKA YANG DIPERBAIKI (PDF VERSION)
-        # =================================================================
-        if peserta.tipe_peserta == PesertaProfile.TipePeserta.PELAJAR:
-            # Syarat untuk Pelajar: Laporan Diterima
-            if not Laporan.objects.filter(profil=peserta, status_review=Laporan.StatusReview.DITERIMA).exists():
-                return Response({"detail": "Error: Laporan akhir peserta belum diterima."}, status=status.HTTP_400_BAD_REQUEST)
-        
-        elif peserta.tipe_peserta == PesertaProfile.TipePeserta.UMUM:
-            # Syarat untuk Umum: Pembayaran Diverifikasi
-            if not BuktiPembayaran.objects.filter(profil=peserta, status_verifikasi="Telah Diverifikasi").exists():
-                return Response({"detail": "Error: Bukti pembayaran peserta belum diverifikasi."}, status=status.HTTP_400_BAD_REQUEST)
-
-        # 2. Generate Nomor Sertifikat
-        tahun = timezone.now().year
-        sertifikat_terakhir = Sertifikat.objects.filter(nomor_sertifikat__startswith=f"BBPBAT/CERT/{tahun}").order_by('id').last()
-        nomor_urut = 1
-        if sertifikat_terakhir:
-            try:
-                nomor_urut = int(sertifikat_terakhir.nomor_sertifikat.split('/')[-1]) + 1
-            except ValueError:
-                pass # Fallback to 1 if parsing fails
-        nomor_sertifikat = f"BBPBAT/CERT/{tahun}/{str(nomor_urut).zfill(3)}"
-
-        # 3. Tentukan Path Template PDF
-        # Saat ini kita gunakan template yang sama dulu untuk demo, atau sesuaikan nama filenya
-        # template_name = 'E_SERTIFIKAT_PKL_MAGANG.pdf' 
-        # Atau jika ada beda:
-        template_name = 'E_SERTIFIKAT_PKL_MAGANG.pdf' # Gunakan file yang diminta user
-        
-        template_path = os.path.join(settings.BASE_DIR, 'certificate_templates', template_name)
-        if not os.path.exists(template_path):
-            return Response({"detail": f"File template PDF tidak ditemukan: {template_name} di {template_path}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-        # 4. Siapkan Data Pengganti (Konteks)
-        data_konteks = {
-            "{{NAMA_LENGKAP}}": peserta.user.nama_lengkap or '',
-            # "{{NOMOR_INDUK}}": peserta.nomor_induk or 'N/A', # PDF Template mungkin tidak butuh ini, cek pdf_utils
-            "{{NAMA_INSTITUSI}}": peserta.nama_institusi or '',
-            "{{NOMOR_SERTIFIKAT}}": nomor_sertifikat,
-            "{{TANGGAL_TERBIT}}": DateFormat(timezone.now()).format('j F Y'),
-            "{{TANGGAL_MULAI}}": DateFormat(peserta.tanggal_mulai).format('j F Y') if peserta.tanggal_mulai else 'N/A',
-            "{{TANGGAL_SELESAI}}": DateFormat(peserta.tanggal_selesai).format('j F Y') if peserta.tanggal_selesai else 'N/A',
-            "{{PENEMPATAN}}": peserta.penempatan.nama if peserta.penempatan else 'N/A',
-        }
-        
-        # 5. Import dan Panggil Generator PDF
-        # Pastikan import ada di atas file, atau import di sini (lazy import) untuk menghindari circular imports di views besar
-        from .pdf_utils import generate_pdf_certificate
-        
+        # Validasi cepat agar admin langsung tahu jika prasyarat belum terpenuhi;
+        # worker tetap mengecek ulang sebelum menyimpan.
         try:
-            pdf_stream = generate_pdf_certificate(template_path, data_konteks)
-        except Exception as e:
-            return Response({"detail": f"Gagal generate PDF: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            cek_prasyarat(peserta)
+        except SertifikatTidakValid as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            path_template(template_untuk(peserta))
+        except SertifikatTidakValid as e:
+            return Response({"detail": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-        # 6. Buat dan Simpan Objek Sertifikat
-        sertifikat = Sertifikat.objects.create(
-            profil=peserta,
-            nomor_sertifikat=nomor_sertifikat,
-            template_digunakan=Sertifikat.TemplateType.PELAJAR if peserta.tipe_peserta == PesertaProfile.TipePeserta.PELAJAR else Sertifikat.TemplateType.UMUM
+        job, _ = SertifikatJob.objects.antrekan(peserta.pk, dibuat_oleh=request.user)
+        status_url = reverse('admin-sertifikat-job', kwargs={'job_id': job.pk}, request=request)
+        return Response(
+            {
+                "message": "Penerbitan sertifikat masuk antrean.",
+                "job_id": job.pk,
+                "status": job.status,
+                "status_url": status_url,
+            },
+            status=status.HTTP_202_ACCEPTED,
+            headers={'Location': status_url},
         )
-        file_name = f'Sertifikat_{peserta.user.nama_lengkap.replace(" ", "_")}.pdf'
-        sertifikat.file_sertifikat.save(file_name, pdf_stream, save=True)
-        
-        # 7. Update status peserta
-        peserta.status = PesertaProfile.StatusPeserta.LULUS
-        peserta.save(update_fields=['status'])
-        
-        serializer = SertifikatDetailSerializer(sertifikat, context={'request': request})
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'], url_path='batch')
+    def batch(self, request):
+        """
+        Menerbitkan sertifikat untuk `peserta_ids` (list id) atau semua peserta
+        layak (`"semua": true`, maksimal MAKS_PESERTA_BATCH per permintaan;
+        `sisa` menunjukkan yang belum diproses). Dengan `"zip": true`, respons
+        berupa arsip ZIP berisi semua PDF + laporan.json yang di-stream.
+        """
+        semua = request.data.get('semua') is True
+        peserta_ids = None
+        if not semua:
+            peserta_ids = request.data.get('peserta_ids')
+            if not isinstance(peserta_ids, list) or not peserta_ids:
+                return Response({"error": "Kirim 'peserta_ids' berupa list id, atau 'semua': true."}, status=status.HTTP_400_BAD_REQUEST)
+            try:
+                peserta_ids = list(dict.fromkeys(int(i) for i in peserta_ids))
+            except (TypeError, ValueError):
+                return Response({"error": "Setiap id peserta harus berupa angka."}, status=status.HTTP_400_BAD_REQUEST)
+            if len(peserta_ids) > self.MAKS_PESERTA_BATCH:
+                return Response({"error": f"Maksimal {self.MAKS_PESERTA_BATCH} peserta per permintaan."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            hasil = terbitkan_sertifikat_massal(peserta_ids, batas=self.MAKS_PESERTA_BATCH if semua else None)
+        except SertifikatTidakValid as e:
+            return Response({"detail": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        laporan = {
+            "message": f"{len(hasil['diterbitkan'])} sertifikat diterbitkan.",
+            "diterbitkan": [
+                {
+                    "peserta_id": sertifikat.profil_id,
+                    "nama": sertifikat.profil.user.nama_lengkap,
+                    "sertifikat_id": sertifikat.pk,
+                    "nomor_sertifikat": sertifikat.nomor_sertifikat,
+                    "file_url": sertifikat.file_sertifikat.url,
+                }
+                for sertifikat in hasil['diterbitkan']
+            ],
+            "dilewati": hasil['dilewati'],
+            "sisa": hasil['sisa'],
+        }
+        if request.data.get('zip') is not True:
+            return Response(laporan, status=status.HTTP_201_CREATED if hasil['diterbitkan'] else status.HTTP_200_OK)
+
+        def entri_zip():
+            yield 'laporan.json', json.dumps(laporan, ensure_ascii=False, indent=2)
+            for sertifikat in hasil['diterbitkan']:
+                # Dibuka satu per satu saat giliran ditulis ke arsip
+                nama = f"{sertifikat.nomor_sertifikat.replace('/', '-')}_{os.path.basename(sertifikat.file_sertifikat.name)}"
+                yield nama, sertifikat.file_sertifikat.open('rb')
+
+        response = StreamingHttpResponse(stream_zip(entri_zip()), content_type='application/zip')
+        response['Content-Disposition'] = f'attachment; filename="sertifikat_{timezone.localdate():%Y%m%d}.zip"'
+        return response
+
+    @action(detail=False, methods=['get'], url_path=r'job/(?P<job_id>[0-9]+)', url_name='job')
+    def job(self, request, job_id=None):
+        """
+        Status job penerbitan. `?tunggu=<detik>` (maks MAKS_TUNGGU_JOB) menahan
+        respons sampai job SELESAI/GAGAL atau batas waktu habis, sehingga klien
+        tidak perlu polling rapat.
+        """
+        try:
+            tunggu = min(max(float(request.query_params.get('tunggu', 0)), 0), self.MAKS_TUNGGU_JOB)
+        except ValueError:
+            return Response({"detail": "Parameter tunggu harus berupa angka (detik)."}, status=status.HTTP_400_BAD_REQUEST)
+
+        status_final = [SertifikatJob.Status.SELESAI, SertifikatJob.Status.GAGAL]
+        batas = time.monotonic() + tunggu
+        job_status = SertifikatJob.objects.filter(pk=job_id).values_list('status', flat=True).first()
+        if job_status is None:
+            return Response({"detail": "Job tidak ditemukan."}, status=status.HTTP_404_NOT_FOUND)
+        while job_status not in status_final and time.monotonic() < batas:
+            time.sleep(min(self.INTERVAL_CEK_JOB, max(batas - time.monotonic(), 0)))
+            job_status = SertifikatJob.objects.filter(pk=job_id).values_list('status', flat=True).first()
+
+        job = SertifikatJob.objects.select_related(
+            'sertifikat__profil__user', 'sertifikat__profil__penempatan'
+        ).get(pk=job_id)
+        return Response(SertifikatJobSerializer(job, context={'request': request}).data)
 
 # =================================================================
 # ===== TAMBAHKAN VIEWSET BARU DI BAGIAN AKHIR UNTUK KUOTA ========
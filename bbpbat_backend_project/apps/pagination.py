@@ -0,0 +1,137 @@
+import base64
+import datetime
+import json
+from functools import reduce
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Pagination berbasis keyset (cursor) untuk daftar yang terus bertambah.
+    Halaman berikutnya diambil dengan `WHERE (kolom urut) < (nilai terakhir)`
+    sehingga biayanya tetap sama sedalam apa pun halaman yang dibuka, tidak
+    seperti OFFSET yang harus memindai semua baris sebelumnya.
+
+    `ordering` harus unik secara total (akhiri dengan 'id' / '-id') dan
+    sebaiknya didukung indeks komposit dengan urutan kolom yang sama.
+    """
+    ordering = ('-id',)
+    page_size = 20
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    # True: tanpa ?cursor / ?page_size kembalikan None sehingga view
+    # mengirim daftar datar seperti sebelum pagination diperkenalkan
+    mode_kompatibel = False
+
+    def get_ordering(self, view):
+        return getattr(view, 'keyset_ordering', self.ordering)
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def diminta(self, request):
+        """ Apakah klien meminta halaman (mengirim cursor atau page_size). """
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    @staticmethod
+    def _cursor_value(value):
+        # isoformat() penuh (DjangoJSONEncoder memotong ke milidetik, padahal
+        # posisi keyset harus persis sama dengan nilai di database)
+        if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+            return value.isoformat()
+        return value
+
+    def encode_cursor(self, values):
+        raw = json.dumps([self._cursor_value(v) for v in values]).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii')
+
+    def decode_cursor(self, cursor):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound("Cursor tidak valid.")
+        if not isinstance(values, list) or len(values) != len(self._ordering):
+            raise NotFound("Cursor tidak valid.")
+        return values
+
+    def keyset_filter(self, values):
+        """
+        Membangun kondisi "setelah posisi cursor" untuk urutan multi-kolom:
+        (a > x) OR (a = x AND b > y) OR ... dengan arah sesuai tanda '-'.
+        """
+        kondisi = []
+        for i, field in enumerate(self._ordering):
+            nama = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            sama = {f.lstrip('-'): v for f, v in zip(self._ordering[:i], values[:i])}
+            kondisi.append(Q(**sama, **{f'{nama}__{lookup}': values[i]}))
+        return reduce(lambda a, b: a | b, kondisi)
+
+    @staticmethod
+    def get_field_value(obj, field):
+        for attr in field.lstrip('-').split('__'):
+            obj = getattr(obj, attr) if obj is not None else None
+        return obj
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.mode_kompatibel and not self.diminta(request):
+            return None
+        self.request = request
+        self._ordering = list(self.get_ordering(view))
+        self.page_size_current = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self._ordering)
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(self.keyset_filter(self.decode_cursor(cursor)))
+
+        # Ambil satu baris ekstra untuk mengetahui apakah masih ada halaman berikutnya
+        rows = list(queryset[:self.page_size_current + 1])
+        self.has_next = len(rows) > self.page_size_current
+        self.page = rows[:self.page_size_current]
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        terakhir = self.page[-1]
+        values = [self.get_field_value(terakhir, field) for field in self._ordering]
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(values))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+
+class AdminKeysetPagination(KeysetPagination):
+    """
+    Keyset pagination untuk tabel-tabel admin. Klien lama yang tidak mengirim
+    `cursor`/`page_size` tetap menerima daftar datar; klien yang meminta
+    halaman menerima `{'next', 'results'}`.
+    """
+    page_size = 50
+    max_page_size = 200
+    mode_kompatibel = True
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pengumuman', '0003_pengumuman_kategori'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pengumuman',
+            index=models.Index(fields=['-dibuat_pada', 'id'], name='pengumuman_dibuat_idx'),
+        ),
+    ]
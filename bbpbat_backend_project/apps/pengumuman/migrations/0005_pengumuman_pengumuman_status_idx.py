@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pengumuman', '0004_pengumuman_pengumuman_dibuat_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pengumuman',
+            index=models.Index(fields=['status', 'target_peserta', '-dibuat_pada'], name='pengumuman_status_idx'),
+        ),
+    ]
@@ -36,6 +36,11 @@ class Pengumuman(models.Model):
         verbose_name = "Pengumuman"
         verbose_name_plural = "Pengumuman"
         ordering = ['-dipublish_pada', '-dibuat_pada'] # Urutkan berdasarkan tanggal terbaru
+        indexes = [
+            models.Index(fields=['-dibuat_pada', 'id'], name='pengumuman_dibuat_idx'),
+            # Pengumuman terbit untuk target tertentu (dashboard peserta)
+            models.Index(fields=['status', 'target_peserta', '-dibuat_pada'], name='pengumuman_status_idx'),
+        ]
 
     def __str__(self):
         return self.judul
@@ -1,6 +1,7 @@
 from rest_framework import viewsets, generics
 from rest_framework.permissions import IsAuthenticated
 from apps.users.permissions import IsAdminUser, IsPesertaUser
+from apps.pagination import AdminKeysetPagination
 from .models import Pengumuman
 from .serializers import PengumumanSerializer
 
@@ -20,6 +21,11 @@ class PengumumanViewSet(viewsets.ModelViewSet):
     # mengambil data penulis dalam satu query.
     queryset = Pengumuman.objects.select_related('penulis').all()
 
+    # Daftar halaman hanya jika diminta (?page_size / ?cursor); dipublish_pada
+    # bisa NULL sehingga tidak dipakai sebagai kunci cursor
+    pagination_class = AdminKeysetPagination
+    keyset_ordering = ('-dibuat_pada', 'id')
+
     def get_serializer_context(self):
         """
         Menyuntikkan 'request' object ke dalam serializer context.
@@ -0,0 +1,50 @@
+# apps/peserta/cache_utils.py
+from django.core.cache import cache
+from django.db import transaction
+
+# Ringkasan dashboard peserta (total hadir, laporan, pembayaran, sertifikat, dll.)
+# disimpan per profil dan diinvalidasi setiap kali data milik profil itu berubah.
+# TTL pendek sebagai batas atas data basi dari penulisan yang tidak lewat
+# invalidasi (mis. QuerySet.update() manual atau backend cache per proses).
+TIMEOUT_DASHBOARD_PESERTA = 60 * 5
+# Relasi user -> profil tidak pernah berubah, aman di-cache lebih lama
+TIMEOUT_PROFIL_USER = 60 * 60 * 24
+
+
+def _key_profil_user(user_id):
+    return f'peserta:profil-user:{user_id}'
+
+
+def _key_dashboard(profil_id):
+    return f'peserta:dashboard:{profil_id}'
+
+
+def get_ringkasan_dashboard(user_id, build):
+    """
+    Mengembalikan ringkasan dashboard milik user dari cache.
+    `build` menyusun ringkasan dari database (harus memuat 'profil_id') dan
+    hanya dipanggil saat cache kosong.
+    """
+    profil_id = cache.get(_key_profil_user(user_id))
+    if profil_id is not None:
+        ringkasan = cache.get(_key_dashboard(profil_id))
+        if ringkasan is not None:
+            return ringkasan
+
+    ringkasan = build()
+    cache.set(_key_profil_user(user_id), ringkasan['profil_id'], TIMEOUT_PROFIL_USER)
+    cache.set(_key_dashboard(ringkasan['profil_id']), ringkasan, TIMEOUT_DASHBOARD_PESERTA)
+    return ringkasan
+
+
+def invalidate_dashboard_peserta(*profil_ids):
+    """
+    Menghapus ringkasan dashboard untuk profil yang datanya berubah.
+    Dijalankan segera dan sekali lagi setelah commit (lihat
+    apps.bimbingan.cache_utils.invalidate_daftar_penempatan).
+    """
+    keys = [_key_dashboard(profil_id) for profil_id in profil_ids if profil_id]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
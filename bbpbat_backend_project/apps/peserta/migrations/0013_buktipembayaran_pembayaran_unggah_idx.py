@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('peserta', '0012_alter_pesertaprofile_status'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='buktipembayaran',
+            index=models.Index(fields=['-diunggah_pada', 'id'], name='pembayaran_unggah_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('peserta', '0013_buktipembayaran_pembayaran_unggah_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='buktipembayaran',
+            index=models.Index(fields=['status_verifikasi', '-diunggah_pada', 'id'], name='pembayaran_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pesertaprofile',
+            index=models.Index(fields=['status', 'tipe_peserta'], name='profil_status_tipe_idx'),
+        ),
+    ]
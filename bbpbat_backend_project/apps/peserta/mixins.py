@@ -0,0 +1,76 @@
+# apps/peserta/mixins.py
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+
+from apps.users.models import User
+from .models import PesertaProfile
+
+
+class ProfilPesertaLazy:
+    """
+    Pengganti ringan PesertaProfile milik user yang sedang login.
+
+    `pk`/`id` dan `tipe_peserta` dibaca dari klaim JWT (lihat
+    MyTokenObtainPairSerializer.get_token) tanpa query. Atribut lain memuat
+    PesertaProfile lengkap sekali saja, saat pertama kali diminta. Untuk
+    filter ORM gunakan `profil_id=profil.pk`, bukan `profil=profil`.
+    """
+
+    def __init__(self, request):
+        self._request = request
+        self._objek = None
+        token = request.auth
+        klaim = token if hasattr(token, 'get') else {}
+        self._pk = klaim.get('profil_id')
+        self._tipe_peserta = klaim.get('tipe_peserta')
+
+    def _muat_klaim(self):
+        """ Token lama / autentikasi non-JWT: satu query ringan tanpa memuat seluruh profil. """
+        data = PesertaProfile.objects.filter(user_id=self._request.user.pk).values('pk', 'tipe_peserta').first()
+        if data is None:
+            raise NotFound("Profil peserta tidak ditemukan.")
+        self._pk, self._tipe_peserta = data['pk'], data['tipe_peserta']
+
+    @property
+    def pk(self):
+        if self._pk is None:
+            self._muat_klaim()
+        return self._pk
+
+    id = pk
+
+    @property
+    def tipe_peserta(self):
+        if self._tipe_peserta is None:
+            self._muat_klaim()
+        return self._tipe_peserta
+
+    @property
+    def objek(self):
+        """ Instance PesertaProfile lengkap (dimuat sekali per request). """
+        if self._objek is None:
+            try:
+                self._objek = PesertaProfile.objects.get(pk=self.pk)
+            except PesertaProfile.DoesNotExist:
+                raise NotFound("Profil peserta tidak ditemukan.")
+            # User sudah dimuat oleh autentikasi, tidak perlu query ulang
+            # (TokenUser dari klaim JWT bukan instance model, jadi dilewati)
+            if isinstance(self._request.user, User):
+                self._objek.user = self._request.user
+        return self._objek
+
+    def __getattr__(self, nama):
+        # Hanya dipanggil untuk atribut di luar klaim
+        return getattr(self.objek, nama)
+
+
+class ProfilPesertaMixin:
+    """
+    Mixin untuk view peserta: `self.profil` berisi ProfilPesertaLazy sehingga
+    view tidak perlu `get_object_or_404(PesertaProfile, user=request.user)`
+    di setiap request.
+    """
+
+    @cached_property
+    def profil(self):
+        return ProfilPesertaLazy(self.request)
@@ -4,6 +4,9 @@ from django.conf import settings
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
+from .cache_utils import invalidate_dashboard_peserta
+from apps.bimbingan.cache_utils import invalidate_geofence_peserta
+
 class PesertaProfile(models.Model):
     # --- Field kelengkapan profil tambahan ---
     nomor_induk = models.CharField("Nomor Induk Mahasiswa/Siswa", max_length=100, blank=True)
@@ -106,9 +109,28 @@ class PesertaProfile(models.Model):
         # Fungsi ini dipanggil dari sinyal/save method lain, jadi cukup update field.
         super().save(update_fields=["profil_lengkap", "dokumen_lengkap"])
 
+    def save(self, *args, **kwargs):
+        """
+        Data pembimbing dan tanggal program tampil di dashboard peserta,
+        jadi ringkasan yang di-cache harus dibuang setiap profil disimpan.
+        Geofence absensi mengikuti unit penempatan, jadi ikut dibuang.
+        """
+        super().save(*args, **kwargs)
+        invalidate_dashboard_peserta(self.pk)
+        invalidate_geofence_peserta(self.pk)
+
+    def delete(self, *args, **kwargs):
+        profil_id = self.pk
+        hasil = super().delete(*args, **kwargs)
+        invalidate_dashboard_peserta(profil_id)
+        return hasil
+
     class Meta:
         verbose_name = "Profil Peserta"
         verbose_name_plural = "Profil Peserta"
+        indexes = [
+            models.Index(fields=['status', 'tipe_peserta'], name='profil_status_tipe_idx'),
+        ]
 
     def __str__(self):
         # Gunakan self.user.get_full_name() atau field lain yang pasti ada di model User
@@ -185,10 +207,24 @@ class BuktiPembayaran(models.Model):
     diunggah_pada = models.DateTimeField(auto_now_add=True)
     catatan_admin = models.TextField(blank=True, null=True, verbose_name="Catatan dari Admin")
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        invalidate_dashboard_peserta(self.profil_id)
+
+    def delete(self, *args, **kwargs):
+        profil_id = self.profil_id
+        hasil = super().delete(*args, **kwargs)
+        invalidate_dashboard_peserta(profil_id)
+        return hasil
+
     # --- TIDAK ADA PERUBAHAN DI BAWAH INI ---
     class Meta:
         verbose_name = "Bukti Pembayaran"
         verbose_name_plural = "Bukti Pembayaran"
+        indexes = [
+            models.Index(fields=['-diunggah_pada', 'id'], name='pembayaran_unggah_idx'),
+            models.Index(fields=['status_verifikasi', '-diunggah_pada', 'id'], name='pembayaran_status_idx'),
+        ]
 
     def __str__(self):
         try:
@@ -1,11 +1,22 @@
+import datetime
+import threading
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import IntegrityError, connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 from rest_framework import status
-from rest_framework.test import APITestCase
+from rest_framework.test import APIClient, APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
 
 # Mengimpor model dari aplikasi ini dan aplikasi lain
-from .models import PesertaProfile
-from apps.bimbingan.models import Pendaftaran, Penempatan
+from .models import BuktiPembayaran, PesertaProfile
+from apps.bimbingan.models import Absensi, Laporan, Pendaftaran, Penempatan, RekapAbsensiBulanan, Sertifikat
+from apps.pengumuman.models import Pengumuman
 
 # Mengambil model User kustom yang sedang aktif
 User = get_user_model()
@@ -107,3 +118,319 @@ class PesertaAdminAPITests(APITestCase):
         self.assertEqual(response.data['nama_institusi'], 'Universitas Uji Coba')
         self.assertEqual(response.data['user']['email'], 'pelajar@test.com')
 
+
+class PesertaDashboardTests(APITestCase):
+    """
+    Tes untuk dashboard peserta: jumlah query tetap dan cache ringkasan per peserta.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='dashboard@test.com', password='password123', nama_lengkap='Peserta Dashboard'
+        )
+        cls.profil = PesertaProfile.objects.create(
+            user=cls.user,
+            tipe_peserta='UMUM',
+            nama_institusi='Dinas Uji Coba',
+            nama_pembimbing='Pembimbing Uji',
+            tanggal_mulai=datetime.date(2024, 1, 1),
+            tanggal_selesai=datetime.date(2024, 1, 31),
+        )
+        for hari in range(1, 6):
+            Absensi.objects.create(
+                profil=cls.profil, tanggal=datetime.date(2024, 1, hari),
+                status_kehadiran='HADIR' if hari != 3 else 'IZIN',
+            )
+        Laporan.objects.create(profil=cls.profil, judul='Laporan 1', file='laporan_peserta/satu.pdf')
+        cls.admin = User.objects.create_superuser(
+            email='admin-dashboard@test.com', password='password123', nama_lengkap='Admin'
+        )
+        Pengumuman.objects.create(
+            judul='Info', konten='Isi', penulis=cls.admin,
+            status=Pengumuman.Status.PUBLISHED, target_peserta='Semua Peserta',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('peserta-dashboard')
+        self.client.force_authenticate(user=self.user)
+
+    def test_dashboard_memakai_jumlah_query_tetap(self):
+        """ Ringkasan peserta diambil dalam satu query, pengumuman dalam satu query lagi. """
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_hadir'], 4)
+        self.assertTrue(response.data['laporan_status']['sudah_diunggah'])
+        self.assertTrue(response.data['laporan_status']['file_url'].endswith('laporan_peserta/satu.pdf'))
+        self.assertFalse(response.data['pembayaran_status']['sudah_diunggah'])
+        self.assertFalse(response.data['sertifikat_tersedia'])
+        self.assertEqual(response.data['pembimbing']['nama_lengkap'], 'Pembimbing Uji')
+        self.assertEqual(len(response.data['pengumuman_terbaru']), 1)
+
+        # Saat ringkasan sudah di-cache, hanya pengumuman yang diambil dari database
+        with self.assertNumQueries(1):
+            self.client.get(self.url)
+
+    def test_cache_dibuang_saat_data_peserta_berubah(self):
+        """ Absensi, laporan, pembayaran, sertifikat, dan profil baru langsung terlihat. """
+        self.client.get(self.url)
+
+        absensi = Absensi.objects.create(profil=self.profil, tanggal=datetime.date(2024, 1, 8), status_kehadiran='HADIR')
+        self.assertEqual(self.client.get(self.url).data['total_hadir'], 5)
+        absensi.delete()
+        self.assertEqual(self.client.get(self.url).data['total_hadir'], 4)
+
+        BuktiPembayaran.objects.create(profil=self.profil, file='bukti_pembayaran/bukti.pdf')
+        pembayaran = self.client.get(self.url).data['pembayaran_status']
+        self.assertTrue(pembayaran['sudah_diunggah'])
+        self.assertEqual(pembayaran['status_verifikasi'], 'Menunggu Verifikasi')
+
+        Sertifikat.objects.create(profil=self.profil, nomor_sertifikat='001/TEST', file_sertifikat='sertifikat/a.pdf')
+        self.assertTrue(self.client.get(self.url).data['sertifikat_tersedia'])
+
+        self.profil.nama_pembimbing = ''
+        self.profil.save()
+        self.assertIsNone(self.client.get(self.url).data['pembimbing'])
+
+
+class PesertaAbsensiCheckInTests(APITestCase):
+    """
+    Tes check-in/check-out peserta melalui INSERT/UPDATE bersyarat.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='absen@test.com', password='password123', nama_lengkap='Peserta Absen')
+        cls.profil = PesertaProfile.objects.create(user=cls.user, tipe_peserta='PELAJAR', nama_institusi='Kampus')
+
+    def setUp(self):
+        self.url = reverse('peserta-absensi')
+
+    def test_check_in_lalu_check_out_lalu_ditolak(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIn('Absen masuk', response.data['detail'])
+
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('Absen keluar', response.data['detail'])
+
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        absensi = Absensi.objects.get(profil=self.profil)
+        self.assertEqual(absensi.status_kehadiran, 'HADIR')
+        self.assertIsNotNone(absensi.jam_masuk)
+        self.assertIsNotNone(absensi.jam_keluar)
+        rekap = RekapAbsensiBulanan.objects.get(profil=self.profil)
+        self.assertEqual(rekap.kode[absensi.tanggal.day - 1], 'H')
+
+    def test_check_in_mengubah_baris_alpha_menjadi_hadir(self):
+        hari_ini = timezone.localdate()
+        Absensi.objects.create(profil=self.profil, tanggal=hari_ini, status_kehadiran='ALPHA')
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Absensi.objects.get(profil=self.profil).status_kehadiran, 'HADIR')
+        rekap = RekapAbsensiBulanan.objects.get(profil=self.profil)
+        self.assertEqual(rekap.kode[hari_ini.day - 1], 'H')
+
+    def test_profil_diambil_dari_klaim_jwt(self):
+        token = self.client.post(reverse('token_obtain_pair'), {'email': 'absen@test.com', 'password': 'password123'})
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token.data['access']}")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        # Tidak ada lookup profil berdasarkan user_id (geofence unit boleh join ke profil)
+        self.assertFalse(any('"peserta_pesertaprofile"."user_id"' in q['sql'] for q in queries.captured_queries))
+
+    def test_integrity_error_selain_bentrok_tidak_dianggap_absensi_lengkap(self):
+        token = self.client.post(reverse('token_obtain_pair'), {'email': 'absen@test.com', 'password': 'password123'})
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token.data['access']}")
+        # SQLite baru mengecek foreign key saat commit; di dalam TestCase
+        # kegagalannya disimulasikan langsung pada INSERT
+        gagal_fk = mock.patch.object(Absensi, 'save', side_effect=IntegrityError("FOREIGN KEY constraint failed"))
+
+        # Profil masih ada: error asli diteruskan, bukan "sudah lengkap"
+        with gagal_fk, self.assertRaises(IntegrityError):
+            self.client.post(self.url)
+
+        # Klaim profil_id dari token lama, profilnya sudah dihapus: 404
+        self.profil.delete()
+        with gagal_fk:
+            response = self.client.post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data['detail'], "Profil peserta tidak ditemukan.")
+
+
+class ProfilPesertaKlaimTests(APITestCase):
+    """
+    Tes klaim profil di JWT dan ProfilPesertaLazy di view peserta.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='klaim@test.com', password='password123', nama_lengkap='Peserta Klaim')
+        cls.profil = PesertaProfile.objects.create(user=cls.user, tipe_peserta='UMUM', nama_institusi='Dinas')
+
+    def login(self):
+        response = self.client.post(reverse('token_obtain_pair'), {'email': 'klaim@test.com', 'password': 'password123'})
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        return AccessToken(response.data['access'])
+
+    def query_profil(self, queries):
+        return [q['sql'] for q in queries.captured_queries if 'FROM "peserta_pesertaprofile"' in q['sql']]
+
+    def test_token_memuat_profil_dan_tipe(self):
+        token = self.login()
+        self.assertEqual(token['profil_id'], self.profil.pk)
+        self.assertEqual(token['tipe_peserta'], 'UMUM')
+
+    def test_view_peserta_tanpa_query_profil(self):
+        self.login()
+        Laporan.objects.create(profil=self.profil, judul='Laporan', file='laporan/a.pdf')
+        for nama_url in ('peserta-laporan', 'peserta-pembayaran', 'peserta-absensi'):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(reverse(nama_url))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(self.query_profil(queries), [], nama_url)
+
+    def test_profil_lengkap_dimuat_sekali_saat_dibutuhkan(self):
+        self.login()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('peserta-sertifikat'))
+        self.assertEqual(response.data['status'], 'BELUM_MEMENUHI_SYARAT')
+        # `status` di luar klaim: satu query by pk, bukan lookup berdasarkan user
+        self.assertEqual(len(self.query_profil(queries)), 1)
+        self.assertNotIn('"user_id"', self.query_profil(queries)[0].split('WHERE')[1])
+
+    def test_tanpa_klaim_jatuh_ke_query(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(reverse('peserta-laporan'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 0)
+
+        tanpa_profil = User.objects.create_user(email='kosong@test.com', password='password123', nama_lengkap='Kosong')
+        self.client.force_authenticate(user=tanpa_profil)
+        response = self.client.get(reverse('peserta-laporan'))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class PesertaAbsensiGeofenceTests(APITestCase):
+    """
+    Tes validasi lokasi absensi terhadap geofence unit penempatan.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.penempatan = Penempatan.objects.create(
+            nama='Unit Geofence', geofence_lat=-6.5500, geofence_lng=106.7400, geofence_radius=200,
+        )
+        cls.user = User.objects.create_user(email='geo@test.com', password='password123', nama_lengkap='Peserta Geo')
+        cls.profil = PesertaProfile.objects.create(
+            user=cls.user, tipe_peserta='PELAJAR', nama_institusi='Kampus', penempatan=cls.penempatan,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('peserta-absensi')
+        self.client.force_authenticate(user=self.user)
+
+    def test_bbox_dihitung_saat_simpan(self):
+        self.assertTrue(self.penempatan.geofence_aktif)
+        self.assertLess(self.penempatan.bbox_lat_min, -6.5500)
+        self.assertGreater(self.penempatan.bbox_lng_max, 106.7400)
+
+    def test_check_in_di_dalam_radius_menyimpan_koordinat(self):
+        response = self.client.post(self.url, {'latitude': -6.5505, 'longitude': 106.7404})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response = self.client.post(self.url, {'latitude': -6.5501, 'longitude': 106.7401})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        absensi = Absensi.objects.get(profil=self.profil)
+        self.assertAlmostEqual(absensi.lat_masuk, -6.5505)
+        self.assertAlmostEqual(absensi.lng_masuk, 106.7404)
+        self.assertAlmostEqual(absensi.lat_keluar, -6.5501)
+
+    def test_check_in_di_luar_radius_ditolak(self):
+        # Sekitar 1 km dari titik pusat
+        response = self.client.post(self.url, {'latitude': -6.5590, 'longitude': 106.7400})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('luar area', response.data['detail'])
+        self.assertFalse(Absensi.objects.filter(profil=self.profil).exists())
+
+    def test_koordinat_tidak_valid_ditolak(self):
+        for data in ({'latitude': 'abc', 'longitude': 106.74}, {'latitude': 95, 'longitude': 106.74}):
+            response = self.client.post(self.url, data)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_wajib_lokasi(self):
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        Absensi.objects.all().delete()
+
+        self.penempatan.wajib_lokasi = True
+        self.penempatan.save()
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('Lokasi wajib', response.data['detail'])
+
+    def test_geofence_poligon(self):
+        self.penempatan.geofence_poligon = [[-6.551, 106.739], [-6.551, 106.741], [-6.549, 106.741], [-6.549, 106.739]]
+        self.penempatan.save()
+        response = self.client.post(self.url, {'latitude': -6.5512, 'longitude': 106.7400})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(self.url, {'latitude': -6.5500, 'longitude': 106.7400})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_geofence_di_cache(self):
+        self.client.post(self.url, {'latitude': -6.5505, 'longitude': 106.7404})
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(self.url, {'latitude': -6.5505, 'longitude': 106.7404})
+        self.assertFalse(any('bimbingan_penempatan' in q['sql'] for q in queries.captured_queries))
+
+
+class PesertaAbsensiConcurrencyTests(TransactionTestCase):
+    """
+    Stress test: banyak tap absensi bersamaan dari peserta yang sama hanya
+    boleh menghasilkan satu check-in dan satu check-out.
+    """
+    JUMLAH_THREAD = 12
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='tap@test.com', password='password123', nama_lengkap='Peserta Tap')
+        self.profil = PesertaProfile.objects.create(user=self.user, tipe_peserta='UMUM', nama_institusi='Dinas')
+
+    def test_tap_bersamaan_konsisten(self):
+        url = reverse('peserta-absensi')
+        barrier = threading.Barrier(self.JUMLAH_THREAD)
+        hasil = []
+
+        def tap():
+            client = APIClient()
+            client.force_authenticate(user=self.user)
+            try:
+                barrier.wait()
+                hasil.append(client.post(url).status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=tap) for _ in range(self.JUMLAH_THREAD)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(hasil), self.JUMLAH_THREAD)
+        self.assertEqual(hasil.count(status.HTTP_201_CREATED), 1)
+        self.assertEqual(hasil.count(status.HTTP_200_OK), 1)
+        self.assertEqual(hasil.count(status.HTTP_400_BAD_REQUEST), self.JUMLAH_THREAD - 2)
+
+        absensi = Absensi.objects.get(profil=self.profil)
+        self.assertEqual(absensi.status_kehadiran, 'HADIR')
+        self.assertLessEqual(absensi.jam_masuk, absensi.jam_keluar)
@@ -5,10 +5,15 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.decorators import action
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Exists, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
 # Mengimpor model dan serializer dari aplikasi ini
 from .models import PesertaProfile, Dokumen, BuktiPembayaran
+from .cache_utils import get_ringkasan_dashboard, invalidate_dashboard_peserta
+from .mixins import ProfilPesertaMixin
 from apps.pengumuman.models import Pengumuman
 from apps.pengumuman.serializers import PengumumanSerializer
 
@@ -23,15 +28,23 @@ from .serializers import (
     AdminBuktiPembayaranSerializer
 )
 # Mengimpor model dari aplikasi lain
-from apps.bimbingan.models import Absensi, Laporan, Sertifikat 
+from apps.bimbingan.models import (
+    Absensi, Laporan, Sertifikat, Aktivitas, RekapAbsensiBulanan, Penempatan,
+    KOLOM_GEOFENCE, KOLOM_BBOX,
+)
+from apps.bimbingan.cache_utils import get_geofence_peserta
+from apps.bimbingan.geo_utils import dalam_geofence
 # Mengimpor izin kustom dari aplikasi 'users'
 from apps.users.permissions import IsAdminUser, IsPesertaUser
+from apps.pagination import AdminKeysetPagination
 
 
 class PesertaAdminViewSet(viewsets.ReadOnlyModelViewSet):
     # ... (Isi viewset ini tidak perlu diubah, biarkan seperti semula)
     permission_classes = [IsAdminUser]
     serializer_class = PesertaProfileSerializer
+    pagination_class = AdminKeysetPagination
+    keyset_ordering = ('user__nama_lengkap', 'id')
     def get_queryset(self):
         queryset = PesertaProfile.objects.select_related('user', 'penempatan').all()
         tipe_peserta = self.request.query_params.get('tipe_peserta', None)
@@ -52,7 +65,7 @@ class PesertaMeAPIView(generics.RetrieveAPIView):
     def get_object(self):
         user = self.request.user
         try:
-            return PesertaProfile.objects.select_related('user', 'penempatan').get(user=user)
+            return PesertaProfile.objects.select_related('user', 'penempatan').get(user_id=user.pk)
         except PesertaProfile.DoesNotExist:
             from rest_framework.exceptions import NotFound
             raise NotFound("Profil peserta tidak ditemukan untuk user ini.")
@@ -124,28 +137,49 @@ class DokumenUploadAPIView(APIView):
 # =======================================================================
 #             VIEW UNTUK ABSENSI PESERTA (GET & POST)
 # =======================================================================
-class PesertaAbsensiView(APIView):
+class PesertaAbsensiView(ProfilPesertaMixin, APIView):
     """
     Mengelola absensi untuk peserta yang sedang login.
     - GET: Mengambil seluruh riwayat absensi.
     - POST: Melakukan check-in (absen masuk) untuk hari ini.
+      Body opsional {latitude, longitude} divalidasi terhadap geofence unit penempatan.
     """
     permission_classes = [IsAuthenticated, IsPesertaUser]
 
-    def get_profil(self, user):
-        """Fungsi helper untuk mendapatkan profil peserta."""
-        try:
-            return PesertaProfile.objects.get(user=user)
-        except PesertaProfile.DoesNotExist:
-            from rest_framework.exceptions import NotFound
-            raise NotFound("Profil peserta tidak ditemukan.")
+    @staticmethod
+    def validasi_lokasi(request, profil_id):
+        """
+        Mengembalikan `(koordinat, error)`. `koordinat` berupa (lat, lng) atau
+        None bila tidak dikirim; `error` berisi pesan jika absensi harus ditolak.
+        """
+        lat, lng = request.data.get('latitude'), request.data.get('longitude')
+        koordinat = None
+        if lat not in (None, '') or lng not in (None, ''):
+            try:
+                koordinat = (float(lat), float(lng))
+            except (TypeError, ValueError):
+                return None, "Koordinat lokasi tidak valid."
+            if not (-90 <= koordinat[0] <= 90 and -180 <= koordinat[1] <= 180):
+                return None, "Koordinat lokasi tidak valid."
+
+        # Di-cache per profil: saat jam masuk, validasi tidak menyentuh database
+        geofence = get_geofence_peserta(profil_id, lambda: Penempatan.objects.filter(
+            peserta__id=profil_id, bbox_lat_min__isnull=False,
+        ).values(*KOLOM_GEOFENCE, *KOLOM_BBOX, 'nama', 'wajib_lokasi').first() or {})
+        if not geofence:
+            return koordinat, None
+        if koordinat is None:
+            if geofence['wajib_lokasi']:
+                return None, "Lokasi wajib dikirim untuk absensi di unit ini. Aktifkan GPS lalu coba lagi."
+            return None, None
+        if not dalam_geofence(geofence, *koordinat):
+            return None, f"Anda berada di luar area absensi {geofence['nama']}."
+        return koordinat, None
 
     def get(self, request, *args, **kwargs):
         """Mengembalikan riwayat absensi untuk peserta saat ini."""
-        profil_peserta = self.get_profil(request.user)
-        
         riwayat_absensi = Absensi.objects.filter(
-            profil=profil_peserta
+            profil_id=self.profil.pk
         ).order_by('-tanggal')
         
         serializer = PesertaAbsensiSerializer(riwayat_absensi, many=True)
@@ -156,40 +190,72 @@ class PesertaAbsensiView(APIView):
         Mencatat absensi (check-in atau check-out) untuk peserta.
         Logika cerdas: jika belum check-in, catat jam masuk.
         Jika sudah check-in tapi belum check-out, catat jam keluar.
-        """
-        profil_peserta = self.get_profil(request.user)
-        hari_ini = timezone.now().date()
-        jam_sekarang = timezone.now().time()
 
-        absensi_hari_ini, created = Absensi.objects.get_or_create(
-            profil=profil_peserta,
-            tanggal=hari_ini,
-            defaults={'status_kehadiran': Absensi.StatusKehadiran.ALPHA} # Default-kan Alpha jika dibuat
+        Setiap langkah adalah satu INSERT atau UPDATE bersyarat pada baris
+        (profil, tanggal), sehingga dua tap yang hampir bersamaan tidak bisa
+        sama-sama tercatat sebagai check-in atau check-out.
+        """
+        profil_id = self.profil.pk
+        koordinat, error = self.validasi_lokasi(request, profil_id)
+        if error:
+            return Response({"detail": error}, status=status.HTTP_400_BAD_REQUEST)
+        lat, lng = koordinat or (None, None)
+
+        sekarang = timezone.localtime()
+        hari_ini, jam_sekarang = sekarang.date(), sekarang.time()
+        absensi_hari_ini = Absensi.objects.filter(profil_id=profil_id, tanggal=hari_ini)
+
+        # Kasus 1: Check-in pertama hari ini (belum ada baris)
+        absensi = Absensi(
+            profil_id=profil_id, tanggal=hari_ini, jam_masuk=jam_sekarang,
+            status_kehadiran=Absensi.StatusKehadiran.HADIR,
+            lat_masuk=lat, lng_masuk=lng,
         )
-
-        # Kasus 1: Check-in (jam masuk belum ada)
-        if not absensi_hari_ini.jam_masuk:
-            absensi_hari_ini.status_kehadiran = Absensi.StatusKehadiran.HADIR
-            absensi_hari_ini.jam_masuk = jam_sekarang
-            absensi_hari_ini.save()
+        try:
+            with transaction.atomic():
+                absensi.save(force_insert=True)
             message = f"Absen masuk berhasil dicatat pada pukul {jam_sekarang.strftime('%H:%M')}."
             status_code = status.HTTP_201_CREATED
-
-        # Kasus 2: Check-out (jam masuk sudah ada, jam keluar belum)
-        elif not absensi_hari_ini.jam_keluar:
-            absensi_hari_ini.jam_keluar = jam_sekarang
-            absensi_hari_ini.save()
-            message = f"Absen keluar berhasil dicatat pada pukul {jam_sekarang.strftime('%H:%M')}."
-            status_code = status.HTTP_200_OK
-
-        # Kasus 3: Sudah lengkap (check-in & check-out sudah ada)
-        else:
-            return Response(
-                {"detail": "Anda sudah menyelesaikan absensi hari ini (masuk dan keluar)."},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        except IntegrityError:
+            # Biasanya baris hari ini sudah ada (check-in sebelumnya, izin, atau
+            # alpha). Jam dibaca ulang: tap ini bisa kalah dari check-in yang jamnya
+            # lebih akhir, dan jam keluar tidak boleh mendahului jam masuk tersebut.
+            jam_sekarang = timezone.localtime().time()
+            with transaction.atomic():
+                # Kasus 2: Baris ada tapi jam masuk belum tercatat
+                if absensi_hari_ini.filter(jam_masuk__isnull=True).update(
+                    jam_masuk=jam_sekarang, status_kehadiran=Absensi.StatusKehadiran.HADIR,
+                    lat_masuk=lat, lng_masuk=lng,
+                ):
+                    # update() tidak melewati Absensi.save(): sinkronkan rekap & dashboard
+                    RekapAbsensiBulanan.objects.catat(profil_id, hari_ini, Absensi.StatusKehadiran.HADIR)
+                    invalidate_dashboard_peserta(profil_id)
+                    message = f"Absen masuk berhasil dicatat pada pukul {jam_sekarang.strftime('%H:%M')}."
+                    status_code = status.HTTP_201_CREATED
+
+                # Kasus 3: Check-out (jam masuk sudah ada, jam keluar belum)
+                elif absensi_hari_ini.filter(jam_masuk__isnull=False, jam_keluar__isnull=True).update(
+                    jam_keluar=jam_sekarang, lat_keluar=lat, lng_keluar=lng,
+                ):
+                    message = f"Absen keluar berhasil dicatat pada pukul {jam_sekarang.strftime('%H:%M')}."
+                    status_code = status.HTTP_200_OK
+
+                # Bukan bentrok baris hari ini, mis. klaim profil_id dari token
+                # lama yang profilnya sudah dihapus (foreign key gagal)
+                elif not absensi_hari_ini.exists():
+                    if not PesertaProfile.objects.filter(pk=profil_id).exists():
+                        return Response({"detail": "Profil peserta tidak ditemukan."}, status=status.HTTP_404_NOT_FOUND)
+                    raise
+
+                # Kasus 4: Sudah lengkap (check-in & check-out sudah ada)
+                else:
+                    return Response(
+                        {"detail": "Anda sudah menyelesaikan absensi hari ini (masuk dan keluar)."},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+            absensi = absensi_hari_ini.get()
         
-        serializer = PesertaAbsensiSerializer(absensi_hari_ini)
+        serializer = PesertaAbsensiSerializer(absensi)
         return Response({
             "detail": message,
             "data": serializer.data
@@ -199,7 +265,7 @@ class PesertaAbsensiView(APIView):
 # =======================================================================
 #           VIEW UNTUK PENGAJUAN IZIN / SAKIT
 # =======================================================================
-class AjukanIzinView(APIView):
+class AjukanIzinView(ProfilPesertaMixin, APIView):
     """
     View untuk peserta mengajukan izin atau sakit.
     Menerima data form termasuk file upload.
@@ -208,12 +274,12 @@ class AjukanIzinView(APIView):
     parser_classes = [MultiPartParser, FormParser] # Wajib untuk handle file upload
 
     def post(self, request, *args, **kwargs):
-        # 1. Dapatkan profil peserta yang sedang login
-        profil_peserta = get_object_or_404(PesertaProfile, user=request.user)
+        # 1. Profil peserta yang sedang login (id dari klaim JWT, tanpa query)
+        profil_peserta = self.profil
         
         # 2. Cek apakah sudah ada absensi pada tanggal yang diajukan untuk mencegah duplikasi
         tanggal_pengajuan = request.data.get('tanggal')
-        if tanggal_pengajuan and Absensi.objects.filter(profil=profil_peserta, tanggal=tanggal_pengajuan).exists():
+        if tanggal_pengajuan and Absensi.objects.filter(profil_id=profil_peserta.pk, tanggal=tanggal_pengajuan).exists():
             return Response(
                 {"detail": "Anda sudah memiliki catatan absensi pada tanggal tersebut."},
                 status=status.HTTP_400_BAD_REQUEST
@@ -224,7 +290,12 @@ class AjukanIzinView(APIView):
         if serializer.is_valid():
             # 4. Jika valid, simpan ke database dengan menambahkan profil peserta
             # Jam masuk & keluar akan otomatis NULL sesuai definisi model
-            serializer.save(profil=profil_peserta)
+            absensi = serializer.save(profil_id=profil_peserta.pk)
+            Aktivitas.catat(
+                Aktivitas.Tipe.IZIN,
+                f"Pengajuan {absensi.get_status_kehadiran_display().lower()} dari {request.user.nama_lengkap} ({absensi.tanggal})",
+                profil=profil_peserta,
+            )
             return Response({"detail": "Pengajuan izin/sakit berhasil dikirim."}, status=status.HTTP_201_CREATED)
         
         # 5. Jika tidak valid, kembalikan error dari serializer
@@ -233,7 +304,7 @@ class AjukanIzinView(APIView):
 # =======================================================================
 #           VIEW UNTUK FITUR LAPORAN PESERTA
 # =======================================================================
-class LaporanPesertaView(APIView):
+class LaporanPesertaView(ProfilPesertaMixin, APIView):
     """
     Mengelola laporan untuk peserta yang sedang login.
     - GET: Menampilkan daftar laporan yang sudah di-upload.
@@ -245,9 +316,7 @@ class LaporanPesertaView(APIView):
 
     def get(self, request, *args, **kwargs):
         """Mengembalikan daftar laporan milik peserta yang sedang login."""
-        profil_peserta = get_object_or_404(PesertaProfile, user=request.user)
-        
-        laporan_peserta = Laporan.objects.filter(profil=profil_peserta).order_by('-disubmit_pada')
+        laporan_peserta = Laporan.objects.filter(profil_id=self.profil.pk).order_by('-disubmit_pada')
         
         # Gunakan serializer 'List' untuk menampilkan data
         serializer = LaporanPesertaListSerializer(laporan_peserta, many=True)
@@ -255,13 +324,14 @@ class LaporanPesertaView(APIView):
 
     def post(self, request, *args, **kwargs):
         """Membuat (meng-upload) laporan baru."""
-        profil_peserta = get_object_or_404(PesertaProfile, user=request.user)
+        profil_peserta = self.profil
         
         # Gunakan serializer 'Create' untuk validasi data yang masuk
         serializer = LaporanPesertaCreateSerializer(data=request.data)
         if serializer.is_valid():
             # Jika valid, simpan dengan menyertakan profil peserta
-            serializer.save(profil=profil_peserta)
+            serializer.save(profil_id=profil_peserta.pk)
+            Aktivitas.catat(Aktivitas.Tipe.LAPORAN, f"Laporan baru dari {request.user.nama_lengkap}", profil=profil_peserta)
             return Response({"detail": "Laporan berhasil diunggah."}, status=status.HTTP_201_CREATED)
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -273,82 +343,121 @@ class PesertaDashboardView(APIView):
     """
     Menyediakan data ringkasan yang terstruktur dan KONTEKSTUAL 
     untuk dashboard peserta.
+
+    Data milik peserta (kehadiran, laporan, pembayaran, sertifikat, pembimbing)
+    diambil dalam satu query lalu di-cache per profil; cache dibuang setiap kali
+    data tersebut berubah (lihat apps.peserta.cache_utils). Pengumuman selalu
+    diambil langsung karena berlaku untuk semua peserta.
     """
     permission_classes = [IsAuthenticated, IsPesertaUser]
 
+    @staticmethod
+    def hitung_ringkasan(user_id):
+        """ Menyusun ringkasan dashboard milik user dalam satu query. """
+        laporan_terakhir = Laporan.objects.filter(profil=OuterRef('pk')).order_by('-disubmit_pada')
+        total_hadir = Absensi.objects.filter(
+            profil=OuterRef('pk'),
+            status_kehadiran=Absensi.StatusKehadiran.HADIR,
+        ).order_by().values('profil').annotate(jumlah=Count('id')).values('jumlah')
+
+        profil_peserta = get_object_or_404(
+            PesertaProfile.objects.select_related('pembayaran').annotate(
+                total_hadir=Coalesce(Subquery(total_hadir), 0),
+                laporan_terakhir_pada=Subquery(laporan_terakhir.values('disubmit_pada')[:1]),
+                laporan_terakhir_file=Subquery(laporan_terakhir.values('file')[:1]),
+                sertifikat_tersedia=Exists(Sertifikat.objects.filter(profil=OuterRef('pk'))),
+            ),
+            user_id=user_id,
+        )
+
+        try:
+            pembayaran = profil_peserta.pembayaran
+        except BuktiPembayaran.DoesNotExist:
+            pembayaran = None
+
+        return {
+            'profil_id': profil_peserta.pk,
+            'tipe_peserta': profil_peserta.tipe_peserta,
+            'tanggal_mulai': profil_peserta.tanggal_mulai,
+            'tanggal_selesai': profil_peserta.tanggal_selesai,
+            'total_hadir': profil_peserta.total_hadir,
+            'sertifikat_tersedia': profil_peserta.sertifikat_tersedia,
+            'laporan_pada': profil_peserta.laporan_terakhir_pada,
+            'laporan_file': profil_peserta.laporan_terakhir_file,
+            'pembayaran_pada': pembayaran.diunggah_pada if pembayaran else None,
+            'pembayaran_status': pembayaran.status_verifikasi if pembayaran else None,
+            'pembayaran_file': pembayaran.file.name if pembayaran else None,
+            'nama_pembimbing': profil_peserta.nama_pembimbing,
+            'email_pembimbing': profil_peserta.email_pembimbing,
+            'telepon_pembimbing': profil_peserta.no_telepon_pembimbing,
+        }
+
     def get(self, request, *args, **kwargs):
-        profil_peserta = get_object_or_404(PesertaProfile, user=request.user)
+        ringkasan = get_ringkasan_dashboard(request.user.id, lambda: self.hitung_ringkasan(request.user.id))
         
         hari_ini = timezone.now().date()
 
-        # 1. Total Kehadiran (tidak berubah)
-        total_hadir = Absensi.objects.filter(
-            profil=profil_peserta, 
-            status_kehadiran='HADIR'
-        ).count()
+        def file_url(field, nama_file):
+            # Cukup nama file dari cache; URL dibangun tanpa memuat instance model
+            if not nama_file:
+                return None
+            return request.build_absolute_uri(field.storage.url(nama_file))
 
-        # 2. Status Laporan (tidak berubah)
-        laporan_terakhir = Laporan.objects.filter(profil=profil_peserta).order_by('-disubmit_pada').first()
+        # 1. Status Laporan
         laporan_status = {
-            'sudah_diunggah': bool(laporan_terakhir),
-            'tanggal_unggah': laporan_terakhir.disubmit_pada if laporan_terakhir else None,
-            'file_url': request.build_absolute_uri(laporan_terakhir.file.url) if laporan_terakhir and laporan_terakhir.file else None,
+            'sudah_diunggah': ringkasan['laporan_pada'] is not None,
+            'tanggal_unggah': ringkasan['laporan_pada'],
+            'file_url': file_url(Laporan._meta.get_field('file'), ringkasan['laporan_file']),
         }
 
-        # 3. Ketersediaan Sertifikat (tidak berubah)
-        sertifikat_tersedia = Sertifikat.objects.filter(profil=profil_peserta).exists()
-
-        # 4. Data Pembimbing (tidak berubah)
+        # 2. Data Pembimbing
         pembimbing_data = None
-        if profil_peserta.nama_pembimbing:
+        if ringkasan['nama_pembimbing']:
             pembimbing_data = {
-                'nama_lengkap': profil_peserta.nama_pembimbing,
+                'nama_lengkap': ringkasan['nama_pembimbing'],
                 'jabatan': 'Pembimbing Institusi',
-                'email': profil_peserta.email_pembimbing or '-',
-                'telepon': profil_peserta.no_telepon_pembimbing or '-',
+                'email': ringkasan['email_pembimbing'] or '-',
+                'telepon': ringkasan['telepon_pembimbing'] or '-',
                 'foto_url': None
             }
 
-        # 5. Daftar Pengumuman Terbaru (tidak berubah)
-        pengumuman_list = Pengumuman.objects.filter(
+        # 3. Daftar Pengumuman Terbaru
+        pengumuman_list = Pengumuman.objects.select_related('penulis').filter(
             status=Pengumuman.Status.PUBLISHED, 
-            target_peserta__in=['Semua Peserta', profil_peserta.tipe_peserta]
+            target_peserta__in=['Semua Peserta', ringkasan['tipe_peserta']]
         ).order_by('-dibuat_pada')[:3]
         pengumuman_terbaru = PengumumanSerializer(pengumuman_list, many=True, context={'request': request}).data
 
-        # ===============================================================
-        # PENAMBAHAN LOGIKA BARU UNTUK KONTEKS
-        # ===============================================================
-        # 6. Ambil data status pembayaran (relevan untuk Umum)
-        pembayaran = BuktiPembayaran.objects.filter(profil=profil_peserta).first()
+        # 4. Status pembayaran (relevan untuk Umum)
         pembayaran_status = {
-            'sudah_diunggah': bool(pembayaran),
-            'tanggal_unggah': pembayaran.diunggah_pada if pembayaran else None,
-            'status_verifikasi': pembayaran.status_verifikasi if pembayaran else None,
-            'file_url': request.build_absolute_uri(pembayaran.file.url) if pembayaran and pembayaran.file else None,
+            'sudah_diunggah': ringkasan['pembayaran_pada'] is not None,
+            'tanggal_unggah': ringkasan['pembayaran_pada'],
+            'status_verifikasi': ringkasan['pembayaran_status'],
+            'file_url': file_url(BuktiPembayaran._meta.get_field('file'), ringkasan['pembayaran_file']),
         }
         
-        # 7. Logika Progres Waktu
+        # 5. Logika Progres Waktu (dihitung per request karena bergantung pada hari ini)
         progres_program = {
             'sisa_hari': 0, 'total_hari': 0, 'persentase_selesai': 100
         }
-        if profil_peserta.tanggal_mulai and profil_peserta.tanggal_selesai:
-            if hari_ini < profil_peserta.tanggal_selesai:
-                sisa_hari = (profil_peserta.tanggal_selesai - hari_ini).days
+        tanggal_mulai, tanggal_selesai = ringkasan['tanggal_mulai'], ringkasan['tanggal_selesai']
+        if tanggal_mulai and tanggal_selesai:
+            if hari_ini < tanggal_selesai:
+                sisa_hari = (tanggal_selesai - hari_ini).days
                 progres_program['sisa_hari'] = sisa_hari
             
-            total_hari = (profil_peserta.tanggal_selesai - profil_peserta.tanggal_mulai).days
+            total_hari = (tanggal_selesai - tanggal_mulai).days
             if total_hari > 0:
-                hari_berlalu = (hari_ini - profil_peserta.tanggal_mulai).days
+                hari_berlalu = (hari_ini - tanggal_mulai).days
                 progres_program['total_hari'] = total_hari
                 progres_program['persentase_selesai'] = min(round((hari_berlalu / total_hari) * 100), 100)
 
-        # 8. Susun data akhir
+        # 6. Susun data akhir
         dashboard_data = {
-            'tipe_peserta': profil_peserta.tipe_peserta,
-            'total_hadir': total_hadir,
+            'tipe_peserta': ringkasan['tipe_peserta'],
+            'total_hadir': ringkasan['total_hadir'],
             'progres_program': progres_program,
-            'sertifikat_tersedia': sertifikat_tersedia,
+            'sertifikat_tersedia': ringkasan['sertifikat_tersedia'],
             'laporan_status': laporan_status,
             'pembayaran_status': pembayaran_status,
             'pembimbing': pembimbing_data,
@@ -357,7 +466,7 @@ class PesertaDashboardView(APIView):
 
         return Response(dashboard_data)
      
-class SertifikatPesertaView(APIView):
+class SertifikatPesertaView(ProfilPesertaMixin, APIView):
     """
     Menyediakan data sertifikat untuk peserta yang sedang login.
     Mengembalikan status yang berbeda tergantung pada kondisi kelayakan.
@@ -365,14 +474,14 @@ class SertifikatPesertaView(APIView):
     permission_classes = [IsAuthenticated, IsPesertaUser]
 
     def get(self, request, *args, **kwargs):
-        profil_peserta = get_object_or_404(PesertaProfile, user=request.user)
+        profil_peserta = self.profil
 
         # =================================================================
         # KONDISI 1: Sertifikat sudah diterbitkan. Ini prioritas tertinggi.
         # =================================================================
         # Cek dari objek sertifikat yang berelasi, bukan dari status 'Lulus'
         try:
-            sertifikat = Sertifikat.objects.get(profil=profil_peserta)
+            sertifikat = Sertifikat.objects.get(profil_id=profil_peserta.pk)
             serializer = SertifikatDetailSerializer(sertifikat, context={'request': request})
             return Response({
                 "status": "DITERBITKAN",
@@ -399,14 +508,14 @@ class SertifikatPesertaView(APIView):
         # Syarat 2: Bergantung pada tipe peserta
         syarat_kedua_terpenuhi = False
         if profil_peserta.tipe_peserta == PesertaProfile.TipePeserta.PELAJAR:
-            laporan_terakhir = Laporan.objects.filter(profil=profil_peserta).order_by('-disubmit_pada').first()
+            laporan_terakhir = Laporan.objects.filter(profil_id=profil_peserta.pk).order_by('-disubmit_pada').first()
             syarat_kedua_terpenuhi = laporan_terakhir and laporan_terakhir.status_review == Laporan.StatusReview.DITERIMA
             persyaratan.append({
                 "deskripsi": "Laporan akhir telah direview dan diterima",
                 "terpenuhi": syarat_kedua_terpenuhi
             })
         else: # Tipe UMUM
-            pembayaran = BuktiPembayaran.objects.filter(profil=profil_peserta).first()
+            pembayaran = BuktiPembayaran.objects.filter(profil_id=profil_peserta.pk).first()
             # Gunakan nilai dari choices di model untuk konsistensi
             syarat_kedua_terpenuhi = pembayaran and pembayaran.status_verifikasi == 'Telah Diverifikasi'
             persyaratan.append({
@@ -445,6 +554,8 @@ class AdminBuktiPembayaranViewSet(viewsets.ModelViewSet):
     serializer_class = AdminBuktiPembayaranSerializer
     permission_classes = [IsAuthenticated, IsAdminUser] # Hanya Admin yang bisa akses
     http_method_names = ['get', 'post', 'head', 'options'] # Batasi method yg diizinkan
+    pagination_class = AdminKeysetPagination
+    keyset_ordering = ('-diunggah_pada', 'id')
 
     def get_queryset(self):
         """Filter berdasarkan status verifikasi jika ada di query params."""
@@ -492,7 +603,7 @@ class AdminBuktiPembayaranViewSet(viewsets.ModelViewSet):
 # =======================================================================
 #   VIEW UNTUK PESERTA MENGELOLA BUKTI PEMBAYARANNYA
 # =======================================================================
-class PesertaPembayaranView(APIView):
+class PesertaPembayaranView(ProfilPesertaMixin, APIView):
     """
     Mengelola bukti pembayaran untuk peserta yang login.
     - GET: Mengambil data pembayaran saat ini (jika ada).
@@ -503,9 +614,8 @@ class PesertaPembayaranView(APIView):
 
     def get(self, request, *args, **kwargs):
         """Mengembalikan detail bukti pembayaran peserta saat ini."""
-        profil_peserta = get_object_or_404(PesertaProfile, user=request.user)
         try:
-            pembayaran = profil_peserta.pembayaran
+            pembayaran = BuktiPembayaran.objects.get(profil_id=self.profil.pk)
             # Gunakan serializer admin agar datanya konsisten
             serializer = AdminBuktiPembayaranSerializer(pembayaran, context={'request': request})
             return Response(serializer.data)
@@ -514,7 +624,7 @@ class PesertaPembayaranView(APIView):
 
     def post(self, request, *args, **kwargs):
         """Membuat atau memperbarui bukti pembayaran."""
-        profil_peserta = get_object_or_404(PesertaProfile, user=request.user)
+        profil_peserta = self.profil
         
         uploaded_file = request.data.get('file')
         
@@ -526,7 +636,7 @@ class PesertaPembayaranView(APIView):
 
         # Kode ini sekarang akan berjalan tanpa error
         pembayaran, created = BuktiPembayaran.objects.update_or_create(
-            profil=profil_peserta,
+            profil_id=profil_peserta.pk,
             defaults={
                 'file': uploaded_file,
                 'status_verifikasi': 'Menunggu Verifikasi',
@@ -534,6 +644,12 @@ class PesertaPembayaranView(APIView):
             }
         )
         
+        Aktivitas.catat(
+            Aktivitas.Tipe.PEMBAYARAN,
+            f"Bukti pembayaran diunggah oleh {request.user.nama_lengkap}",
+            profil=profil_peserta,
+        )
+
         serializer = AdminBuktiPembayaranSerializer(pembayaran, context={'request': request})
         response_status = status.HTTP_201_CREATED if created else status.HTTP_200_OK
         return Response(serializer.data, status=response_status)
\ No newline at end of file
@@ -0,0 +1,67 @@
+# apps/users/authentication.py
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from .cache_utils import get_status_user
+from .models import User
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication yang tidak memuat baris User untuk request baca.
+
+    Untuk GET/HEAD/OPTIONS, `request.user` berupa TokenUser yang dibangun dari
+    klaim token (`role`, `nama_lengkap`, `profil_id`, ...), sehingga permission
+    IsAdminUser / IsPesertaUser cukup membaca klaim. Status akun (aktif & role)
+    tetap dicek lewat cache ber-TTL pendek (apps.users.cache_utils), jadi akun
+    yang dinonaktifkan, dihapus, atau diubah perannya ditolak dalam hitungan detik.
+
+    Request tulis, token lama tanpa klaim `role`, dan view dengan
+    `klaim_jwt_cukup = False` tetap memakai User lengkap dari database.
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        if not self.cukup_dari_klaim(request, validated_token):
+            return self.get_user(validated_token), validated_token
+        return self.get_token_user(validated_token), validated_token
+
+    @staticmethod
+    def cukup_dari_klaim(request, validated_token):
+        view = (getattr(request, 'parser_context', None) or {}).get('view')
+        return (
+            request.method in SAFE_METHODS
+            and getattr(view, 'klaim_jwt_cukup', True)
+            and validated_token.get('role') is not None
+        )
+
+    def get_token_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise AuthenticationFailed("Token tidak memuat identitas pengguna.", code='token_not_valid')
+
+        status_user = get_status_user(user_id, lambda: self.baca_status_user(user_id))
+        if not status_user['aktif']:
+            raise AuthenticationFailed("Akun tidak aktif.", code='user_inactive')
+        if status_user['role'] != validated_token['role']:
+            # Peran berubah sejak token diterbitkan: paksa login ulang
+            raise AuthenticationFailed("Token tidak lagi berlaku.", code='token_not_valid')
+        return TokenUser(validated_token)
+
+    @staticmethod
+    def baca_status_user(user_id):
+        data = User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).values('is_active', 'role').first()
+        if data is None:
+            return {'aktif': False, 'role': None}
+        return {'aktif': data['is_active'], 'role': data['role']}
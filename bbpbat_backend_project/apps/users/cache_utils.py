@@ -0,0 +1,37 @@
+# apps/users/cache_utils.py
+from django.core.cache import cache
+from django.db import transaction
+
+# Status akun (aktif & role) untuk autentikasi JWT berbasis klaim. Penyimpanan
+# User langsung membuang cache-nya (cache bersama, terlihat semua proses); TTL
+# sengaja pendek sebagai batas atas jika backend cache diganti ke per proses.
+TIMEOUT_STATUS_USER = 10
+
+
+def _key_status_user(user_id):
+    return f'users:status:{user_id}'
+
+
+def get_status_user(user_id, build):
+    """
+    Mengembalikan dict status akun {'aktif': bool, 'role': str|None} dari cache.
+    `build` membaca status dari database dan hanya dipanggil saat cache kosong.
+    """
+    key = _key_status_user(user_id)
+    status_user = cache.get(key)
+    if status_user is None:
+        status_user = build()
+        cache.set(key, status_user, TIMEOUT_STATUS_USER)
+    return status_user
+
+
+def invalidate_status_user(*user_ids):
+    """
+    Membuang status akun yang berubah. Dijalankan segera dan sekali lagi
+    setelah commit (lihat apps.bimbingan.cache_utils.invalidate_daftar_penempatan).
+    """
+    keys = [_key_status_user(user_id) for user_id in user_ids if user_id]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
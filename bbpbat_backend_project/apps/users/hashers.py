@@ -0,0 +1,93 @@
+# apps/users/hashers.py
+import base64
+import hashlib
+import os
+import secrets
+import string
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import ScryptPasswordHasher, make_password
+
+# Parameter scrypt bawaan hasher ini: 32 MiB memori per hash. Lebih tahan
+# serangan GPU dibanding PBKDF2 600.000 iterasi, dengan waktu kira-kira separuhnya.
+PARAMETER_SCRYPT_DEFAULT = {
+    'work_factor': 2 ** 15,
+    'block_size': 8,
+    'parallelism': 1,
+}
+
+# Di bawah jumlah ini, biaya menyalakan process pool lebih mahal dari hashing-nya
+MIN_PASSWORD_UNTUK_POOL = 8
+
+KARAKTER_PASSWORD = string.ascii_letters + string.digits
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    """
+    ScryptPasswordHasher dengan parameter dari `settings.PASSWORD_SCRYPT`
+    (work_factor, block_size, parallelism). Nama algoritma tetap "scrypt" dan
+    parameternya tersimpan di setiap hash, jadi hash lama tetap bisa diverifikasi
+    dan otomatis di-hash ulang saat login jika parameter diubah (must_update).
+    """
+
+    # Dibaca setiap kali dipakai (bukan saat instance dibuat) karena
+    # get_hashers() meng-cache instance hasher seumur proses.
+    @staticmethod
+    def _parameter(nama):
+        return getattr(settings, 'PASSWORD_SCRYPT', {}).get(nama, PARAMETER_SCRYPT_DEFAULT[nama])
+
+    work_factor = property(lambda self: self._parameter('work_factor'))
+    block_size = property(lambda self: self._parameter('block_size'))
+    parallelism = property(lambda self: self._parameter('parallelism'))
+
+    def encode(self, password, salt, n=None, r=None, p=None):
+        """
+        Sama dengan ScryptPasswordHasher.encode, tetapi `maxmem` dihitung dari
+        parameter yang dipakai: batas bawaan OpenSSL (32 MiB) tidak cukup untuk
+        n=2**15, dan hash lama bisa memakai parameter yang berbeda.
+        """
+        self._check_encode_args(password, salt)
+        n = n or self.work_factor
+        r = r or self.block_size
+        p = p or self.parallelism
+        hash_ = hashlib.scrypt(
+            password.encode(), salt=salt.encode(), n=n, r=r, p=p,
+            maxmem=2 * 128 * n * r * p, dklen=64,
+        )
+        hash_ = base64.b64encode(hash_).decode('ascii').strip()
+        return '%s$%d$%s$%d$%d$%s' % (self.algorithm, n, salt, r, p, hash_)
+
+
+def buat_password_sementara(panjang=12):
+    """ Password acak untuk akun baru (memakai `secrets`, bukan `random`). """
+    return ''.join(secrets.choice(KARAKTER_PASSWORD) for _ in range(panjang))
+
+
+def _inisialisasi_worker(settings_module):
+    # Worker hasil spawn (Windows/macOS) belum memuat Django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    import django
+    django.setup()
+
+
+def make_password_massal(passwords, workers=None):
+    """
+    Meng-hash banyak password sekaligus, hasilnya berurutan sesuai input.
+
+    Hashing sengaja mahal (puluhan-ratusan ms per password), jadi untuk batch
+    besar pekerjaan dibagi ke process pool sebanyak `workers` (default
+    `settings.PASSWORD_HASH_WORKERS` atau jumlah CPU). Batch kecil, mesin satu
+    core, atau settings tanpa DJANGO_SETTINGS_MODULE tetap di-hash berurutan.
+    """
+    passwords = list(passwords)
+    workers = workers or getattr(settings, 'PASSWORD_HASH_WORKERS', None) or os.cpu_count() or 1
+    workers = min(workers, len(passwords))
+    settings_module = os.environ.get('DJANGO_SETTINGS_MODULE')
+    if workers <= 1 or len(passwords) < MIN_PASSWORD_UNTUK_POOL or not settings_module:
+        return [make_password(password) for password in passwords]
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_inisialisasi_worker, initargs=(settings_module,)
+    ) as pool:
+        return list(pool.map(make_password, passwords, chunksize=max(1, len(passwords) // (workers * 4))))
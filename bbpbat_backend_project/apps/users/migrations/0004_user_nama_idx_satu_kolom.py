@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_user_user_nama_idx'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='user',
+            name='user_nama_idx',
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['nama_lengkap'], name='user_nama_idx'),
+        ),
+    ]
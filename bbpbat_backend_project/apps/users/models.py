@@ -2,6 +2,8 @@ from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
+from .cache_utils import invalidate_status_user
+
 # --- TAMBAHKAN KELAS INI ---
 class CustomUserManager(BaseUserManager):
     """
@@ -60,5 +62,28 @@ class User(AbstractUser):
     # --- TAMBAHKAN BARIS INI UNTUK MENGHUBUNGKAN MANAGER ---
     objects = CustomUserManager()
 
+    class Meta(AbstractUser.Meta):
+        # Urutan daftar admin (peserta, absensi) berdasarkan nama pengguna.
+        # Daftar tersebut diurutkan (profil__)user__nama_lengkap lalu id tabelnya
+        # sendiri; indeks ini hanya melayani bagian nama, pemecah seri (id)
+        # diurutkan database per kelompok nama yang sama.
+        indexes = [
+            models.Index(fields=['nama_lengkap'], name='user_nama_idx'),
+        ]
+
     def __str__(self):
-        return f"{self.nama_lengkap} ({self.get_role_display()})"
\ No newline at end of file
+        return f"{self.nama_lengkap} ({self.get_role_display()})"
+
+    def save(self, *args, **kwargs):
+        """
+        Status aktif dan role dibaca dari cache oleh ClaimsJWTAuthentication,
+        jadi cache-nya dibuang setiap kali User disimpan.
+        """
+        super().save(*args, **kwargs)
+        invalidate_status_user(self.pk)
+
+    def delete(self, *args, **kwargs):
+        user_id = self.pk
+        hasil = super().delete(*args, **kwargs)
+        invalidate_status_user(user_id)
+        return hasil
\ No newline at end of file
@@ -1,3 +1,4 @@
+from django.core.exceptions import ObjectDoesNotExist
 from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from .models import User
@@ -28,6 +29,16 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
         # Menambahkan data kustom ke dalam payload token
         token['nama_lengkap'] = user.nama_lengkap
         token['role'] = user.role
+
+        # id dan tipe profil peserta ikut disimpan agar endpoint peserta tidak
+        # perlu mencari profil dari user di setiap request (lihat apps.peserta.mixins)
+        try:
+            profil = user.profil_peserta
+            token['profil_id'] = profil.pk
+            token['tipe_peserta'] = profil.tipe_peserta
+        except ObjectDoesNotExist:
+            token['profil_id'] = None
+            token['tipe_peserta'] = None
         
         return token
 
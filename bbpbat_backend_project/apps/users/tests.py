@@ -1,6 +1,16 @@
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import check_password, get_hasher, make_password
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
+from django.db import connection
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.peserta.models import PesertaProfile
+from .hashers import MIN_PASSWORD_UNTUK_POOL, buat_password_sementara, make_password_massal
 
 # Mengambil model User kustom yang sedang aktif
 User = get_user_model()
@@ -112,4 +122,96 @@ class UserModelTests(TestCase):
         """
         Memastikan bahwa nama_lengkap ada di REQUIRED_FIELDS.
         """
-        self.assertIn('nama_lengkap', User.REQUIRED_FIELDS)
\ No newline at end of file
+        self.assertIn('nama_lengkap', User.REQUIRED_FIELDS)
+
+class ClaimsJWTAuthenticationTests(APITestCase):
+    """
+    Tes autentikasi JWT berbasis klaim: request baca tanpa query User, tetapi
+    akun yang dinonaktifkan / diubah perannya tetap ditolak.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='klaim@test.com', password='password123', nama_lengkap='Peserta Klaim')
+        PesertaProfile.objects.create(user=cls.user, tipe_peserta='PELAJAR', nama_institusi='Kampus')
+
+    def setUp(self):
+        cache.clear()
+        token = self.client.post(reverse('token_obtain_pair'), {'email': 'klaim@test.com', 'password': 'password123'})
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token.data['access']}")
+        self.url = reverse('peserta-absensi')
+
+    def query_user(self, queries):
+        return [q['sql'] for q in queries.captured_queries if 'FROM "users_user"' in q['sql']]
+
+    def test_request_baca_tanpa_query_user(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Request pertama hanya membaca status akun (is_active, role) untuk cache
+        self.assertEqual(len(self.query_user(queries)), 1)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.query_user(queries), [])
+
+    def test_request_tulis_memuat_user_lengkap(self):
+        response = self.client.get(reverse('current_user'))
+        self.assertEqual(response.data['email'], 'klaim@test.com')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(self.url)
+        self.assertTrue(self.query_user(queries))
+
+    def test_akun_dinonaktifkan_langsung_ditolak(self):
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_perubahan_massal_ditolak_setelah_ttl(self):
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+        # update() tidak memanggil save(): status lama bertahan sampai TTL habis
+        User.objects.filter(pk=self.user.pk).update(role=User.Role.ADMIN)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+        cache.clear()  # setara dengan TTL kedaluwarsa
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_akun_dihapus_ditolak(self):
+        self.user.delete()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PasswordHasherTests(TestCase):
+    """
+    Tes hasher scrypt yang bisa di-tune dan hashing password massal.
+    """
+
+    def test_hash_baru_memakai_scrypt_dengan_parameter_settings(self):
+        user = User.objects.create_user(email='hash@test.com', password='password123', nama_lengkap='Hash')
+        algoritma, work_factor, _, block_size, parallelism, _ = user.password.split('$')
+        self.assertEqual((algoritma, int(work_factor), int(block_size), int(parallelism)), ('scrypt', 2 ** 15, 8, 1))
+        self.assertTrue(user.check_password('password123'))
+
+    def test_hash_pbkdf2_lama_diperbarui_saat_login(self):
+        user = User.objects.create_user(email='lama@test.com', password='x', nama_lengkap='Lama')
+        user.password = make_password('password123', hasher='pbkdf2_sha256')
+        user.save()
+        self.assertTrue(user.check_password('password123'))
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('scrypt$'))
+
+    def test_parameter_bisa_di_tune(self):
+        encoded = make_password('password123')
+        with self.settings(PASSWORD_SCRYPT={'work_factor': 2 ** 14}):
+            self.assertTrue(encoded.startswith('scrypt$32768$'))
+            self.assertTrue(check_password('password123', encoded))
+            self.assertTrue(get_hasher().must_update(encoded))
+            self.assertTrue(make_password('password123').startswith('scrypt$16384$'))
+
+    def test_make_password_massal_memakai_process_pool(self):
+        passwords = [buat_password_sementara() for _ in range(MIN_PASSWORD_UNTUK_POOL)]
+        hashes = make_password_massal(passwords, workers=2)
+        self.assertEqual(len(set(hashes)), len(passwords))
+        for password, encoded in zip(passwords, hashes):
+            self.assertTrue(check_password(password, encoded))
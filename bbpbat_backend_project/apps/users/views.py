@@ -23,6 +23,8 @@ class CurrentUserView(APIView):
     # Menetapkan bahwa hanya pengguna yang sudah memiliki token (sudah login)
     # yang dapat mengakses view ini.
     permission_classes = [IsAuthenticated]
+    # Butuh email dan data terbaru dari database, bukan sekadar klaim token
+    klaim_jwt_cukup = False
 
     def get(self, request):
         """
@@ -86,9 +86,36 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Database tes berbasis file (bukan in-memory shared cache) agar tes
+        # konkurensi multi-thread mendapat penguncian SQLite yang sebenarnya.
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
+    }
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# File-based agar invalidasi terlihat oleh semua proses: beberapa worker gunicorn,
+# worker sertifikat (`proses_sertifikat`) dan command terjadwal seperti
+# `isi_absensi_alpha`/`rebuild_kuota`. Local-memory hanya terlihat oleh prosesnya
+# sendiri, jadi cache web tetap basi setelah proses lain menulis data.
+# LOCATION harus bisa ditulis oleh semua proses tersebut.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+        },
     }
 }
 
+# Test memakai direktori cache sementara sendiri (lihat bbpbat_project/test_runner.py)
+TEST_RUNNER = 'bbpbat_project.test_runner.TestRunner'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -109,6 +136,26 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing: scrypt dengan parameter yang bisa di-tune (apps/users/hashers.py).
+# Hasher lain tetap terdaftar agar hash PBKDF2 lama masih bisa login dan
+# otomatis di-hash ulang dengan scrypt.
+PASSWORD_HASHERS = [
+    'apps.users.hashers.TunedScryptPasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+
+PASSWORD_SCRYPT = {
+    'work_factor': 2 ** 15,  # 32 MiB memori per hash
+    'block_size': 8,
+    'parallelism': 1,
+}
+
+# Jumlah proses untuk hashing password massal (persetujuan pendaftaran).
+# None = jumlah CPU.
+PASSWORD_HASH_WORKERS = None
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
 
@@ -136,8 +183,9 @@ AUTH_USER_MODEL = 'users.User'
 
 # Konfigurasi Django REST Framework
 REST_FRAMEWORK = {
+    # Request baca memakai user dari klaim JWT (tanpa query User), lihat apps/users/authentication.py
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.users.authentication.ClaimsJWTAuthentication',
     ),
 }
 
@@ -154,4 +202,11 @@ MEDIA_URL = '/media/'
 # Path absolut di sistem file tempat media akan disimpan
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Direktori template PDF sertifikat (dibaca oleh worker `manage.py proses_sertifikat`)
+SERTIFIKAT_TEMPLATE_DIR = BASE_DIR / 'certificate_templates'
+
+# Jumlah proses untuk render PDF pada penerbitan sertifikat massal.
+# None = jumlah CPU.
+SERTIFIKAT_RENDER_WORKERS = None
+
 CORS_ALLOW_ALL_ORIGINS = True
\ No newline at end of file
@@ -0,0 +1,28 @@
+# File: bbpbat_project/test_runner.py
+import shutil
+import tempfile
+
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """
+    DiscoverRunner dengan direktori cache sementara, supaya `cache.clear()` di
+    test tidak menghapus cache server development di BASE_DIR/cache dan sisa
+    entry dari run sebelumnya tidak ikut terbaca.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._lokasi_cache = tempfile.mkdtemp(prefix='bbpbat-cache-')
+        self._override_cache = override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': self._lokasi_cache,
+        }})
+        self._override_cache.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._override_cache.disable()
+        shutil.rmtree(self._lokasi_cache, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,81 @@
+"""
+Benchmark jumlah query dan waktu per request untuk endpoint baca peserta:
+JWTAuthentication bawaan (memuat User setiap request) dibanding
+ClaimsJWTAuthentication (apps.users.authentication, user dari klaim token).
+
+Memakai database tes sementara (dibuat dan dihapus otomatis).
+Jalankan dari folder bbpbat_backend_project:
+    python benchmarks/bench_auth_queries.py
+    python benchmarks/bench_auth_queries.py --requests 500
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bbpbat_project.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext, setup_test_environment  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+from rest_framework_simplejwt.authentication import JWTAuthentication  # noqa: E402
+
+from apps.peserta.models import PesertaProfile  # noqa: E402
+from apps.peserta.views import LaporanPesertaView, PesertaAbsensiView, PesertaPembayaranView  # noqa: E402
+from apps.users.authentication import ClaimsJWTAuthentication  # noqa: E402
+from apps.users.models import User  # noqa: E402
+from apps.users.serializers import MyTokenObtainPairSerializer  # noqa: E402
+
+ENDPOINT = {
+    '/api/peserta/absensi/': PesertaAbsensiView,
+    '/api/peserta/laporan/': LaporanPesertaView,
+    '/api/peserta/pembayaran/': PesertaPembayaranView,
+}
+
+
+def ukur(client, url, jumlah):
+    total_query = query_user = 0
+    mulai = time.perf_counter()
+    for _ in range(jumlah):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        assert response.status_code == 200, response.status_code
+        total_query += len(queries)
+        query_user += sum('FROM "users_user"' in q['sql'] for q in queries.captured_queries)
+    durasi = time.perf_counter() - mulai
+    return total_query / jumlah, query_user / jumlah, durasi / jumlah * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=200, help="Jumlah request per endpoint per mode.")
+    args = parser.parse_args()
+
+    setup_test_environment()
+    nama_db_lama = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        user = User.objects.create_user(email='bench@contoh.id', password='bench-password', nama_lengkap='Peserta Bench')
+        PesertaProfile.objects.create(user=user, tipe_peserta='PELAJAR', nama_institusi='Kampus')
+        access = MyTokenObtainPairSerializer.get_token(user).access_token
+        client = APIClient(HTTP_HOST='localhost')
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+        print(f"{'endpoint':<26}{'mode':<8}{'query/req':>11}{'query User':>12}{'ms/req':>9}")
+        for url, view in ENDPOINT.items():
+            for mode, kelas in (('bawaan', JWTAuthentication), ('klaim', ClaimsJWTAuthentication)):
+                view.authentication_classes = [kelas]
+                ukur(client, url, 5)  # pemanasan (cache status akun, dsb.)
+                query, query_user, ms = ukur(client, url, args.requests)
+                print(f'{url:<26}{mode:<8}{query:>11.2f}{query_user:>12.2f}{ms:>9.2f}')
+    finally:
+        connection.creation.destroy_test_db(nama_db_lama, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark pemakaian memori ekspor absensi (apps.bimbingan.export_utils).
+
+Setiap ukuran dijalankan di subprocess terpisah agar puncak RSS (ru_maxrss)
+tidak terbawa dari percobaan sebelumnya. Baris sintetis berbentuk sama dengan
+hasil values_list() di AbsensiAdminViewSet.export, dan output dibuang seperti
+saat dikirim ke klien. Mode "buffer" (seluruh file dibangun di memori) dipakai
+sebagai pembanding.
+
+Jalankan dari folder bbpbat_backend_project:
+    python benchmarks/bench_export_absensi.py
+    python benchmarks/bench_export_absensi.py --rows 10000 100000 300000
+"""
+import argparse
+import datetime
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apps.bimbingan.export_utils import stream_csv, stream_xlsx  # noqa: E402
+
+HEADER = ['Tanggal', 'Nama Peserta', 'Email', 'Tipe Peserta', 'Institusi',
+          'Penempatan', 'Status Kehadiran', 'Jam Masuk', 'Jam Keluar', 'Keterangan']
+
+
+def baris_sintetis(jumlah):
+    awal = datetime.date(2024, 1, 1)
+    for i in range(jumlah):
+        yield (
+            awal + datetime.timedelta(days=i % 365),
+            f'Peserta {i % 5000}',
+            f'peserta{i % 5000}@contoh.id',
+            'PELAJAR' if i % 3 else 'UMUM',
+            'Universitas Contoh',
+            'BIOFLOK NILA',
+            'HADIR',
+            datetime.time(7, 30),
+            datetime.time(16, 0),
+            '' if i % 10 else 'Izin keperluan keluarga',
+        )
+
+
+def rss_puncak_mb():
+    # Linux melaporkan ru_maxrss dalam KiB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def jalankan_satu(mode, jumlah):
+    mulai = time.perf_counter()
+    if mode == 'buffer':
+        # Pembanding: seluruh file dibangun di memori sebelum dikirim
+        data = b''.join(stream_csv(HEADER, list(baris_sintetis(jumlah))))
+        ukuran = len(data)
+    else:
+        penulis = stream_csv if mode == 'csv' else stream_xlsx
+        ukuran = sum(len(potongan) for potongan in penulis(HEADER, baris_sintetis(jumlah)))
+    durasi = time.perf_counter() - mulai
+    print(f'{mode},{jumlah},{ukuran},{durasi:.2f},{rss_puncak_mb():.1f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 50_000, 100_000, 300_000])
+    parser.add_argument('--modes', nargs='+', default=['csv', 'xlsx', 'buffer'])
+    parser.add_argument('--_satu', nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args._satu:
+        jalankan_satu(args._satu[0], int(args._satu[1]))
+        return
+
+    print(f"{'mode':<8}{'baris':>10}{'ukuran (MB)':>14}{'waktu (s)':>11}{'RSS puncak (MB)':>17}")
+    for mode in args.modes:
+        for jumlah in args.rows:
+            hasil = subprocess.run(
+                [sys.executable, __file__, '--_satu', mode, str(jumlah)],
+                capture_output=True, text=True, check=True,
+            ).stdout.strip()
+            _, baris, ukuran, durasi, rss = hasil.split(',')
+            print(f'{mode:<8}{int(baris):>10}{int(ukuran) / 1e6:>14.1f}{float(durasi):>11.2f}{float(rss):>17.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark throughput hashing password per core: PBKDF2 bawaan Django,
+scrypt bawaan Django, dan TunedScryptPasswordHasher (apps.users.hashers)
+dengan beberapa setelan, lalu make_password_massal untuk satu batch
+persetujuan pendaftaran dengan jumlah worker berbeda.
+
+Jalankan dari folder bbpbat_backend_project:
+    python benchmarks/bench_password_hashing.py
+    python benchmarks/bench_password_hashing.py --batch 200 --workers 1 2 4
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bbpbat_project.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, ScryptPasswordHasher  # noqa: E402
+from django.test.utils import override_settings  # noqa: E402
+
+from apps.users.hashers import TunedScryptPasswordHasher, buat_password_sementara, make_password_massal  # noqa: E402
+
+SETELAN_SCRYPT = [
+    {'work_factor': 2 ** 14, 'block_size': 8, 'parallelism': 1},
+    {'work_factor': 2 ** 15, 'block_size': 8, 'parallelism': 1},
+    {'work_factor': 2 ** 16, 'block_size': 8, 'parallelism': 1},
+]
+
+
+def hash_per_detik(hasher, jumlah):
+    salt = hasher.salt()
+    mulai = time.perf_counter()
+    for i in range(jumlah):
+        hasher.encode(f'password-{i}', salt)
+    return jumlah / (time.perf_counter() - mulai)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sampel', type=int, default=10, help="Jumlah hash per hasher untuk mengukur throughput.")
+    parser.add_argument('--batch', type=int, default=200, help="Ukuran batch persetujuan untuk make_password_massal.")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    print(f"CPU: {os.cpu_count()}")
+    print(f"{'hasher':<44}{'memori':>9}{'hash/s/core':>13}{'ms/hash':>9}")
+    baris = [(f'PBKDF2 ({PBKDF2PasswordHasher.iterations} iterasi)', '-', PBKDF2PasswordHasher(), None),
+             ('scrypt bawaan Django (n=2^14)', '16 MiB', ScryptPasswordHasher(), None)]
+    for setelan in SETELAN_SCRYPT:
+        memori = 128 * setelan['work_factor'] * setelan['block_size'] * setelan['parallelism'] // 2 ** 20
+        nama = f"TunedScrypt n=2^{setelan['work_factor'].bit_length() - 1} r={setelan['block_size']} p={setelan['parallelism']}"
+        baris.append((nama, f'{memori} MiB', TunedScryptPasswordHasher(), setelan))
+    for nama, memori, hasher, setelan in baris:
+        with override_settings(PASSWORD_SCRYPT=setelan or {}):
+            laju = hash_per_detik(hasher, args.sampel)
+        print(f'{nama:<44}{memori:>9}{laju:>13.1f}{1000 / laju:>9.1f}')
+
+    print(f"\nmake_password_massal, batch {args.batch} password (setelan PASSWORD_SCRYPT aktif):")
+    passwords = [buat_password_sementara() for _ in range(args.batch)]
+    for workers in sorted(set(args.workers)):
+        mulai = time.perf_counter()
+        make_password_massal(passwords, workers=workers)
+        durasi = time.perf_counter() - mulai
+        print(f'  {workers:>2} worker: {durasi:6.2f} s  ({args.batch / durasi:6.1f} hash/s)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""
+Benchmark generate_pdf_certificate untuk banyak sertifikat: latensi per
+sertifikat dan puncak memori (tracemalloc), dengan cache template aktif dan
+tanpa cache (template dibaca + di-parse ulang dari disk setiap sertifikat,
+seperti perilaku lama).
+
+Template contoh dibuat otomatis (A4 landscape, gambar latar JPEG, bingkai dan
+teks statis) karena template asli tidak disimpan di repo. Gunakan --template
+untuk mengukur dengan file template sebenarnya.
+
+Jalankan dari folder bbpbat_backend_project:
+    python benchmarks/bench_sertifikat_pdf.py
+    python benchmarks/bench_sertifikat_pdf.py --jumlah 1000 --template certificate_templates/E_SERTIFIKAT_PKL_MAGANG.pdf
+"""
+import argparse
+import io
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bbpbat_project.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from reportlab.lib.pagesizes import A4, landscape  # noqa: E402
+from reportlab.lib.utils import ImageReader  # noqa: E402
+from reportlab.pdfgen import canvas  # noqa: E402
+
+from apps.bimbingan import pdf_utils  # noqa: E402
+
+
+def buat_template_contoh(path):
+    from PIL import Image
+
+    lebar, tinggi = landscape(A4)
+    acak = random.Random(0)
+    latar = Image.new('RGB', (1240, 877))
+    latar.putdata([(230 + acak.randrange(25), 230 + acak.randrange(25), 200 + acak.randrange(55))
+                   for _ in range(1240 * 877)])
+    berkas_latar = io.BytesIO()
+    latar.save(berkas_latar, 'JPEG', quality=85)
+    berkas_latar.seek(0)
+
+    can = canvas.Canvas(path, pagesize=landscape(A4))
+    can.drawImage(ImageReader(berkas_latar), 0, 0, lebar, tinggi)
+    for inset in (20, 26, 30):
+        can.rect(inset, inset, lebar - 2 * inset, tinggi - 2 * inset)
+    can.setFont('Helvetica-Bold', 36)
+    can.drawCentredString(lebar / 2, 450, 'SERTIFIKAT')
+    can.setFont('Helvetica', 9)
+    for i in range(120):
+        can.drawString(40 + (i % 4) * 190, 60 + (i // 4) * 3, 'BALAI BESAR PERIKANAN BUDIDAYA AIR TAWAR SUKABUMI')
+    for placeholder, y in (('{{NOMOR}}', 405), ('NAMA MAHASISWA', 310), ('{{INSTITUSI}}', 285),
+                           ('Unit Penempatan: {{UNIT}}', 240), ('<<TanggalMulai>> - <<TanggalSelesai>>', 215)):
+        can.drawCentredString(lebar / 2, y, placeholder)
+    can.drawString(560, 98, 'Sukabumi, <<TanggalSelesai>>')
+    can.save()
+
+
+def data_sertifikat(i):
+    return {
+        "{{NAMA_LENGKAP}}": f"Peserta Benchmark Nomor {i}",
+        "{{NAMA_INSTITUSI}}": "Universitas Contoh",
+        "{{NOMOR_SERTIFIKAT}}": f"BBPBAT/CERT/2025/{i:04d}",
+        "{{TANGGAL_TERBIT}}": "30 Juni 2025",
+        "{{TANGGAL_MULAI}}": "6 Januari 2025",
+        "{{TANGGAL_SELESAI}}": "27 Juni 2025",
+        "{{PENEMPATAN}}": "BIOFLOK NILA",
+    }
+
+
+def jalankan(template_path, jumlah, pakai_cache):
+    """ Mengembalikan (list latensi detik, ukuran PDF terakhir). """
+    latensi = []
+    ukuran = 0
+    for i in range(jumlah):
+        if not pakai_cache:
+            pdf_utils.hapus_cache_template()
+        mulai = time.perf_counter()
+        hasil = pdf_utils.generate_pdf_certificate(template_path, data_sertifikat(i))
+        latensi.append(time.perf_counter() - mulai)
+        ukuran = len(hasil.getvalue())
+    return latensi, ukuran
+
+
+def puncak_memori(template_path, jumlah, pakai_cache):
+    pdf_utils.hapus_cache_template()
+    tracemalloc.start()
+    jalankan(template_path, jumlah, pakai_cache)
+    _, puncak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return puncak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--jumlah', type=int, default=1000, help="Jumlah sertifikat per skenario.")
+    parser.add_argument('--template', help="Path template PDF. Default: template contoh sementara.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as direktori:
+        template_path = args.template
+        if not template_path:
+            template_path = os.path.join(direktori, 'template_contoh.pdf')
+            buat_template_contoh(template_path)
+        print(f"Template: {template_path} ({os.path.getsize(template_path) / 1024:.0f} KiB), {args.jumlah} sertifikat")
+        print(f"{'skenario':<34}{'rata2 ms':>10}{'p50 ms':>9}{'p95 ms':>9}{'total s':>9}{'puncak MiB':>12}{'PDF KiB':>9}")
+        for nama, pakai_cache in (('tanpa cache (parse setiap kali)', False), ('cache template + overlay teks', True)):
+            pdf_utils.hapus_cache_template()
+            latensi, ukuran = jalankan(template_path, args.jumlah, pakai_cache)
+            puncak = puncak_memori(template_path, args.jumlah, pakai_cache)
+            urut = sorted(latensi)
+            print(
+                f"{nama:<34}{statistics.mean(latensi) * 1000:>10.2f}"
+                f"{urut[len(urut) // 2] * 1000:>9.2f}{urut[int(len(urut) * 0.95)] * 1000:>9.2f}"
+                f"{sum(latensi):>9.2f}{puncak / 2 ** 20:>12.1f}{ukuran / 1024:>9.0f}"
+            )
+
+
+if __name__ == '__main__':
+    main()
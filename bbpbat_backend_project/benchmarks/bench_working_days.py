@@ -0,0 +1,83 @@
+"""
+Benchmark kalender hari kerja (apps.bimbingan.utils) terhadap implementasi
+lama yang membuat holidays.Indonesia() baru dan berjalan hari demi hari.
+
+Jalankan dari folder bbpbat_backend_project:
+    python benchmarks/bench_working_days.py
+    python benchmarks/bench_working_days.py --pairs 5000 --years 1 3 5
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+import holidays
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apps.bimbingan.utils import (  # noqa: E402
+    calculate_working_days,
+    calculate_working_days_batch,
+    hapus_cache_kalender,
+)
+
+
+def calculate_working_days_lama(start_date, end_date):
+    """ Salinan implementasi sebelum kalender prefix-sum. """
+    id_holidays = holidays.Indonesia()
+    working_days = 0
+    current_date = start_date
+    while current_date <= end_date:
+        if current_date.weekday() < 5 and current_date not in id_holidays:
+            working_days += 1
+        current_date += timedelta(days=1)
+    return working_days
+
+
+def buat_pasangan(jumlah, tahun_rentang, seed=42):
+    acak = random.Random(seed)
+    awal = date(2020, 1, 1)
+    pasangan = []
+    for _ in range(jumlah):
+        mulai = awal + timedelta(days=acak.randrange(365 * 3))
+        pasangan.append((mulai, mulai + timedelta(days=acak.randrange(1, 365 * tahun_rentang + 1))))
+    return pasangan
+
+
+def ukur(fungsi):
+    mulai = time.perf_counter()
+    hasil = fungsi()
+    return hasil, time.perf_counter() - mulai
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pairs', type=int, default=2000, help="Jumlah pasangan (mulai, selesai) per percobaan.")
+    parser.add_argument('--years', type=int, nargs='+', default=[1, 3, 5], help="Panjang rentang maksimum (tahun).")
+    parser.add_argument('--legacy-pairs', type=int, default=200,
+                        help="Jumlah pasangan untuk implementasi lama (lambat), hasilnya diskalakan.")
+    args = parser.parse_args()
+
+    print(f"{'rentang':>8}{'pasangan':>10}{'lama (s)':>12}{'batch (s)':>12}{'percepatan':>12}")
+    for tahun in args.years:
+        pasangan = buat_pasangan(args.pairs, tahun)
+        contoh = pasangan[:args.legacy_pairs]
+
+        hapus_cache_kalender()
+        hasil_lama, waktu_lama = ukur(lambda: [calculate_working_days_lama(a, b) for a, b in contoh])
+        # Waktu batch termasuk membangun kalender setiap tahun dari nol
+        hasil_baru, waktu_baru = ukur(lambda: calculate_working_days_batch(pasangan))
+
+        assert hasil_lama == hasil_baru[:len(contoh)], "Hasil berbeda dengan implementasi lama"
+        waktu_lama_penuh = waktu_lama * len(pasangan) / len(contoh)
+        print(f"{tahun:>7}y{len(pasangan):>10}{waktu_lama_penuh:>12.3f}{waktu_baru:>12.4f}"
+              f"{waktu_lama_penuh / waktu_baru:>11.0f}x")
+
+    _, waktu_satu = ukur(lambda: calculate_working_days(date(2020, 1, 1), date(2025, 12, 31)))
+    print(f"Satu rentang 6 tahun (kalender sudah di-cache): {waktu_satu * 1e6:.1f} µs")
+
+
+if __name__ == '__main__':
+    main()
@@ -36,9 +36,11 @@ export const getParticipantAttendance = () => {
 /**
  * Mengirimkan aksi absensi (check-in/check-out) untuk hari ini.
  * Backend akan secara cerdas menentukan apakah ini check-in atau check-out.
+ * Koordinat (opsional) divalidasi ulang di server terhadap geofence unit penempatan.
  */
-export const submitParticipantAttendance = () => {
-    return api.post('/peserta/absensi/');
+export const submitParticipantAttendance = (coordinates?: { lat: number; lng: number } | null) => {
+    const payload = coordinates ? { latitude: coordinates.lat, longitude: coordinates.lng } : {};
+    return api.post('/peserta/absensi/', payload);
 };
 
 /**
@@ -45,13 +45,93 @@ export const getEligibleForCertificate = () => {
     return api.get<EligibleParticipant[]>('/bimbingan/admin/sertifikat/');
 };
 
+export interface CertificateJobQueued {
+    message: string;
+    job_id: number;
+    status: CertificateJobStatus;
+    status_url: string;
+}
+
+export type CertificateJobStatus = 'ANTRI' | 'DIPROSES' | 'SELESAI' | 'GAGAL';
+
+export interface CertificateJob {
+    id: number;
+    peserta_id: number;
+    status: CertificateJobStatus;
+    percobaan: number;
+    pesan_error: string;
+    dibuat_pada: string;
+    mulai_pada: string | null;
+    selesai_pada: string | null;
+    sertifikat: CertificateDetail | null;
+}
+
 /**
- * Memicu proses pembuatan sertifikat untuk seorang peserta.
+ * Memasukkan pembuatan sertifikat seorang peserta ke antrean (HTTP 202).
+ * PDF dibuat oleh worker di server; pantau hasilnya dengan getCertificateJob.
  * @param pesertaId - ID dari peserta yang akan dibuatkan sertifikat.
- * @returns Promise dengan detail sertifikat yang baru dibuat (CertificateDetail).
+ * @returns Promise dengan id job antrean.
  */
 export const generateCertificate = (pesertaId: number) => {
-    return api.post<CertificateDetail>('/bimbingan/admin/sertifikat/', { peserta_id: pesertaId });
+    return api.post<CertificateJobQueued>('/bimbingan/admin/sertifikat/', { peserta_id: pesertaId });
+};
+
+/**
+ * Mengambil status job pembuatan sertifikat.
+ * @param jobId - ID job dari generateCertificate.
+ * @param tunggu - Long-poll: server menahan respons sampai job selesai atau batas detik ini habis.
+ */
+export const getCertificateJob = (jobId: number, tunggu = 0) => {
+    return api.get<CertificateJob>(`/bimbingan/admin/sertifikat/job/${jobId}/`, { params: { tunggu } });
+};
+
+/**
+ * Menunggu job sampai SELESAI atau GAGAL dengan long-poll berulang, paling lama
+ * `batasDetik`. Job diproses oleh worker `manage.py proses_sertifikat`; jika worker
+ * tidak berjalan, job tetap ANTRI dan status terakhirnya dikembalikan setelah batas habis.
+ * @returns Promise dengan job final, atau job yang masih ANTRI/DIPROSES jika batas habis.
+ */
+export const waitForCertificateJob = async (jobId: number, tunggu = 25, batasDetik = 90): Promise<CertificateJob> => {
+    const batasWaktu = Date.now() + batasDetik * 1000;
+    for (;;) {
+        const sisaDetik = Math.ceil((batasWaktu - Date.now()) / 1000);
+        const { data } = await getCertificateJob(jobId, Math.max(0, Math.min(tunggu, sisaDetik)));
+        if (data.status === 'SELESAI' || data.status === 'GAGAL' || sisaDetik <= 0) {
+            return data;
+        }
+    }
+};
+
+export interface CertificateBatchResult {
+    message: string;
+    diterbitkan: Array<{
+        peserta_id: number;
+        nama: string;
+        sertifikat_id: number;
+        nomor_sertifikat: string;
+        file_url: string;
+    }>;
+    dilewati: Array<{ peserta_id: number; alasan: string }>;
+    sisa: number;
+}
+
+/**
+ * Menerbitkan sertifikat banyak peserta sekaligus.
+ * @param pesertaIds - Daftar ID peserta, atau 'semua' untuk seluruh peserta yang memenuhi syarat.
+ * @returns Promise dengan laporan per peserta.
+ */
+export const generateCertificatesBatch = (pesertaIds: number[] | 'semua') => {
+    const body = pesertaIds === 'semua' ? { semua: true } : { peserta_ids: pesertaIds };
+    return api.post<CertificateBatchResult>('/bimbingan/admin/sertifikat/batch/', body);
+};
+
+/**
+ * Sama dengan generateCertificatesBatch, tetapi mengunduh semua PDF dalam satu ZIP
+ * (berisi laporan.json untuk hasil per peserta).
+ */
+export const downloadCertificatesBatchZip = (pesertaIds: number[] | 'semua') => {
+    const body = pesertaIds === 'semua' ? { semua: true, zip: true } : { peserta_ids: pesertaIds, zip: true };
+    return api.post<Blob>('/bimbingan/admin/sertifikat/batch/', body, { responseType: 'blob' });
 };
 
 /**
@@ -25,3 +25,13 @@ export const approveRegistration = (registrationId: number | string) => {
 export const rejectRegistration = (registrationId: number | string, reason: string) => {
     return api.post(`/bimbingan/admin/pendaftaran/${registrationId}/reject/`, { alasan: reason });
 };
+
+// Persetujuan/penolakan massal: satu request untuk banyak pendaftaran.
+// Respons bulk-approve memuat password sementara setiap akun di `disetujui`.
+export const bulkApproveRegistrations = (registrationIds: Array<number | string>) => {
+    return api.post('/bimbingan/admin/pendaftaran/bulk-approve/', { ids: registrationIds });
+};
+
+export const bulkRejectRegistrations = (registrationIds: Array<number | string>) => {
+    return api.post('/bimbingan/admin/pendaftaran/bulk-reject/', { ids: registrationIds });
+};
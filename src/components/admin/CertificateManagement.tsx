@@ -3,6 +3,7 @@ import { Users, Building, Award, Download, Search, CheckCircle, Clock, Send, Hou
 import {
   getEligibleForCertificate,
   generateCertificate,
+  waitForCertificateJob,
 } from '../../api/apiService';
 import CertificatePreview from './CertificatePreview';
 
@@ -81,7 +82,20 @@ const CertificateManagement: React.FC = () => {
     setGeneratingId(participantId);
     try {
       const response = await generateCertificate(participantId);
-      alert(`Sertifikat berhasil diterbitkan untuk ${response.data.peserta.nama}!\nNomor: ${response.data.nomor_sertifikat}`);
+      const job = await waitForCertificateJob(response.data.job_id);
+      if (job.status === 'ANTRI' || job.status === 'DIPROSES') {
+        alert(
+          `Sertifikat masih ${job.status === 'ANTRI' ? 'dalam antrean' : 'diproses'}. ` +
+          "Pastikan worker sertifikat (manage.py proses_sertifikat) berjalan, lalu muat ulang halaman ini untuk melihat hasilnya."
+        );
+        return;
+      }
+      if (job.status === 'GAGAL' || !job.sertifikat) {
+        alert(`Error: ${job.pesan_error || "Pembuatan sertifikat gagal."}`);
+        return;
+      }
+      const sertifikat = job.sertifikat;
+      alert(`Sertifikat berhasil diterbitkan untuk ${sertifikat.peserta.nama}!\nNomor: ${sertifikat.nomor_sertifikat}`);
 
       // Update UI: ubah status peserta yang bersangkutan menjadi 'diterbitkan'
       setAllParticipants(prev => prev.map(p =>
@@ -89,7 +103,7 @@ const CertificateManagement: React.FC = () => {
           ? {
             ...p,
             status: 'diterbitkan',
-            nomorSertifikat: response.data.nomor_sertifikat,
+            nomorSertifikat: sertifikat.nomor_sertifikat,
           }
           : p
       ));
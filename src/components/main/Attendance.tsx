@@ -23,7 +23,7 @@ const Attendance: React.FC<AttendanceProps> = ({ userData }) => {
   const [error, setError] = useState<string | null>(null);
   const [isLeaveModalOpen, setLeaveModalOpen] = useState(false);
 
-  const { locationStatus, checkLocation } = useGeolocation();
+  const { locationStatus, checkLocation, getLastCoordinates } = useGeolocation();
 
   const fetchAttendanceHistory = useCallback(async () => {
     setIsLoading(true);
@@ -65,7 +65,7 @@ const Attendance: React.FC<AttendanceProps> = ({ userData }) => {
     toast.loading("Mengirim data absensi...", { id: loadingToast });
     setIsSubmitting(true);
     try {
-      const response = await submitParticipantAttendance();
+      const response = await submitParticipantAttendance(getLastCoordinates());
       toast.success(response.data.detail, { id: loadingToast });
       await fetchAttendanceHistory();
     } catch (err: any) {
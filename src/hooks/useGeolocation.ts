@@ -1,4 +1,4 @@
-import { useState, useCallback } from "react";
+import { useState, useCallback, useRef } from "react";
 import { calculateDistance } from "../utils/geo";
 
 export const BBPBAT_LOCATION = {
@@ -26,6 +26,8 @@ export const useGeolocation = () => {
         error: null,
         coordinates: null,
     });
+    // Koordinat terakhir dibaca langsung saat submit (state belum tentu ter-update)
+    const lastCoordinates = useRef<{ lat: number; lng: number } | null>(null);
 
     const checkLocation = useCallback(() => {
         setLocationStatus((prev) => ({ ...prev, loading: true, error: null }));
@@ -52,6 +54,7 @@ export const useGeolocation = () => {
             navigator.geolocation.getCurrentPosition(
                 (position) => {
                     const { latitude, longitude } = position.coords;
+                    lastCoordinates.current = { lat: latitude, lng: longitude };
                     const distance = calculateDistance(
                         latitude,
                         longitude,
@@ -95,5 +98,7 @@ export const useGeolocation = () => {
         });
     }, []);
 
-    return { locationStatus, checkLocation, BBPBAT_LOCATION };
+    const getLastCoordinates = useCallback(() => lastCoordinates.current, []);
+
+    return { locationStatus, checkLocation, getLastCoordinates, BBPBAT_LOCATION };
 };